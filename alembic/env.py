@@ -16,6 +16,12 @@ from app.models.admin_role import AdminRole, AdminPermission, AdminActivity  # I
 from app.models.contact_us import ContactUs  # Import your models
 from app.models.country import Country  # Import your models
 from app.models.bank import Bank  # Import your models
+from app.models.idempotency_keys import IdempotencyKey  # Import your models
+from app.models.outbox_events import OutboxEvent  # Import your models
+from app.models.transfer_jobs import TransferJob  # Import your models
+from app.models.user_transaction_totals import UserTransactionTotals  # Import your models
+from app.models.user_spend_buckets import UserSpendBucket  # Import your models
+from app.models.dashboard_stats import DailyTransactionStats, DailyUserSignups  # Import your models
 
 
 
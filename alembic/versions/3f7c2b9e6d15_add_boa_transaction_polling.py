@@ -0,0 +1,41 @@
+"""Add status polling columns to boa_transactions
+
+Revision ID: 3f7c2b9e6d15
+Revises: 8d2f4a61c0b7
+Create Date: 2026-10-19 13:40:27.291553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7c2b9e6d15'
+down_revision: Union[str, None] = '8d2f4a61c0b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('boa_transactions', sa.Column('next_poll_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('boa_transactions', sa.Column('poll_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_boa_transactions_next_poll_at'), 'boa_transactions', ['next_poll_at'], unique=False)
+    # Transfers still in flight are picked up by the poller straight away
+    op.execute(
+        """
+        UPDATE boa_transactions
+        SET next_poll_at = now()
+        WHERE boa_reference IS NOT NULL
+          AND COALESCE(lower(boa_transaction_status), 'pending') NOT IN ('success', 'failed', 'timeout')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_boa_transactions_next_poll_at'), table_name='boa_transactions')
+    op.drop_column('boa_transactions', 'poll_attempts')
+    op.drop_column('boa_transactions', 'next_poll_at')
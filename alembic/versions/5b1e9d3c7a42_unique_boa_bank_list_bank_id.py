@@ -0,0 +1,38 @@
+"""Make boa_bank_list.bank_id unique for bank list upserts
+
+Revision ID: 5b1e9d3c7a42
+Revises: cc94c390f007
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e9d3c7a42'
+down_revision: Union[str, None] = 'cc94c390f007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Drop duplicate bank_ids left by the old delete-and-reinsert refresh, keeping the newest row
+    op.execute(
+        """
+        DELETE FROM boa_bank_list a
+        USING boa_bank_list b
+        WHERE a.bank_id = b.bank_id AND a.id < b.id
+        """
+    )
+    op.drop_index(op.f('ix_boa_bank_list_bank_id'), table_name='boa_bank_list')
+    op.create_index(op.f('ix_boa_bank_list_bank_id'), 'boa_bank_list', ['bank_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_boa_bank_list_bank_id'), table_name='boa_bank_list')
+    op.create_index(op.f('ix_boa_bank_list_bank_id'), 'boa_bank_list', ['bank_id'], unique=False)
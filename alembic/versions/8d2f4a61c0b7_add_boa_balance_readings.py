@@ -0,0 +1,42 @@
+"""Add boa_balance_readings time series
+
+Revision ID: 8d2f4a61c0b7
+Revises: 5b1e9d3c7a42
+Create Date: 2026-10-19 11:02:15.604381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a61c0b7'
+down_revision: Union[str, None] = '5b1e9d3c7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('boa_balance_readings',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('account_currency', sa.String(length=10), nullable=False),
+    sa.Column('resolution', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.TIMESTAMP(), nullable=False),
+    sa.Column('balance', sa.DECIMAL(precision=18, scale=2), nullable=False),
+    sa.Column('min_balance', sa.DECIMAL(precision=18, scale=2), nullable=False),
+    sa.Column('max_balance', sa.DECIMAL(precision=18, scale=2), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('last_updated', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('account_currency', 'resolution', 'bucket_start', name='uq_boa_balance_readings_bucket')
+    )
+    op.create_index(op.f('ix_boa_balance_readings_id'), 'boa_balance_readings', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_boa_balance_readings_id'), table_name='boa_balance_readings')
+    op.drop_table('boa_balance_readings')
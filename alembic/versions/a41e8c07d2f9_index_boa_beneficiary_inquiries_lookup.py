@@ -0,0 +1,35 @@
+"""Index boa_beneficiary_inquiries for cache lookups and expiry purge
+
+Revision ID: a41e8c07d2f9
+Revises: 3f7c2b9e6d15
+Create Date: 2026-10-19 15:21:09.473120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41e8c07d2f9'
+down_revision: Union[str, None] = '3f7c2b9e6d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows that expired before this revision would otherwise wait for the first purge run
+    op.execute("DELETE FROM boa_beneficiary_inquiries WHERE expires_at < now()")
+    op.create_index('ix_boa_beneficiary_inquiries_lookup', 'boa_beneficiary_inquiries', ['account_id', 'inquiry_type', 'expires_at'], unique=False)
+    op.create_index('ix_boa_beneficiary_inquiries_expires_at', 'boa_beneficiary_inquiries', ['expires_at'], unique=False)
+    # Covered by the leading column of the lookup index
+    op.drop_index(op.f('ix_boa_beneficiary_inquiries_account_id'), table_name='boa_beneficiary_inquiries')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_boa_beneficiary_inquiries_account_id'), 'boa_beneficiary_inquiries', ['account_id'], unique=False)
+    op.drop_index('ix_boa_beneficiary_inquiries_expires_at', table_name='boa_beneficiary_inquiries')
+    op.drop_index('ix_boa_beneficiary_inquiries_lookup', table_name='boa_beneficiary_inquiries')
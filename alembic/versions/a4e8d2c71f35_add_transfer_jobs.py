@@ -0,0 +1,53 @@
+"""Add transfer_jobs
+
+Revision ID: a4e8d2c71f35
+Revises: f1c3a85d2e47
+Create Date: 2026-10-19 21:14:42.507391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e8d2c71f35'
+down_revision: Union[str, None] = 'f1c3a85d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transfer_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('transaction_id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('step', sa.String(length=30), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('lease_until', sa.TIMESTAMP(), nullable=True),
+    sa.Column('beneficiary', sa.JSON(), nullable=True),
+    sa.Column('boa_response', sa.JSON(), nullable=True),
+    sa.Column('boa_reference', sa.String(length=100), nullable=True),
+    sa.Column('error', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.transaction_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('transaction_id')
+    )
+    op.create_index(op.f('ix_transfer_jobs_id'), 'transfer_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_transfer_jobs_user_id'), 'transfer_jobs', ['user_id'], unique=False)
+    op.create_index('ix_transfer_jobs_claim', 'transfer_jobs', ['status', 'lease_until'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transfer_jobs_claim', table_name='transfer_jobs')
+    op.drop_index(op.f('ix_transfer_jobs_user_id'), table_name='transfer_jobs')
+    op.drop_index(op.f('ix_transfer_jobs_id'), table_name='transfer_jobs')
+    op.drop_table('transfer_jobs')
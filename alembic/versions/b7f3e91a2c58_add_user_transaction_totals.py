@@ -0,0 +1,39 @@
+"""Add user_transaction_totals
+
+Revision ID: b7f3e91a2c58
+Revises: a4e8d2c71f35
+Create Date: 2026-10-19 22:03:18.640125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3e91a2c58'
+down_revision: Union[str, None] = 'a4e8d2c71f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are built from each user's history the first time they are needed
+    op.create_table('user_transaction_totals',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('total_amount', sa.DECIMAL(precision=18, scale=2), nullable=False),
+    sa.Column('transaction_count', sa.BigInteger(), nullable=False),
+    sa.Column('period_start', sa.TIMESTAMP(), nullable=False),
+    sa.Column('current_period_amount', sa.DECIMAL(precision=18, scale=2), nullable=False),
+    sa.Column('previous_period_amount', sa.DECIMAL(precision=18, scale=2), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_transaction_totals')
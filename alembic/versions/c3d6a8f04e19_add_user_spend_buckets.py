@@ -0,0 +1,49 @@
+"""Add user_spend_buckets
+
+Revision ID: c3d6a8f04e19
+Revises: b7f3e91a2c58
+Create Date: 2026-10-19 22:41:09.318572
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d6a8f04e19'
+down_revision: Union[str, None] = 'b7f3e91a2c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_spend_buckets',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('bucket_start', sa.TIMESTAMP(), nullable=False),
+    sa.Column('amount', sa.DECIMAL(precision=18, scale=2), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('last_updated', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'bucket_start', name='uq_user_spend_buckets_bucket')
+    )
+    op.create_index(op.f('ix_user_spend_buckets_id'), 'user_spend_buckets', ['id'], unique=False)
+    # Seed the current window so limits apply from the first request
+    op.execute("""
+        INSERT INTO user_spend_buckets (user_id, bucket_start, amount, transaction_count, last_updated)
+        SELECT user_id, date_trunc('day', created_at), SUM(amount), COUNT(*), now()
+        FROM transactions
+        WHERE created_at >= date_trunc('day', now() AT TIME ZONE 'UTC') - interval '6 days'
+          AND (status IS NULL OR status != 'failed')
+        GROUP BY user_id, date_trunc('day', created_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_spend_buckets_id'), table_name='user_spend_buckets')
+    op.drop_table('user_spend_buckets')
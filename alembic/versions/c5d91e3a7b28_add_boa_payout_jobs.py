@@ -0,0 +1,67 @@
+"""Add boa_payout_jobs and boa_payout_items
+
+Revision ID: c5d91e3a7b28
+Revises: a41e8c07d2f9
+Create Date: 2026-10-19 17:05:44.862310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d91e3a7b28'
+down_revision: Union[str, None] = 'a41e8c07d2f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('boa_payout_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('created_by', sa.BigInteger(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total_items', sa.Integer(), nullable=False),
+    sa.Column('succeeded', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.user_id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_boa_payout_jobs_id'), 'boa_payout_jobs', ['id'], unique=False)
+    op.create_table('boa_payout_items',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('job_id', sa.BigInteger(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('transaction_id', sa.BigInteger(), nullable=False),
+    sa.Column('transfer_type', sa.String(length=20), nullable=False),
+    sa.Column('amount', sa.String(length=30), nullable=False),
+    sa.Column('account_number', sa.String(length=50), nullable=False),
+    sa.Column('bank_code', sa.String(length=20), nullable=True),
+    sa.Column('receiver_name', sa.String(length=200), nullable=True),
+    sa.Column('reference', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('boa_reference', sa.String(length=100), nullable=True),
+    sa.Column('error', sa.String(length=255), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['boa_payout_jobs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.transaction_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id', 'position', name='uq_boa_payout_items_job_position')
+    )
+    op.create_index(op.f('ix_boa_payout_items_id'), 'boa_payout_items', ['id'], unique=False)
+    op.create_index(op.f('ix_boa_payout_items_job_id'), 'boa_payout_items', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_boa_payout_items_job_id'), table_name='boa_payout_items')
+    op.drop_index(op.f('ix_boa_payout_items_id'), table_name='boa_payout_items')
+    op.drop_table('boa_payout_items')
+    op.drop_index(op.f('ix_boa_payout_jobs_id'), table_name='boa_payout_jobs')
+    op.drop_table('boa_payout_jobs')
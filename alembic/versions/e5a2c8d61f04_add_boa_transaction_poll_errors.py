@@ -0,0 +1,28 @@
+"""Add poll_errors to boa_transactions
+
+Revision ID: e5a2c8d61f04
+Revises: d9b1f47c3a86
+Create Date: 2026-10-19 23:58:14.620317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c8d61f04'
+down_revision: Union[str, None] = 'd9b1f47c3a86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('boa_transactions', sa.Column('poll_errors', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('boa_transactions', 'poll_errors')
@@ -0,0 +1,28 @@
+"""Add transactions (user_id, created_at, transaction_id) index
+
+Revision ID: f1c3a85d2e47
+Revises: e2b7c94f1a63
+Create Date: 2026-10-19 20:05:41.662310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3a85d2e47'
+down_revision: Union[str, None] = 'e2b7c94f1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_user_created', 'transactions', ['user_id', 'created_at', 'transaction_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_user_created', table_name='transactions')
@@ -0,0 +1,34 @@
+"""Add attempts and lease_until to boa_payout_jobs
+
+Revision ID: f1c7b3e94a52
+Revises: e5a2c8d61f04
+Create Date: 2026-10-19 23:59:41.083265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7b3e94a52'
+down_revision: Union[str, None] = 'e5a2c8d61f04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('boa_payout_jobs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('boa_payout_jobs', sa.Column('lease_until', sa.TIMESTAMP(), nullable=True))
+    op.create_index('ix_boa_payout_jobs_claim', 'boa_payout_jobs', ['status', 'lease_until'], unique=False)
+    # Jobs left running by the previous release are resumed on the first check
+    op.execute("UPDATE boa_payout_jobs SET lease_until = now() WHERE status = 'running'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_boa_payout_jobs_claim', table_name='boa_payout_jobs')
+    op.drop_column('boa_payout_jobs', 'lease_until')
+    op.drop_column('boa_payout_jobs', 'attempts')
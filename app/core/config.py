@@ -33,6 +33,9 @@ class Settings(BaseSettings):
     # Stripe
     STRIPE_SECRET_KEY: str | None = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_PUBLISHABLE_KEY: str | None = os.getenv("STRIPE_PUBLISHABLE_KEY")
+    # Shared async Stripe client: per-request timeout and automatic retries of network failures
+    STRIPE_TIMEOUT_SECONDS: int = int(os.getenv("STRIPE_TIMEOUT_SECONDS", 30))
+    STRIPE_MAX_NETWORK_RETRIES: int = int(os.getenv("STRIPE_MAX_NETWORK_RETRIES", 2))
 
     # Redis
     REDIS_HOST: str | None = os.getenv("REDIS_HOST")
@@ -48,7 +51,65 @@ class Settings(BaseSettings):
     BOA_X_API_KEY: str | None = os.getenv("BOA_X_API_KEY")
     BOA_AUTH_PREFIX: str = os.getenv("BOA_AUTH_PREFIX", "")
     BOA_TOKEN_FILE: str = os.getenv("BOA_TOKEN_FILE", "./boa_token.json")
-    
+    # Beneficiary name cache (seconds / entries per inquiry type)
+    BOA_BENEFICIARY_CACHE_TTL_BOA: int = int(os.getenv("BOA_BENEFICIARY_CACHE_TTL_BOA", 86400))
+    BOA_BENEFICIARY_CACHE_TTL_OTHER_BANK: int = int(os.getenv("BOA_BENEFICIARY_CACHE_TTL_OTHER_BANK", 43200))
+    BOA_BENEFICIARY_CACHE_SIZE: int = int(os.getenv("BOA_BENEFICIARY_CACHE_SIZE", 10000))
+    BOA_BENEFICIARY_NEGATIVE_CACHE_TTL: int = int(os.getenv("BOA_BENEFICIARY_NEGATIVE_CACHE_TTL", 300))
+    # Expired boa_beneficiary_inquiries rows are deleted in chunks on this interval (seconds, 0 disables)
+    BOA_BENEFICIARY_PURGE_SECONDS: int = int(os.getenv("BOA_BENEFICIARY_PURGE_SECONDS", 3600))
+    BOA_BENEFICIARY_PURGE_CHUNK_SIZE: int = int(os.getenv("BOA_BENEFICIARY_PURGE_CHUNK_SIZE", 1000))
+    # Bank list snapshot refresh interval and client cache lifetime (seconds, 0 disables refresh)
+    BOA_BANK_LIST_REFRESH_SECONDS: int = int(os.getenv("BOA_BANK_LIST_REFRESH_SECONDS", 3600))
+    BOA_BANK_LIST_MAX_AGE: int = int(os.getenv("BOA_BANK_LIST_MAX_AGE", 300))
+    # Currencies kept warm by the rate refresher, and how old a served rate may be
+    BOA_RATE_CURRENCIES: str = os.getenv("BOA_RATE_CURRENCIES", "USD,EUR,GBP")
+    BOA_RATE_REFRESH_SECONDS: int = int(os.getenv("BOA_RATE_REFRESH_SECONDS", 60))
+    BOA_RATE_MAX_STALENESS: int = int(os.getenv("BOA_RATE_MAX_STALENESS", 300))
+    # Balance time series: polling interval, rollup interval and retention per resolution
+    BOA_BALANCE_POLL_SECONDS: int = int(os.getenv("BOA_BALANCE_POLL_SECONDS", 60))
+    BOA_BALANCE_DOWNSAMPLE_SECONDS: int = int(os.getenv("BOA_BALANCE_DOWNSAMPLE_SECONDS", 3600))
+    BOA_BALANCE_MINUTE_RETENTION_DAYS: int = int(os.getenv("BOA_BALANCE_MINUTE_RETENTION_DAYS", 7))
+    BOA_BALANCE_HOURLY_RETENTION_DAYS: int = int(os.getenv("BOA_BALANCE_HOURLY_RETENTION_DAYS", 730))
+    # Bank list, rate and balance polling: set to false on workers that should never call BoA on a schedule.
+    # Where enabled, a Redis leader lock lets only one worker run each job per interval
+    BOA_POLLING_JOBS_ENABLED: bool = os.getenv("BOA_POLLING_JOBS_ENABLED", "true").lower() == "true"
+    # Background polling of pending BoA transfer statuses
+    BOA_STATUS_POLL_SECONDS: int = int(os.getenv("BOA_STATUS_POLL_SECONDS", 10))
+    BOA_STATUS_POLL_BATCH_SIZE: int = int(os.getenv("BOA_STATUS_POLL_BATCH_SIZE", 100))
+    BOA_STATUS_POLL_CONCURRENCY: int = int(os.getenv("BOA_STATUS_POLL_CONCURRENCY", 10))
+    BOA_STATUS_POLL_MAX_AGE_HOURS: int = int(os.getenv("BOA_STATUS_POLL_MAX_AGE_HOURS", 72))
+    # Bulk payouts: items per job, concurrent BoA calls per job, results written per commit,
+    # how long a runner's claim on a job lasts, and how often stalled jobs are looked for
+    BOA_PAYOUT_MAX_ITEMS: int = int(os.getenv("BOA_PAYOUT_MAX_ITEMS", 500))
+    BOA_PAYOUT_CONCURRENCY: int = int(os.getenv("BOA_PAYOUT_CONCURRENCY", 5))
+    BOA_PAYOUT_FLUSH_SIZE: int = int(os.getenv("BOA_PAYOUT_FLUSH_SIZE", 25))
+    BOA_PAYOUT_LEASE_SECONDS: int = int(os.getenv("BOA_PAYOUT_LEASE_SECONDS", 300))
+    BOA_PAYOUT_RESUME_SECONDS: int = int(os.getenv("BOA_PAYOUT_RESUME_SECONDS", 60))
+    # Idempotency-Key: how long responses are replayed, and how long an unfinished request holds its key
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", 86400))
+    IDEMPOTENCY_IN_PROGRESS_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_IN_PROGRESS_TTL_SECONDS", 300))
+    IDEMPOTENCY_PURGE_SECONDS: int = int(os.getenv("IDEMPOTENCY_PURGE_SECONDS", 3600))
+    # Outbox dispatcher: notifications, emails and SMS queued with the DB change that caused them
+    OUTBOX_DISPATCH_SECONDS: int = int(os.getenv("OUTBOX_DISPATCH_SECONDS", 5))
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+    OUTBOX_CONCURRENCY: int = int(os.getenv("OUTBOX_CONCURRENCY", 10))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+    OUTBOX_RETENTION_DAYS: int = int(os.getenv("OUTBOX_RETENTION_DAYS", 7))
+    OUTBOX_PURGE_SECONDS: int = int(os.getenv("OUTBOX_PURGE_SECONDS", 3600))
+    # Transfer worker: queued BoA transfers claimed per tick, concurrent BoA calls, and how long a claim lasts
+    TRANSFER_WORKER_POLL_SECONDS: int = int(os.getenv("TRANSFER_WORKER_POLL_SECONDS", 5))
+    TRANSFER_WORKER_BATCH_SIZE: int = int(os.getenv("TRANSFER_WORKER_BATCH_SIZE", 20))
+    TRANSFER_WORKER_CONCURRENCY: int = int(os.getenv("TRANSFER_WORKER_CONCURRENCY", 10))
+    TRANSFER_JOB_LEASE_SECONDS: int = int(os.getenv("TRANSFER_JOB_LEASE_SECONDS", 120))
+    # Weekly limit: how often daily spend buckets that left the 7-day window are dropped
+    SPEND_BUCKET_PURGE_SECONDS: int = int(os.getenv("SPEND_BUCKET_PURGE_SECONDS", 3600))
+    # Admin dashboard response cache: seconds a body is served, and how long one request may hold the recompute lock
+    DASHBOARD_CACHE_TTL_SECONDS: int = int(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", 30))
+    DASHBOARD_CACHE_LOCK_SECONDS: int = int(os.getenv("DASHBOARD_CACHE_LOCK_SECONDS", 10))
+    # Admin exports: rows fetched from the server-side cursor and encoded per chunk
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+
     # Twilio SMS Configuration
     TWILIO_ACCOUNT_SID: str | None = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN: str | None = os.getenv("TWILIO_AUTH_TOKEN")
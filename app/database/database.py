@@ -50,4 +50,26 @@ async def init_redis():
 async def get_redis() -> aioredis.Redis:
     if redis_client is None:
         raise Exception("Redis client not initialized")
-    return redis_client
\ No newline at end of file
+    return redis_client
+
+# INSERT construct supporting ON CONFLICT for the session's database
+def dialect_insert(db, model):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(model)
+
+# Insert-or-update many rows in one statement, keyed on a unique constraint
+def bulk_upsert(db, model, rows, index_elements, update_columns):
+    if not rows:
+        return
+    stmt = dialect_insert(db, model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: getattr(stmt.excluded, column) for column in update_columns},
+    )
+    db.execute(stmt)
@@ -1,6 +1,6 @@
 # app/models/boa_integration.py
 
-from sqlalchemy import Column, BigInteger, String, ForeignKey, DECIMAL, Text, TIMESTAMP, Boolean, JSON
+from sqlalchemy import Column, BigInteger, Integer, String, ForeignKey, DECIMAL, Text, TIMESTAMP, Boolean, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 from datetime import datetime
@@ -38,6 +38,11 @@ class BoATransaction(Base):
     # Transaction details
     transaction_type = Column(String(50), nullable=True)  # "AC" for account transfer
     boa_transaction_status = Column(String(20), default="pending")  # "Live", "success", "failed"
+    # Background status polling: when the row is next due (NULL once final), how often it was polled
+    # and how many polls in a row failed to get an answer
+    next_poll_at = Column(TIMESTAMP, nullable=True, index=True)
+    poll_attempts = Column(Integer, nullable=False, default=0)
+    poll_errors = Column(Integer, nullable=False, default=0)
 
     # Financial details
     debit_account_id = Column(String(50), nullable=True)
@@ -64,9 +69,15 @@ class BoATransaction(Base):
 class BoABeneficiaryInquiry(Base):
     """Model for beneficiary name inquiries"""
     __tablename__ = 'boa_beneficiary_inquiries'
+    __table_args__ = (
+        # Cache lookups: equality on account and type, newest unexpired first
+        Index('ix_boa_beneficiary_inquiries_lookup', 'account_id', 'inquiry_type', 'expires_at'),
+        # Expiry purge
+        Index('ix_boa_beneficiary_inquiries_expires_at', 'expires_at'),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
-    account_id = Column(String(50), nullable=False, index=True)
+    account_id = Column(String(50), nullable=False)
     bank_id = Column(String(20), nullable=True)  # For other bank inquiries
 
     # Response data
@@ -76,7 +87,7 @@ class BoABeneficiaryInquiry(Base):
 
     # Metadata
     inquiry_type = Column(String(20), nullable=False)  # "boa" or "other_bank"
-    boa_response = Column(JSON, nullable=True)  # Full BoA response
+    boa_response = Column(JSON, nullable=True)  # BoA response header (id, status, code, message)
 
     # Timestamps
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
@@ -124,6 +135,81 @@ class BoABalance(Base):
     boa_response = Column(JSON, nullable=True)
     last_updated = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class BoABalanceReading(Base):
+    """
+    Settlement balance time series, one row per currency and time bucket.
+    Minute buckets are rolled up into hour buckets once they age out.
+    """
+    __tablename__ = 'boa_balance_readings'
+    __table_args__ = (
+        UniqueConstraint('account_currency', 'resolution', 'bucket_start', name='uq_boa_balance_readings_bucket'),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    account_currency = Column(String(10), nullable=False)
+    resolution = Column(String(10), nullable=False)  # "minute" or "hour"
+    bucket_start = Column(TIMESTAMP, nullable=False)
+
+    # Last reading in the bucket plus its range
+    balance = Column(DECIMAL(18, 2), nullable=False)
+    min_balance = Column(DECIMAL(18, 2), nullable=False)
+    max_balance = Column(DECIMAL(18, 2), nullable=False)
+    sample_count = Column(Integer, nullable=False, default=1)
+    last_updated = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class BoAPayoutJob(Base):
+    """A bulk payout submission; its transfers are BoAPayoutItem rows"""
+    __tablename__ = 'boa_payout_jobs'
+    __table_args__ = (
+        Index('ix_boa_payout_jobs_claim', 'status', 'lease_until'),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    created_by = Column(BigInteger, ForeignKey('users.user_id', ondelete="SET NULL"), nullable=True)
+    status = Column(String(20), nullable=False, default="queued")  # "queued", "running", "completed"
+    # Bumped by each runner that claims the job; a runner only writes while it still matches
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_until = Column(TIMESTAMP, nullable=True)  # A running job whose lease ran out is resumed by another runner
+
+    # Progress counters, updated with each batch of results
+    total_items = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    started_at = Column(TIMESTAMP, nullable=True)
+    completed_at = Column(TIMESTAMP, nullable=True)
+
+    items = relationship('BoAPayoutItem', back_populates='job', order_by='BoAPayoutItem.position', cascade="all, delete-orphan")
+
+class BoAPayoutItem(Base):
+    """One transfer of a bulk payout job"""
+    __tablename__ = 'boa_payout_items'
+    __table_args__ = (
+        UniqueConstraint('job_id', 'position', name='uq_boa_payout_items_job_position'),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    job_id = Column(BigInteger, ForeignKey('boa_payout_jobs.id', ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # Order in the submitted list
+    transaction_id = Column(BigInteger, ForeignKey('transactions.transaction_id', ondelete="CASCADE"), nullable=False)
+
+    # Transfer details as submitted
+    transfer_type = Column(String(20), nullable=False)  # "within_boa" or "other_bank"
+    amount = Column(String(30), nullable=False)
+    account_number = Column(String(50), nullable=False)
+    bank_code = Column(String(20), nullable=True)
+    receiver_name = Column(String(200), nullable=True)
+    reference = Column(String(100), nullable=False)
+
+    # Outcome
+    status = Column(String(20), nullable=False, default="queued")  # "queued", "processing", "succeeded", "failed"
+    boa_reference = Column(String(100), nullable=True)
+    error = Column(String(255), nullable=True)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    job = relationship('BoAPayoutJob', back_populates='items')
+
 # Update existing models to include BoA relationships
 
 # Update Transaction model to include BoA relationship
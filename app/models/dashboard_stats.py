@@ -0,0 +1,27 @@
+# app/models/dashboard_stats.py
+from sqlalchemy import Column, BigInteger, String, DECIMAL, Date, TIMESTAMP
+from datetime import datetime
+from app.database.database import Base
+
+class DailyTransactionStats(Base):
+    """
+    Transactions per UTC creation day, currency and current status.
+    Kept in step with the transactions table in the same commit as every
+    insert, status change and delete, so the dashboard never groups raw rows.
+    """
+    __tablename__ = 'daily_transaction_stats'
+
+    stat_date = Column(Date, primary_key=True)
+    currency = Column(String(10), primary_key=True)  # "" for transactions without one
+    status = Column(String(20), primary_key=True)  # TransactionStatus value, "" when unset
+    transaction_count = Column(BigInteger, nullable=False, default=0)
+    amount = Column(DECIMAL(18, 2), nullable=False, default=0)
+    last_updated = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DailyUserSignups(Base):
+    """Accounts created per UTC day, maintained like DailyTransactionStats"""
+    __tablename__ = 'daily_user_signups'
+
+    stat_date = Column(Date, primary_key=True)
+    signup_count = Column(BigInteger, nullable=False, default=0)
+    last_updated = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,28 @@
+# app/models/idempotency_keys.py
+from sqlalchemy import Column, BigInteger, Integer, String, TIMESTAMP, JSON, UniqueConstraint
+from datetime import datetime
+from app.database.database import Base
+
+class IdempotencyKey(Base):
+    """
+    Stored outcome of a request sent with an Idempotency-Key header.
+    Only written when Redis is unavailable; the unique constraint is what
+    stops two concurrent requests with the same key from both running.
+    """
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        UniqueConstraint('scope', 'idempotency_key', name='uq_idempotency_keys_scope_key'),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    scope = Column(String(100), nullable=False)  # Endpoint (and user) the key belongs to
+    idempotency_key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request payload
+    state = Column(String(20), nullable=False, default="in_progress")  # "in_progress" or "completed"
+
+    # Replayed response
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
@@ -0,0 +1,24 @@
+# app/models/outbox_events.py
+from sqlalchemy import Column, BigInteger, Integer, String, Text, TIMESTAMP, JSON, Index
+from datetime import datetime
+from app.database.database import Base
+
+class OutboxEvent(Base):
+    """
+    Side effect recorded in the same transaction as the change that caused it
+    and carried out later by the outbox dispatcher (app/utils/outbox.py).
+    """
+    __tablename__ = 'outbox_events'
+    __table_args__ = (
+        Index('ix_outbox_events_due', 'status', 'available_at'),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)  # e.g. "notification.push", "notification.email"
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # "pending", "sent" or "failed"
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)  # Not dispatched before this
+    last_error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    processed_at = Column(TIMESTAMP, nullable=True)
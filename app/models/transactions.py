@@ -1,5 +1,5 @@
 # app/models/transactions.py
-from sqlalchemy import Column, BigInteger, String, ForeignKey, DECIMAL, Text, Enum, TIMESTAMP, Boolean,Numeric
+from sqlalchemy import Column, BigInteger, String, ForeignKey, DECIMAL, Text, Enum, TIMESTAMP, Boolean,Numeric, Index
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 from datetime import datetime
@@ -18,6 +18,10 @@ class AccountType(enum.Enum):
 
 class Transaction(Base):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Keyset pagination of a user's history: newest first by (created_at, transaction_id)
+        Index('ix_transactions_user_created', 'user_id', 'created_at', 'transaction_id'),
+    )
 
     transaction_id = Column(BigInteger, primary_key=True, index=True)
     user_id = Column(BigInteger, ForeignKey('users.user_id', ondelete="CASCADE"), nullable=False)
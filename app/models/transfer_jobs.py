@@ -0,0 +1,34 @@
+# app/models/transfer_jobs.py
+from sqlalchemy import Column, BigInteger, Integer, String, TIMESTAMP, JSON, ForeignKey, Index
+from datetime import datetime
+from app.database.database import Base
+
+class TransferJob(Base):
+    """
+    Background processing of one user transaction through BoA.
+    `step` is the last checkpoint reached, so a job picked up again after a
+    crash continues from there instead of starting over.
+    """
+    __tablename__ = 'transfer_jobs'
+    __table_args__ = (
+        Index('ix_transfer_jobs_claim', 'status', 'lease_until'),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    # One job per transaction; a failed job is re-queued rather than duplicated
+    transaction_id = Column(BigInteger, ForeignKey('transactions.transaction_id', ondelete="CASCADE"), nullable=False, unique=True)
+    user_id = Column(BigInteger, ForeignKey('users.user_id', ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="queued")  # "queued", "running", "succeeded", "failed", "needs_review"
+    step = Column(String(30), nullable=True)  # "beneficiary_resolved", "dispatching", "dispatched", "persisted"
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_until = Column(TIMESTAMP, nullable=True)  # A running job whose lease ran out is claimed again
+
+    # Checkpoint data
+    beneficiary = Column(JSON, nullable=True)
+    boa_response = Column(JSON, nullable=True)
+    boa_reference = Column(String(100), nullable=True)
+
+    error = Column(String(255), nullable=True)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(TIMESTAMP, nullable=True)
@@ -0,0 +1,23 @@
+# app/models/user_spend_buckets.py
+from sqlalchemy import Column, BigInteger, Integer, DECIMAL, TIMESTAMP, ForeignKey, UniqueConstraint
+from datetime import datetime
+from app.database.database import Base
+
+class UserSpendBucket(Base):
+    """
+    Amount a user has sent per UTC day, counting every transaction that has
+    not failed and amounts reserved for transactions still being created.
+    The weekly limit check reads the last seven buckets instead of summing
+    the user's transactions; buckets outside that window are purged.
+    """
+    __tablename__ = 'user_spend_buckets'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'bucket_start', name='uq_user_spend_buckets_bucket'),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    user_id = Column(BigInteger, ForeignKey('users.user_id', ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(TIMESTAMP, nullable=False)  # Midnight UTC of the day the transactions were created
+    amount = Column(DECIMAL(18, 2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    last_updated = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,23 @@
+# app/models/user_transaction_totals.py
+from sqlalchemy import Column, BigInteger, DECIMAL, TIMESTAMP, ForeignKey
+from datetime import datetime
+from app.database.database import Base
+
+class UserTransactionTotals(Base):
+    """
+    Running totals of a user's transactions (amount plus transfer fee),
+    kept up to date as transactions are created and deleted so the balance
+    card never has to scan the user's history. The period columns cover
+    the calendar month starting at `period_start` and the month before it.
+    """
+    __tablename__ = 'user_transaction_totals'
+
+    user_id = Column(BigInteger, ForeignKey('users.user_id', ondelete="CASCADE"), primary_key=True)
+    total_amount = Column(DECIMAL(18, 2), nullable=False, default=0)
+    transaction_count = Column(BigInteger, nullable=False, default=0)
+
+    period_start = Column(TIMESTAMP, nullable=False)
+    current_period_amount = Column(DECIMAL(18, 2), nullable=False, default=0)
+    previous_period_amount = Column(DECIMAL(18, 2), nullable=False, default=0)
+
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,139 @@
+# app/routers/admin_exports.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from datetime import datetime
+
+from app.database.database import get_db
+from app.models.kyc_documents import KYCDocument, KYCStatus
+from app.models.transactions import Transaction, TransactionStatus
+from app.models.users import User, Role
+from app.security import JWTBearer, get_current_user
+from app.utils.exports import export_response
+
+router = APIRouter()
+
+ExportFormat = Literal["csv", "ndjson"]
+
+
+# Finance and compliance exports
+def require_export_access(
+    db: Session = Depends(get_db),
+    token: dict = Depends(JWTBearer()),) -> User:
+    user = get_current_user(db, token)
+    if user.role not in [Role.admin, Role.finance_officer]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return user
+
+
+@router.get("/transactions", response_class=StreamingResponse, summary="Export Transactions")
+def export_transactions(
+    format: ExportFormat = Query("csv"),
+    status: Optional[TransactionStatus] = Query(None),
+    currency: Optional[str] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    _: User = Depends(require_export_access)
+):
+    """
+    Stream every matching transaction as CSV or NDJSON, oldest first.
+    Card details are never exported.
+    """
+    statement = select(
+        Transaction.transaction_id,
+        Transaction.user_id,
+        User.email,
+        Transaction.amount,
+        Transaction.transfer_fee,
+        Transaction.currency,
+        Transaction.status,
+        Transaction.is_manual,
+        Transaction.account_type,
+        Transaction.full_name,
+        Transaction.bank_name,
+        Transaction.account_number,
+        Transaction.telebirr_number,
+        Transaction.transaction_reference,
+        Transaction.stripe_charge_id,
+        Transaction.created_at,
+        Transaction.completed_at,
+    ).join(User, User.user_id == Transaction.user_id).where(Transaction.amount > 0)
+    if status:
+        statement = statement.where(Transaction.status == status)
+    if currency:
+        statement = statement.where(Transaction.currency == currency)
+    if start_date:
+        statement = statement.where(Transaction.created_at >= start_date)
+    if end_date:
+        statement = statement.where(Transaction.created_at <= end_date)
+
+    return export_response(
+        "transactions",
+        statement.order_by(Transaction.created_at, Transaction.transaction_id),
+        format
+    )
+
+
+@router.get("/users", response_class=StreamingResponse, summary="Export Users")
+def export_users(
+    format: ExportFormat = Query("csv"),
+    role: Optional[Role] = Query(None),
+    _: User = Depends(require_export_access)
+):
+    """Stream every user account as CSV or NDJSON; credentials are never exported"""
+    statement = select(
+        User.user_id,
+        User.email,
+        User.phone,
+        User.role,
+        User.is_active,
+        User.is_verified,
+        User.is_flagged,
+        User.kyc_status,
+        User.user_weekly_limit,
+        User.suspended_at,
+        User.suspension_reason,
+        User.last_login,
+        User.created_at,
+        User.deleted_at,
+    )
+    if role:
+        statement = statement.where(User.role == role)
+
+    return export_response("users", statement.order_by(User.user_id), format)
+
+
+@router.get("/kyc", response_class=StreamingResponse, summary="Export KYC Submissions")
+def export_kyc_submissions(
+    format: ExportFormat = Query("csv"),
+    status: Optional[KYCStatus] = Query(None),
+    _: User = Depends(require_export_access)
+):
+    """Stream KYC submissions with the user's email and phone; document images are referenced by path"""
+    statement = select(
+        KYCDocument.id,
+        KYCDocument.user_id,
+        User.email,
+        User.phone,
+        KYCDocument.first_name,
+        KYCDocument.last_name,
+        KYCDocument.dob,
+        KYCDocument.gender,
+        KYCDocument.country,
+        KYCDocument.region,
+        KYCDocument.city,
+        KYCDocument.id_type,
+        KYCDocument.front_image,
+        KYCDocument.back_image,
+        KYCDocument.selfie_image,
+        KYCDocument.status,
+        KYCDocument.rejection_reason,
+        KYCDocument.verified_at,
+        KYCDocument.created_at,
+    ).join(User, User.user_id == KYCDocument.user_id)
+    if status:
+        statement = statement.where(KYCDocument.status == status)
+
+    return export_response("kyc", statement.order_by(KYCDocument.id), format)
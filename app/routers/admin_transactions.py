@@ -1,6 +1,9 @@
 # app/routers/admin_transaction_fees.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
@@ -9,16 +12,29 @@ from app.database.database import get_db
 from app.models.transactions import Transaction, TransactionStatus
 from app.models.manual_deposits import ManualDeposit
 
-from app.schemas.transactions import TransactionUpdate, TransactionResponse
+from app.schemas.transactions import (
+    TransactionUpdate, TransactionResponse,
+    TransactionBulkStatusUpdate, TransactionBulkStatusResult, TransactionBulkStatusResponse
+)
 from app.security import JWTBearer, get_current_user
 from app.models.users import User, Role
 from app.models.payment_cards import PaymentCard
-from app.models.notifications import Notification, ChannelType
+from app.utils.outbox import enqueue_notifications
+from app.utils.transaction_totals import record_transaction
+from app.utils.spend_limits import adjust_spend, counts_towards_limit
+from app.utils.dashboard_rollups import record_status_change
+from app.utils.transfer_worker import transfer_started
+from app.utils.pagination import (
+    NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, InvalidCursorError, estimate_count, keyset_page
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get("", response_model=List[TransactionResponse])
 def get_all_transactions(
+    response: Response,
     status: Optional[TransactionStatus] = Query(None),
     user_id: Optional[int] = Query(None),    
     amount: Optional[Decimal] = Query(None), 
@@ -26,28 +42,30 @@ def get_all_transactions(
     order: str = Query("newest", enum=["newest", "oldest"]),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    page: int = Query(1, ge=1, deprecated=True, description=f"OFFSET paging; use cursor and {NEXT_CURSOR_HEADER} instead"),
     per_page: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
     token: dict = Depends(JWTBearer()),
 ):
+    """
+    Page through transactions by cursor; the next page's cursor is in the
+    X-Next-Cursor header and X-Total-Count is an estimate of all matches.
+    """
     try:
         current_user = get_current_user(db, token)
         if current_user.role != Role.admin:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
-
-        # Start with base query including relationships
-        query = db.query(Transaction).options(
-            joinedload(Transaction.user).joinedload(User.kyc_document),
-            joinedload(Transaction.payment_card)
-        )
+            # `status` is the filter parameter here, not fastapi.status
+            raise HTTPException(status_code=403, detail="Admin access required")
 
         # Apply filters
-        query = query.filter(Transaction.amount > 0)
+        query = db.query(Transaction).filter(Transaction.amount > 0)
         if user_id:
             query = query.filter(Transaction.user_id == user_id )
         if status:
             query = query.filter(Transaction.status == status)    
+        if amount is not None:
+            query = query.filter(Transaction.amount == amount)
         if currency:
             query = query.filter(Transaction.currency == currency)    
         if start_date:
@@ -55,19 +73,40 @@ def get_all_transactions(
         if end_date:
             query = query.filter(Transaction.created_at <= end_date)
 
-        # Apply ordering
-        if order == "newest":
-            query = query.order_by(Transaction.created_at.desc())
-        else:
-            query = query.order_by(Transaction.created_at.asc())
+        response.headers[TOTAL_COUNT_HEADER] = str(estimate_count(db, query))
 
-        # Apply pagination
-        transactions = query.offset((page - 1) * per_page).limit(per_page).all()
+        # Related rows come in one extra query per relationship for the whole page
+        query = query.options(
+            selectinload(Transaction.user).selectinload(User.kyc_document),
+            selectinload(Transaction.payment_card)
+        )
 
+        if page > 1 and not cursor:
+            # Deprecated OFFSET paging, kept for existing clients
+            if order == "newest":
+                query = query.order_by(Transaction.created_at.desc(), Transaction.transaction_id.desc())
+            else:
+                query = query.order_by(Transaction.created_at.asc(), Transaction.transaction_id.asc())
+            return query.offset((page - 1) * per_page).limit(per_page).all()
+
+        transactions, next_cursor = keyset_page(
+            query,
+            Transaction.created_at,
+            Transaction.transaction_id,
+            cursor,
+            per_page,
+            descending=order == "newest"
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return transactions
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An error occurred while fetching transactions try again")
+        raise HTTPException(status_code=500, detail="An error occurred while fetching transactions try again")
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 def get_transaction_details(
@@ -91,6 +130,108 @@ def get_transaction_details(
     except:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An error occurred while fetching transactions try again")
 
+@router.put("/bulk-status", response_model=TransactionBulkStatusResponse)
+def bulk_update_transaction_status(
+    data: TransactionBulkStatusUpdate,
+    db: Session = Depends(get_db),
+    token: dict = Depends(JWTBearer()),
+):
+    """
+    Move many transactions to one status: the rows that change are locked
+    with SELECT ... FOR UPDATE, then moved with a single UPDATE by id.
+    Transactions already in that status are left untouched ("unchanged").
+    Those moved to failed get a ManualDeposit, as with the single update,
+    and admins get one notification for the whole batch.
+    """
+    current_user = get_current_user(db, token)
+    if current_user.role != Role.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+
+    new_status = TransactionStatus(data.status.value)
+    requested_ids = list(dict.fromkeys(data.transaction_ids))
+    now = datetime.utcnow()
+    values = {Transaction.status: new_status, Transaction.updated_at: now}
+    if new_status == TransactionStatus.completed:
+        values[Transaction.completed_at] = func.coalesce(Transaction.completed_at, now)
+    if data.admin_note is not None:
+        values[Transaction.admin_note] = data.admin_note
+    changing = and_(
+        Transaction.transaction_id.in_(requested_ids),
+        Transaction.amount > 0,
+        or_(Transaction.status.is_(None), Transaction.status != new_status)
+    )
+
+    try:
+        # Lock the rows first: their previous status feeds the weekly limit and the dashboard rollups
+        changed_rows = db.execute(
+            select(
+                Transaction.transaction_id, Transaction.user_id, Transaction.amount,
+                Transaction.currency, Transaction.status, Transaction.created_at
+            ).where(changing).with_for_update()
+        ).all()
+        updated_ids = {row.transaction_id for row in changed_rows}
+        if updated_ids:
+            db.execute(
+                update(Transaction).where(Transaction.transaction_id.in_(updated_ids)).values(values)
+                .execution_options(synchronize_session=False)
+            )
+            record_status_change(db, changed_rows, new_status)
+            if counts_towards_limit(new_status):
+                adjust_spend(db, [row for row in changed_rows if not counts_towards_limit(row.status)])
+            else:
+                adjust_spend(db, changed_rows, sign=-1)
+
+        # Tell "already in that status" apart from "no such transaction"
+        untouched_ids = [transaction_id for transaction_id in requested_ids if transaction_id not in updated_ids]
+        existing_ids = set(db.execute(
+            select(Transaction.transaction_id).where(
+                Transaction.transaction_id.in_(untouched_ids),
+                Transaction.amount > 0
+            )
+        ).scalars()) if untouched_ids else set()
+
+        deposit_ids: set = set()
+        if new_status == TransactionStatus.failed and updated_ids:
+            has_deposit = set(db.execute(
+                select(ManualDeposit.transaction_id).where(ManualDeposit.transaction_id.in_(updated_ids))
+            ).scalars())
+            deposit_ids = updated_ids - has_deposit
+            if deposit_ids:
+                db.execute(insert(ManualDeposit), [
+                    {"transaction_id": transaction_id, "completed": False, "created_at": now, "updated_at": now}
+                    for transaction_id in deposit_ids
+                ])
+
+        if updated_ids:
+            enqueue_notifications(
+                db,
+                user_ids=db.execute(select(User.user_id).where(User.role == Role.admin)).scalars().all(),
+                title="Transaction Status Updated",
+                message=f"{len(updated_ids)} transaction statuses were updated to {new_status.value} by {current_user.email or 'an admin'}",
+                type="transaction_fees_update"
+            )
+
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error updating transaction statuses in bulk: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An error occurred try again")
+
+    results = []
+    for transaction_id in requested_ids:
+        if transaction_id in updated_ids:
+            outcome = "updated"
+        elif transaction_id in existing_ids:
+            outcome = "unchanged"
+        else:
+            outcome = "not_found"
+        results.append(TransactionBulkStatusResult(
+            transaction_id=transaction_id,
+            outcome=outcome,
+            manual_deposit_created=transaction_id in deposit_ids
+        ))
+    return TransactionBulkStatusResponse(status=data.status, updated=len(updated_ids), results=results)
+
 @router.put("/{transaction_id}", response_model=TransactionResponse)
 def update_transaction_status(
     transaction_id: int,
@@ -119,6 +260,10 @@ def update_transaction_status(
         for field, value in data.dict(exclude_unset=True).items():
             setattr(transaction, field, value)
 
+        # Failed transactions do not count towards the weekly limit
+        if counts_towards_limit(old_status) != counts_towards_limit(transaction.status):
+            adjust_spend(db, [transaction], sign=1 if counts_towards_limit(transaction.status) else -1)
+
         # Automatically set completed_at if status is changed to COMPLETED
         if data.status == TransactionStatus.completed and not transaction.completed_at:
             transaction.completed_at = datetime.utcnow()
@@ -157,18 +302,13 @@ def update_transaction_status(
         ).filter(Transaction.transaction_id == transaction_id).first()
 
         # Notify all admin users
-        admin_users = db.query(User).filter(User.role == Role.admin).all()
-        for user in admin_users:
-            notification = Notification(
-                user_id=user.user_id,
-                title="Transaction Status Updated",
-                message=f"Transaction status were updated by {current_user.email or 'an admin'}",
-                channel=ChannelType.push,
-                type="transaction_fees_update",
-                is_sent=True,
-                sent_at=datetime.utcnow()
-            )
-            db.add(notification)
+        enqueue_notifications(
+            db,
+            user_ids=db.execute(select(User.user_id).where(User.role == Role.admin)).scalars().all(),
+            title="Transaction Status Updated",
+            message=f"Transaction status were updated by {current_user.email or 'an admin'}",
+            type="transaction_fees_update"
+        )
 
         db.commit()
 
@@ -213,15 +353,24 @@ def delete_transaction(
         if not transaction:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
 
+        # Deleting would cascade away the transfer job and BoA record of money that may have been sent
+        if transfer_started(db, transaction_id):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Transaction has a BoA transfer and cannot be deleted")
+
         # Optionally delete related ManualDeposit if it exists
         manual_deposit = db.query(ManualDeposit).filter(ManualDeposit.transaction_id == transaction_id).first()
         if manual_deposit:
             db.delete(manual_deposit)
 
+        record_transaction(db, transaction, sign=-1)
+        if counts_towards_limit(transaction.status):
+            adjust_spend(db, [transaction], sign=-1)
         db.delete(transaction)
         db.commit()
         
         return {"message": "Transaction is deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An error occurred try again")
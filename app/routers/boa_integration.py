@@ -1,20 +1,36 @@
 # app/routers/boa_integration.py
 
-import json
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 import logging
 from app.utils.boa_api_service import boa_api
+from app.schemas.boa_envelopes import BoAEnvelope
+from app.utils.boa_cache import bank_list_snapshot
+from app.core.config import settings
 
 from app.database.database import get_db
+from app.models.boa_integration import BoAPayoutJob
+from app.models.users import User, Role
+from app.security import JWTBearer, get_current_user
+from app.utils.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
+from app.utils.payout_jobs import (
+    PayoutValidationError,
+    validate_payout,
+    create_payout_job,
+    start_payout_job,
+    payout_job_summary,
+    stream_payout_progress
+)
 from app.utils.boa_service import (
     BoABeneficiaryService,
     BoATransferService,
     BoAStatusService,
     BoARateService,
     BoABankService,
+    BoABalanceService,
     BoAServiceError
 )
 from app.schemas.boa_integration import (
@@ -25,14 +41,35 @@ from app.schemas.boa_integration import (
     BoAStatusResponse,
     BoACurrencyRateResponse,
     BoABalanceResponse,
+    BoALatestBalanceResponse,
+    BoABalancePointResponse,
     BoABankListResponse,
-    BoAMoneySendRequest
+    BoAMoneySendRequest,
+    BoABulkPayoutRequest,
+    BoAPayoutItemResponse,
+    BoAPayoutJobResponse
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def _boa_error_response(result: BoAEnvelope, default: str = "Try again later", **extra: Any) -> JSONResponse:
+    """Relay a failed BoA call with BoA's own HTTP status and most specific message"""
+    return JSONResponse(
+        status_code=result.http_status,
+        content={"success": False, **extra, "message": result.error_message(default)}
+    )
+
+
+def _transfer_references(result: BoAEnvelope) -> Dict[str, Any]:
+    return {
+        "boa_reference": result.header.id,
+        "unique_identifier": result.header.unique_identifier,
+        "transaction_status": result.header.transaction_status,
+    }
+
 # Beneficiary Name Endpoints
 
 @router.get("/beneficiary/boa/{account_id}", response_model=BoABeneficiaryResponse, summary="Fetch BOA Beneficiary Name", description="Fetches the beneficiary name for a Bank of Abyssinia account number. Uses caching for 24 hours to improve performance.")
@@ -41,39 +78,11 @@ async def get_beneficiary_name_boa(
     db: Session = Depends(get_db)
 ):
     try:
-        # change the implementation to boa_api service direct call
-        result =await boa_api.fetch_beneficiary_name(account_id)
-        result_body_list = result.get("body", [])
-        status_code = result.get("http_status", 200)
-        if(status_code != 200):
-            try: 
-                error_message = result.get("error",{}).get("message", "Try again later")
-            except:
-                error_message = "Try again later"
-            return JSONResponse(
-                status_code=status_code,
-                content={
-                    "success": False,
-                    "message" : error_message
-                }
-            )
-        if not result_body_list:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Beneficiary not found or API error"
-            )
+        beneficiary, failure = await BoABeneficiaryService.lookup("boa", account_id)
+        if failure:
+            return _boa_error_response(failure)
 
-        # BoA returns a list with one object, so take the first item
-        boa_data = result_body_list[0]
-
-        mapped_data = {
-            "customer_name": boa_data.get("customerName"),
-            "account_currency": boa_data.get("accountCurrency"),
-            "enquiry_status": None,   # BoA does not return this field
-            "cached": False
-        }
-
-        return BoABeneficiaryResponse(**mapped_data)
+        return BoABeneficiaryResponse(**beneficiary)
     except BoAServiceError as e:
         logger.error(f"Service error fetching BoA beneficiary: {str(e)}")
         raise HTTPException(
@@ -110,46 +119,16 @@ async def get_beneficiary_name_other_bank(
     - Headers: `x-api-key`, `Authorization`
     """
     try:
-        # change the implementation to boa_api service direct call
-        result = await boa_api.fetch_beneficiary_name_other_bank(bank_id, account_id)
-        header = result.get("header", {})
-        body = result.get("body", [])
-        status_code = result.get("http_status", 200)
-        if (status_code != 200):
-            try: 
-                error_message = result.get("error",{}).get("message", "Try again later")
-            except:
-                error_message = "Try again later"
-            return JSONResponse(
-                status_code=status_code,
-                content={
-                    "success": False,
-                    "message" : error_message
-                }
-            )
-        if not body:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Beneficiary not found"
-            )
-        boa_data = body[0]
-        error_code = boa_data.get("errorCode", "ok")
-        if(error_code.lower() != "ok"):
-            error_desc = boa_data.get("errDesc", "Unknown error")
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "success" : False,
-                    "message": error_desc
-                }
-            )
-        mapped_data = {
-            "customer_name": boa_data.get("beneficiaryName", "Unknown"),
-            "account_currency": boa_data.get("accountCurrency", "ETB"),
-            "enquiry_status": boa_data.get("enquiryStatus", ""),   # BoA does not return this field
-            "cached": False
-        }
-        return BoABeneficiaryResponse(**mapped_data)
+        beneficiary, failure = await BoABeneficiaryService.lookup("other_bank", account_id, bank_id=bank_id)
+        if failure:
+            return _boa_error_response(failure)
+
+        return BoABeneficiaryResponse(
+            customer_name=beneficiary["customer_name"] or "Unknown",
+            account_currency=beneficiary["account_currency"] or "ETB",
+            enquiry_status=beneficiary["enquiry_status"] or "",
+            cached=beneficiary["cached"]
+        )
     except BoAServiceError as e:
         logger.error(f"Service error fetching other bank beneficiary: {str(e)}")
         raise HTTPException(
@@ -167,56 +146,35 @@ async def get_beneficiary_name_other_bank(
 )
 async def initiate_within_boa_transfer(
     request: BoATransferRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = await boa_api.initiate_within_boa_transfer(
-            amount=request.amount,
-            account_number=request.account_number,
-            reference=request.reference
-        )
+    async def send():
+        try:
+            result = await boa_api.initiate_within_boa_transfer(
+                amount=request.amount,
+                account_number=request.account_number,
+                reference=request.reference
+            )
 
-        header = result.get("header", {})
-        body = result.get("body", {})
+            if result.http_status != 200:
+                return _boa_error_response(result, "Transaction Failed", **_transfer_references(result))
 
-        # BoA Code (not HTTP!)
-        boa_status_code = result.get("http_status", 200)
+            # SUCCESS mapping
+            return BoATransferResponse(
+                success=result.is_success,
+                response=result.body.to_dict() if result.body else {},
+                **_transfer_references(result)
+            )
 
-        if boa_status_code != 200:
-            try:
-                error_data = result.get("error", {}).get("errorDetails", [])
-                error_message = "Transaction Failed" if error_data == [] else error_data[0].get("message", "Transaction Failed")
-            except:
-                error_message = "Transaction Failed"
-            
+        except Exception as e:
+            logger.error(f"Unexpected error during BOA transfer: {str(e)}")
             return JSONResponse(
-                status_code=boa_status_code,
-                content={
-                    "success": False,
-                    "boa_reference": header.get("id"),
-                    "unique_identifier": header.get("uniqueIdentifier"),
-                    "transaction_status": header.get("transactionStatus"),
-                    "message": error_message
-                }
+                status_code=500,
+                content={"detail": "Internal server error", "error": str(e)}
             )
 
-        # SUCCESS mapping
-        mapped_response = {
-            "success": header.get("status") == "success",
-            "boa_reference": header.get("id"),
-            "unique_identifier": header.get("uniqueIdentifier"),
-            "transaction_status": header.get("transactionStatus"),
-            "response": body
-        }
-
-        return BoATransferResponse(**mapped_response)
-
-    except Exception as e:
-        logger.error(f"Unexpected error during BOA transfer: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error", "error": str(e)}
-        )
+    return await run_idempotent("boa:transfer:within-boa", idempotency_key, request, send)
 @router.post(
     "/transfer/other-bank",
     response_model=BoATransferResponse,
@@ -225,63 +183,97 @@ async def initiate_within_boa_transfer(
 )
 async def initiate_other_bank_transfer(
     request: BoAOtherBankTransferRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     db: Session = Depends(get_db)
 ):
-    try:
-        result = await boa_api.initiate_other_bank_transfer(
-            amount=request.amount,
-            bank_code=request.bank_code,
-            account_number=request.account_number,
-            reference=request.reference,
-            receiver_name=request.receiver_name
-        )
+    async def send():
+        try:
+            result = await boa_api.initiate_other_bank_transfer(
+                amount=request.amount,
+                bank_code=request.bank_code,
+                account_number=request.account_number,
+                reference=request.reference,
+                receiver_name=request.receiver_name
+            )
 
-        header = result.get("header", {})
-        body = result.get("body", result)
-        boa_status_code = result.get("http_status", 200)
-        if boa_status_code != 200:
-            try:
-                error_data = result.get("error", {}).get("errorDetails", [])
-                error_message = (
-                    "Transaction Failed"
-                    if not error_data
-                    else error_data[0].get("message", "Transaction Failed")
-                )
-            except:
-                error_message = "Transaction Failed"
+            if result.http_status != 200:
+                return _boa_error_response(result, "Transaction Failed", **_transfer_references(result))
 
-            return JSONResponse(
-                status_code=boa_status_code,
-                content={
-                    "success": False,
-                    "boa_reference": header.get("id"),
-                    "unique_identifier": header.get("uniqueIdentifier"),
-                    "transaction_status": header.get("transactionStatus"),
-                    "message": error_message,
-                   
-                }
+            return BoATransferResponse(
+                success=result.is_success,
+                response=result.body.to_dict() if result.body else result.to_dict(),
+                **_transfer_references(result)
             )
 
-        mapped_response = {
-            "success": header.get("status") == "success",
-            "boa_reference": header.get("id"),
-            "unique_identifier": header.get("uniqueIdentifier"),
-            "transaction_status": header.get("transactionStatus"),
-            "response": body
-        }
-
-        return BoATransferResponse(**mapped_response)
+        except Exception as e:
+            logger.error(f"Unexpected error during BOA other bank transfer: {str(e)}")
+            return JSONResponse(
+                status_code=500,
+                content={"detail": "Internal server error", "error": str(e)}
+            )
 
-    except Exception as e:
-        logger.error(f"Unexpected error during BOA other bank transfer: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error", "error": str(e)}
-        )
+    return await run_idempotent("boa:transfer:other-bank", idempotency_key, request, send)
+
+def require_finance(
+    db: Session = Depends(get_db),
+    token: dict = Depends(JWTBearer()),) -> User:
+    user = get_current_user(db, token)
+    if user.role not in [Role.admin, Role.finance_officer]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return user
+
+@router.post("/transfer/bulk", response_model=BoAPayoutJobResponse, status_code=status.HTTP_202_ACCEPTED, summary="Submit Bulk Payout", description="Validates a list of within-BOA and other bank transfers in one pass and dispatches them in the background. Poll or stream the returned job for per-item progress.")
+async def submit_bulk_payout(
+    request: BoABulkPayoutRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_finance)
+):
+    async def submit():
+        try:
+            validate_payout(db, request.items)
+        except PayoutValidationError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors)
+
+        job = create_payout_job(db, request.items, user.user_id)
+        start_payout_job(job.id)
+        return BoAPayoutJobResponse(**payout_job_summary(job))
+
+    return await run_idempotent(
+        f"boa:transfer:bulk:{user.user_id}", idempotency_key, request, submit,
+        status_code=status.HTTP_202_ACCEPTED
+    )
+
+@router.get("/transfer/bulk/{job_id}", response_model=BoAPayoutJobResponse, summary="Get Bulk Payout Progress", description="Returns the job counters and the status of every item.")
+def get_bulk_payout(
+    job_id: int,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_finance)
+):
+    job = db.query(BoAPayoutJob).options(selectinload(BoAPayoutJob.items)).filter(BoAPayoutJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payout job not found")
+    return BoAPayoutJobResponse(
+        **payout_job_summary(job),
+        items=[BoAPayoutItemResponse.model_validate(item) for item in job.items]
+    )
+
+@router.get("/transfer/bulk/{job_id}/stream", summary="Stream Bulk Payout Progress", description="Streams newline-delimited JSON: one line per finished item and one per change of the job counters, until the job completes.")
+def stream_bulk_payout(
+    job_id: int,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_finance)
+):
+    if not db.query(BoAPayoutJob.id).filter(BoAPayoutJob.id == job_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payout job not found")
+    # The stream opens its own short sessions; don't pin this one for its lifetime
+    db.close()
+    return StreamingResponse(stream_payout_progress(job_id), media_type="application/x-ndjson")
 
 @router.post("/transfer/money-send", response_model=BoATransferResponse, summary="Initiate Money Send", description="Initiates a money send transaction (wallet transfer) through BOA.")
 async def initiate_money_send(
     request: BoAMoneySendRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     db: Session = Depends(get_db)
 ):
     """
@@ -308,61 +300,40 @@ async def initiate_money_send(
 
     **Note:** This endpoint calls the BOA API directly without database persistence.
     """
-    try:
-        # Import here to avoid circular imports
-        
-         
-        result = await boa_api.initiate_money_send(
-            amount=request.amount,
-            remitter_name=request.remitter_name,
-            remitter_phone=request.remitter_phone,
-            receiver_name=request.receiver_name,
-            receiver_address=request.receiver_address,
-            receiver_phone=request.receiver_phone,
-            reference=request.reference,
-            secret_code=request.secret_code
-        )
-        header = result.get("header", {})
-        body = result.get("body", [])
-        status_code = result.get("http_status", 200)
-        if (status_code != 200):
-            try:
-                error_data = result.get("error", {}).get("errorDetails", [])
-                error_message = (
-                    "Transaction Failed"
-                    if not error_data
-                    else error_data[0].get("message", "Transaction Failed")
+    async def send():
+        try:
+            result = await boa_api.initiate_money_send(
+                amount=request.amount,
+                remitter_name=request.remitter_name,
+                remitter_phone=request.remitter_phone,
+                receiver_name=request.receiver_name,
+                receiver_address=request.receiver_address,
+                receiver_phone=request.receiver_phone,
+                reference=request.reference,
+                secret_code=request.secret_code
+            )
+            if result.http_status != 200:
+                return _boa_error_response(result, "Transaction Failed")
+            if not result.body:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Empty response from BoA API"
                 )
-            except:
-                error_message = "Transaction Failed"
-            return JSONResponse(
-                status_code = status_code,
-                content = {
-                    "success" : False,
-                    "message" : error_message
-                }
+
+            return BoATransferResponse(
+                success=True,
+                response=result.to_dict(),
+                **_transfer_references(result)
             )
-        if not result or not body:
+
+        except BoAServiceError as e:
+            logger.error(f"Service error initiating money send: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Empty response from BoA API"
+                detail=str(e)
             )
 
-        
-        return BoATransferResponse(
-            success=True,
-            boa_reference=header.get("id"),
-            unique_identifier=header.get("uniqueIdentifier"),
-            transaction_status=header.get("transactionStatus"),
-            response=result
-        )
-
-    except BoAServiceError as e:
-        logger.error(f"Service error initiating money send: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    return await run_idempotent("boa:transfer:money-send", idempotency_key, request, send)
 
 # Status and Inquiry Endpoints
 
@@ -393,28 +364,20 @@ async def check_transaction_status(
     try:
         # change the implementation to boa_api service direct call
         result = await boa_api.check_transaction_status(transaction_id)
-        print(result)
-        header = result.get("header", {})
-        body = result.get("body", {})
-        status_code = result.get("http_status", 200)
-        if(status_code != 200):
-            try:
-                error_message = result.get("error",{}).get("message", "Try again later")
-            except:
-                error_message = "Try again later"
-            return JSONResponse(
-                status_code = status_code,
-                content = {
-                    "success" : False,
-                    "message" : error_message
-                }
-            )
-        if not result:
+        if result.http_status != 200:
+            return _boa_error_response(result)
+
+        status_data = result.first()
+        if not status_data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Transaction not found or API error"
             )
-        return BoAStatusResponse(**result)
+        return BoAStatusResponse(
+            id=status_data.id,
+            boa_reference=status_data.boa_reference,
+            status=status_data.status
+        )
     except BoAServiceError as e:
         logger.error(f"Service error checking transaction status: {str(e)}")
         raise HTTPException(
@@ -428,33 +391,19 @@ async def get_currency_rate(
     db: Session = Depends(get_db)
 ):
     try:
-        # change the implementation to boa_api service direct call
-        result = await boa_api.get_currency_rate(base_currency.upper())
-        body = result.get("body",[])
-        status_code = result.get("http_status", 200)
-        if(status_code != 200):
-            try:
-                error_message = result.get("error",{}).get("message", "Try again later")
-            except:
-                error_message = "Try again later"
-            return JSONResponse(
-                status_code=status_code,
-                content={
-                    "success": False,
-                    "message": error_message,                  
-                }
-            )
-        if not result or not body:
+        rate, failure = await BoARateService.get_rate(base_currency.upper())
+        if failure is not None:
+            if failure.http_status != 200:
+                return _boa_error_response(failure)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Currency rate not found or API error"
             )
-        currency_data = body[0]
         result_modified = {
-            "currency_code" : currency_data.get("currencyCode", "Unknown"),
-            "currency_name" : currency_data.get("currencyName", "Unknown"),
-            "buy_rate" : currency_data.get("buyRate", 0.00),
-            "sell_rate" : currency_data.get("sellRate", 0.00)
+            "currency_code" : rate["currency_code"] or "Unknown",
+            "currency_name" : rate["currency_name"] or "Unknown",
+            "buy_rate" : rate["buy_rate"] or 0.00,
+            "sell_rate" : rate["sell_rate"] or 0.00
         }
         return BoACurrencyRateResponse(**result_modified)
     except BoAServiceError as e:
@@ -469,33 +418,17 @@ async def get_balance(
 ):
 
     try:
-        # change the implementation to boa_api service direct call
-        result = await boa_api.get_balance()
-        header = result.get("header", {})
-        body = result.get("body", [])
-        status_code = result.get("http_status", 200)
-        if (status_code != 200):
-            try:
-                error_message = result.get("error", {}).get("message", "Try again later")
-            except:
-                error_message = "Try again later"
-            return JSONResponse(
-                status_code=status_code,
-                content={
-                    "success" : False,
-                    "message" : error_message
-                }
-            )
-        
-        if not result or not body:
+        balance, failure = await BoARateService.get_balance(db)
+        if failure is not None:
+            if failure.http_status != 200:
+                return _boa_error_response(failure)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Balance not found or API error"
             )
-        balance_data = body[0]
         result_modified = {
-            "account_currency" : balance_data.get("accountCurrency", "ETB"),
-            "balance" : balance_data.get("workingBalance", 0.00)
+            "account_currency" : balance["account_currency"] or "ETB",
+            "balance" : balance["balance"] or 0.00
         }
         return BoABalanceResponse(**result_modified)
     except BoAServiceError as e:
@@ -505,38 +438,53 @@ async def get_balance(
             detail=str(e)
         )
 
+@router.get("/balance/latest", response_model=BoALatestBalanceResponse, summary="Get Latest Recorded Balance", description="Returns the most recent settlement balance reading without calling Bank of Abyssinia.")
+async def get_latest_balance(
+    currency: str = Query("ETB", description="Account currency"),
+    db: Session = Depends(get_db)
+):
+    reading = await BoABalanceService.latest(db, currency.upper())
+    if reading is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No balance has been recorded yet"
+        )
+    return BoALatestBalanceResponse(**reading)
+
+@router.get("/balance/history", response_model=List[BoABalancePointResponse], summary="Get Balance History", description="Returns the settlement balance time series at minute or hour resolution, oldest first.")
+def get_balance_history(
+    currency: str = Query("ETB", description="Account currency"),
+    resolution: str = Query("minute", pattern="^(minute|hour)$", description="Bucket size"),
+    since: Optional[datetime] = Query(None, description="Only buckets starting at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only buckets starting before this time (UTC)"),
+    limit: int = Query(1440, ge=1, le=10000, description="Maximum number of buckets, newest kept"),
+    db: Session = Depends(get_db)
+):
+    return BoABalanceService.history(db, currency.upper(), resolution, since, until, limit)
+
 @router.get("/banks", response_model=List[BoABankListResponse], summary="Get Bank List", description="Retrieves the complete list of Ethiopian banks supported for inter-bank transfers via EthSwitch.")
 async def get_bank_list(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    
+    # Served from the in-memory snapshot the scheduler keeps fresh; only an
+    # empty snapshot (cold start with an empty table) goes to BoA
     try:
-        result = await boa_api.get_bank_list()
-        print(result)
-        boa_banks = result.get("body", [])
-        status_code = result.get("http_status", 200)
-        if (status_code != 200):
-            try:
-                error_message = result.get("error", {}).get("message", "Try again later")
-            except:
-                error_message = "Try again later"
-            return JSONResponse(
-                status_code=status_code,
-                content={
-                    "success" : False,
-                    "message" : error_message
-                }
-            )
-        modified_list = [
-            {
-                "bank_id": bank["id"],
-                "institution_name": bank["institutionName"]
-            }
-            for bank in boa_banks
-        ]
-
-        # Return Pydantic validated list
-        return [BoABankListResponse(**bank) for bank in modified_list]
+        if not BoABankService.load_snapshot(db):
+            summary, failure = await BoABankService.sync_bank_list(db)
+            if failure:
+                return _boa_error_response(failure)
+
+        headers = {
+            "ETag": bank_list_snapshot.etag,
+            "Cache-Control": f"public, max-age={settings.BOA_BANK_LIST_MAX_AGE}"
+        }
+        if request.headers.get("if-none-match") == bank_list_snapshot.etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response.headers.update(headers)
+        return bank_list_snapshot.banks
     except BoAServiceError as e:
         logger.error(f"Service error getting bank list: {str(e)}")
         raise HTTPException(
@@ -552,13 +500,13 @@ async def refresh_bank_list(
 ):
 
     try:
-        # change the implementation to boa_api service direct call
-        result = await boa_api.get_bank_list()
-        # result = await BoABankService.get_bank_list(db)
+        summary, failure = await BoABankService.sync_bank_list(db)
+        if failure:
+            return _boa_error_response(failure)
         return {
             "message": "Bank list refreshed successfully",
-            "banks_count": len(result),
-            "banks": result
+            "banks_count": len(summary["banks"]),
+            **summary
         }
     except BoAServiceError as e:
         logger.error(f"Service error refreshing bank list: {str(e)}")
@@ -1,7 +1,8 @@
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date
+from sqlalchemy import and_, func, select, true
 from datetime import datetime, timedelta
 from typing import List, Optional
 from app.database.database import get_db
@@ -16,10 +17,12 @@ from app.models.transactions import Transaction
 from app.models.users import User, Role
 from app.models.manual_deposits import ManualDeposit
 from app.models.kyc_documents import KYCDocument
+from app.models.dashboard_stats import DailyTransactionStats, DailyUserSignups
 from app.security import JWTBearer, get_current_user
 from sqlalchemy.orm import joinedload
 from app.schemas.kyc_documents import KYCDocumentUser
 from app.schemas.dashboard import MetricWithChange
+from app.utils.response_cache import dashboard_cache
 
 
 router = APIRouter()
@@ -30,64 +33,66 @@ def require_admin(user: User = Depends(get_current_user)) -> User:
         raise HTTPException(status_code=403, detail="Not authorized to view dashboard")
     return user
 
+def _authorize_summary(db: Session, token: dict) -> None:
+    user = get_current_user(db,token)
+    if user.role not in [Role.admin, Role.finance_officer, Role.support]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+
+# The aggregates are served from dashboard_cache, so every open admin tab does not rerun them.
+# Callers are authorized on each request before the cache is consulted.
 @router.get("/summary", response_model=SummaryMetrics)
-def get_summary_metrics(
+async def get_summary_metrics(
     db: Session = Depends(get_db),
     token: dict = Depends(JWTBearer())
 ):
-    user = get_current_user(db,token)
-    if user.role not in [Role.admin, Role.finance_officer, Role.support]:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    await asyncio.to_thread(_authorize_summary, db, token)
+    return await dashboard_cache.get_or_compute("summary", {}, lambda: summary_metrics(db))
+
+
+def summary_metrics(db: Session) -> SummaryMetrics:
     today = datetime.utcnow().date()
+    yesterday = today - timedelta(days=1)
     week_ago = today - timedelta(days=7)
     previous_week = week_ago - timedelta(days=7)
 
-    # Current totals
-    total_etb = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.status == 'completed',
-        Transaction.currency == 'ETB'
-    ).scalar() or 0
-
-    total_tx = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.status == 'completed'
-    ).scalar() or 0
-
-    today_tx = db.query(func.sum(Transaction.amount)).filter(
-        func.date(Transaction.created_at) == today,
-        Transaction.status == 'completed'
-    ).scalar() or 0
-
-    pending_deposits = db.query(ManualDeposit).filter(ManualDeposit.completed == False).count()
-
-    total_users = db.query(func.count(User.user_id)).scalar() or 0
-
-    # Previous week values for change %
-    previous_total_etb = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.status == 'completed',
-        Transaction.currency == 'ETB',
-        Transaction.created_at >= previous_week,
-        Transaction.created_at < week_ago
-    ).scalar() or 0
-
-    previous_total_tx = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.status == 'completed',
-        Transaction.created_at >= previous_week,
-        Transaction.created_at < week_ago
-    ).scalar() or 0
-
-    previous_today_tx = db.query(func.sum(Transaction.amount)).filter(
-        func.date(Transaction.created_at) == today - timedelta(days=1),
-        Transaction.status == 'completed'
-    ).scalar() or 0
-
-    previous_pending_deposits = db.query(ManualDeposit).filter(
-        ManualDeposit.completed == False,
-        ManualDeposit.created_at < week_ago
-    ).count()
-
-    previous_total_users = db.query(func.count(User.user_id)).filter(
-        User.created_at < week_ago
-    ).scalar() or 0
+    stats = DailyTransactionStats
+    in_previous_week = and_(stats.stat_date >= previous_week, stats.stat_date < week_ago)
+    is_etb = stats.currency == 'ETB'
+
+    # Every transaction metric from one pass over the completed daily rollups
+    tx = db.query(
+        func.sum(stats.amount).filter(is_etb).label("total_etb"),
+        func.sum(stats.amount).label("total_tx"),
+        func.sum(stats.amount).filter(stats.stat_date == today).label("today_tx"),
+        func.sum(stats.amount).filter(is_etb, in_previous_week).label("previous_total_etb"),
+        func.sum(stats.amount).filter(in_previous_week).label("previous_total_tx"),
+        func.sum(stats.amount).filter(stats.stat_date == yesterday).label("previous_today_tx"),
+    ).filter(stats.status == 'completed').one()
+
+    # Open deposits and signups: two single-row aggregates read in one statement
+    deposits = select(
+        func.count().label("pending_deposits"),
+        func.count().filter(ManualDeposit.created_at < week_ago).label("previous_pending_deposits"),
+    ).where(ManualDeposit.completed == False).subquery()
+    users = select(
+        func.coalesce(func.sum(DailyUserSignups.signup_count), 0).label("total_users"),
+        func.coalesce(
+            func.sum(DailyUserSignups.signup_count).filter(DailyUserSignups.stat_date < week_ago), 0
+        ).label("previous_total_users"),
+    ).subquery()
+    counts = db.execute(select(deposits, users).select_from(deposits.join(users, true()))).one()
+
+    total_etb = tx.total_etb or 0
+    total_tx = tx.total_tx or 0
+    today_tx = tx.today_tx or 0
+    previous_total_etb = tx.previous_total_etb or 0
+    previous_total_tx = tx.previous_total_tx or 0
+    previous_today_tx = tx.previous_today_tx or 0
+    pending_deposits = counts.pending_deposits
+    previous_pending_deposits = counts.previous_pending_deposits
+    total_users = counts.total_users
+    previous_total_users = counts.previous_total_users
 
     # Helper to calculate % change
     def calc_change(current, previous):
@@ -120,65 +125,76 @@ def get_summary_metrics(
 
 
 @router.get("/daily-transactions", response_model=List[DailyTransaction])
-def get_daily_transactions(
+async def get_daily_transactions(
     db: Session = Depends(get_db),
     token: dict = Depends(JWTBearer()),
     days: int = 10
 ):
-    _ = get_current_user(db, token)
+    _ = await asyncio.to_thread(get_current_user, db, token)
+    return await dashboard_cache.get_or_compute(
+        "daily-transactions", {"days": days}, lambda: daily_transactions(db, days)
+    )
+
+
+def daily_transactions(db: Session, days: int) -> List[DailyTransaction]:
     start_date = datetime.utcnow().date() - timedelta(days=days)
 
     result = db.query(
-        cast(Transaction.created_at, Date).label("date"),
-        func.sum(Transaction.amount).label("amount")
+        DailyTransactionStats.stat_date.label("date"),
+        func.sum(DailyTransactionStats.amount).label("amount")
     ).filter(
-        Transaction.created_at >= start_date,
-        Transaction.status == 'completed'
+        DailyTransactionStats.stat_date >= start_date,
+        DailyTransactionStats.status == 'completed',
+        DailyTransactionStats.transaction_count > 0
     ).group_by(
-        cast(Transaction.created_at, Date)
+        DailyTransactionStats.stat_date
     ).order_by(
-        cast(Transaction.created_at, Date)
+        DailyTransactionStats.stat_date
     ).all()
 
     return [DailyTransaction(date=row.date, amount=row.amount or 0) for row in result]
 
 
 @router.get("/users-over-time", response_model=UsersOverTimeResponse)
-def get_users_over_time(
+async def get_users_over_time(
     db: Session = Depends(get_db),
     token: dict = Depends(JWTBearer()),
     days: int = 14
 ):
-    _ = get_current_user(db, token)
+    _ = await asyncio.to_thread(get_current_user, db, token)
+    return await dashboard_cache.get_or_compute(
+        "users-over-time", {"days": days}, lambda: users_over_time(db, days)
+    )
+
+
+def users_over_time(db: Session, days: int) -> UsersOverTimeResponse:
     today = datetime.utcnow().date()
     start_date = today - timedelta(days=days)
     week_start = today - timedelta(days=7)
+    previous_week_start = week_start - timedelta(days=7)
 
-    daily_data = db.query(
-        cast(User.created_at, Date).label("date"),
-        func.count(User.user_id).label("count")
-    ).filter(
-        User.created_at >= start_date
-    ).group_by(
-        cast(User.created_at, Date)
-    ).order_by(
-        cast(User.created_at, Date)
-    ).all()
+    # One read of the signup rollup covers the chart and both week totals
+    signups = {
+        row.stat_date: row.signup_count
+        for row in db.query(DailyUserSignups.stat_date, DailyUserSignups.signup_count).filter(
+            DailyUserSignups.stat_date >= min(start_date, previous_week_start)
+        )
+    }
 
-    daily_counts = [DailyUserCount(date=row.date, count=row.count) for row in daily_data]
+    daily_counts = [
+        DailyUserCount(date=stat_date, count=count)
+        for stat_date, count in sorted(signups.items())
+        if stat_date >= start_date and count
+    ]
 
-    today_total = db.query(func.count(User.user_id))\
-        .filter(func.date(User.created_at) == today)\
-        .scalar() or 0
+    today_total = signups.get(today, 0)
 
-    week_total = db.query(func.count(User.user_id))\
-        .filter(User.created_at >= week_start)\
-        .scalar() or 0
+    week_total = sum(count for stat_date, count in signups.items() if stat_date >= week_start)
 
-    previous_week_total = db.query(func.count(User.user_id))\
-        .filter(User.created_at >= week_start - timedelta(days=7),
-                User.created_at < week_start)\
-        .scalar() or 0
+    previous_week_total = sum(
+        count for stat_date, count in signups.items()
+        if previous_week_start <= stat_date < week_start
+    )
 
     percentage_change = (
         ((week_total - previous_week_total) / previous_week_total) * 100
@@ -9,7 +9,11 @@ from app.models.users import User, Role
 from app.schemas.manual_deposits import ManualDepositResponse, ManualDepositUpdate, ManualDepositResponseList
 from app.security import JWTBearer, get_current_user
 from datetime import datetime
-from app.models.notifications import Notification, ChannelType
+from app.models.notifications import ChannelType
+from app.utils.outbox import enqueue_notification
+from app.utils.transaction_totals import record_transaction
+from app.utils.spend_limits import adjust_spend, counts_towards_limit
+from app.utils.transfer_worker import transfer_started
 
 import os
 import shutil
@@ -72,29 +76,28 @@ def update_manual_deposit(
         if completed:
             transaction = db.query(Transaction).filter(Transaction.transaction_id == deposit.transaction_id).first()
             if transaction:
+                if not counts_towards_limit(transaction.status):
+                    adjust_spend(db, [transaction])
                 transaction.status = TransactionStatus.completed
                 if not transaction.completed_at:
                     transaction.completed_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(deposit)
-
-    # Ensure user is attached for response schema
-    deposit.user = deposit.transaction.user
-     # ✅ Create notification for the user
+    # ✅ Queue the user's notification in the same commit as the approval
     if completed:
-        user = deposit.transaction.user
-        notification = Notification(
-            user_id=user.user_id,
+        enqueue_notification(
+            db,
+            user_id=deposit.transaction.user_id,
             title="Manual Deposit Approved",
             message=f"Your failed Transaction request with ID #{deposit.transaction_id} has been approved and processed successfully.",
-            channel=ChannelType.push,  # or email/sms depending on your preference
             type="deposit_update",
-            is_sent=True,  # Set to True if you don't have sending logic yet
-            sent_at=datetime.utcnow()
+            channels=(ChannelType.push, ChannelType.email)
         )
-        db.add(notification)
-        db.commit()
+
+    db.commit()
+    db.refresh(deposit)
+
+    # Ensure user is attached for response schema
+    deposit.user = deposit.transaction.user
 
     return deposit
 from fastapi import status
@@ -116,7 +119,12 @@ def delete_manual_deposit(
 
     # Delete related transaction first (if it exists)
     transaction = db.query(Transaction).filter(Transaction.transaction_id == deposit.transaction_id).first()
+    if transaction and transfer_started(db, transaction.transaction_id):
+        raise HTTPException(status_code=409, detail="Transaction has a BoA transfer and cannot be deleted")
     if transaction:
+        record_transaction(db, transaction, sign=-1)
+        if counts_towards_limit(transaction.status):
+            adjust_spend(db, [transaction], sign=-1)
         db.delete(transaction)
 
     # Delete deposit proof image if exists
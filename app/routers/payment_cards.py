@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
@@ -8,28 +9,52 @@ from app.models.payment_cards import PaymentCard
 from app.schemas.payment_cards import PaymentCardCreate, PaymentCardUpdate, PaymentCardResponse
 from app.models.users import User
 from app.security import JWTBearer, get_current_user  # Use your actual token-based auth dependency
+from app.utils.stripe_client import get_stripe_client
 import stripe
-from app.core.config import settings  # Add this if you're using .env
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
 router = APIRouter()
 
+
+def _unset_default_cards(db: Session, user_id: int) -> None:
+    db.query(PaymentCard).filter(
+        PaymentCard.user_id == user_id,
+        PaymentCard.is_default == True
+    ).update({"is_default": False})
+
+
+def _save_card(db: Session, card: PaymentCard) -> PaymentCard:
+    db.add(card)
+    db.commit()
+    db.refresh(card)
+    return card
+
+
+def _default_card(db: Session, user_id: int):
+    return db.query(PaymentCard).filter(
+        PaymentCard.user_id == user_id,
+        PaymentCard.is_default == True,
+        PaymentCard.is_active == True
+    ).first()
+
+
 @router.post("", response_model=PaymentCardResponse)
-def create_payment_card(
+async def create_payment_card(
     payment_card: PaymentCardCreate,
     db: Session = Depends(get_db),
     token: dict = Depends(JWTBearer())
 ):
     try:
-        current_user = get_current_user(db, token)
-        # Step 1: Create Stripe customer if needed
+        # Database work runs in a worker thread so awaiting Stripe never blocks the event loop
+        current_user = await asyncio.to_thread(get_current_user, db, token)
+        stripe_client = get_stripe_client()
+        # Step 1: Create Stripe customer if needed; an existing one is only needed by id
 
-        if not current_user.stripe_customer_id:
-            customer = stripe.Customer.create(email=current_user.email)
-            current_user.stripe_customer_id = customer.id
-            db.commit()
-        else:
-            customer = stripe.Customer.retrieve(current_user.stripe_customer_id)
+        customer_id = current_user.stripe_customer_id
+        if not customer_id:
+            customer = await stripe_client.customers.create_async({"email": current_user.email})
+            customer_id = customer.id
+            current_user.stripe_customer_id = customer_id
+            await asyncio.to_thread(db.commit)
 
         # Step 2: Attach payment method to customer
         # if you get demo payment method from the above create_stripe_payment_method function and pass 
@@ -37,32 +62,36 @@ def create_payment_card(
         # commented block is for test token only we must use the below code in production
         try:
             
-            stripe.PaymentMethod.attach(
+            method = await stripe_client.payment_methods.attach_async(
                 payment_card.stripe_payment_method_id,
-                customer=customer.id,
+                {"customer": customer_id},
             )
         except stripe.error.StripeError as e:
             raise HTTPException(status_code=400, detail=f"Stripe error: {e.user_message}")
 
-        # Step 3: Set as default if specified
+        # Step 3: Set as default if specified. Stripe only accepts an attached method as the
+        # default, so this follows the attach; the user's other cards are unset meanwhile
+        # and committed together with the new card
         if payment_card.is_default:
-            stripe.Customer.modify(
-                customer.id,
-                invoice_settings={"default_payment_method": payment_card.stripe_payment_method_id},
+            # Both are waited for before an error is raised, so the session is idle again
+            results = await asyncio.gather(
+                stripe_client.customers.update_async(
+                    customer_id,
+                    {"invoice_settings": {"default_payment_method": payment_card.stripe_payment_method_id}},
+                ),
+                asyncio.to_thread(_unset_default_cards, db, current_user.user_id),
+                return_exceptions=True,
             )
-            db.query(PaymentCard).filter(
-                PaymentCard.user_id == current_user.user_id,
-                PaymentCard.is_default == True
-            ).update({"is_default": False})
-            db.commit()
-
-        # Step 4: Retrieve card metadata from Stripe
-        method = stripe.PaymentMethod.retrieve(payment_card.stripe_payment_method_id)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+        # Step 4: Card metadata comes back on the attached payment method
         card_info = method.card
 
         new_card = PaymentCard(
             user_id=current_user.user_id,
-            stripe_customer_id=customer.id,
+            stripe_customer_id=customer_id,
             stripe_payment_method_id=payment_card.stripe_payment_method_id,
             brand=card_info.brand,
             last4=card_info.last4,
@@ -73,11 +102,7 @@ def create_payment_card(
             card_type=payment_card.card_type,
         )
 
-        db.add(new_card)
-        db.commit()
-        db.refresh(new_card)
-        
-        return new_card
+        return await asyncio.to_thread(_save_card, db, new_card)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal_server_error")
 @router.get("", response_model=List[PaymentCardResponse])
@@ -201,7 +226,7 @@ async def pay_with_card(
     token: dict = Depends(JWTBearer()),
     db: Session = Depends(get_db) 
 ):
-    current_user = get_current_user(db, token)
+    current_user = await asyncio.to_thread(get_current_user, db, token)
     if(current_user is None):
         raise HTTPException(status_code=401, detail="Unauthorized")
     try:
@@ -209,26 +234,23 @@ async def pay_with_card(
         stripe_customer_id = current_user.stripe_customer_id
         if not stripe_customer_id:
             raise HTTPException(status_code=400, detail="Customer ID not found")
-        card = db.query(PaymentCard).filter(
-            PaymentCard.user_id == current_user.user_id,
-            PaymentCard.is_default == True,
-            PaymentCard.is_active == True
-        ).first()
+        card = await asyncio.to_thread(_default_card, db, current_user.user_id)
         if not card:
             raise HTTPException(status_code=400, detail="No default payment card found")
-        intent = stripe.PaymentIntent.create(
-            amount=int(amount),
-            currency="usd",
-            customer=stripe_customer_id,
-            payment_method=card.stripe_payment_method_id,
-            confirm=True,
-            automatic_payment_methods={
+        # The charge is expanded onto the intent instead of fetched with a second call
+        intent = await get_stripe_client().payment_intents.create_async({
+            "amount": int(amount),
+            "currency": "usd",
+            "customer": stripe_customer_id,
+            "payment_method": card.stripe_payment_method_id,
+            "confirm": True,
+            "automatic_payment_methods": {
                 "enabled": True,
                 "allow_redirects": "never"
-            }
-        )
-        charge = stripe.Charge.retrieve(intent["latest_charge"])
-        receipt_url = charge["receipt_url"]
+            },
+            "expand": ["latest_charge"],
+        })
+        receipt_url = intent["latest_charge"]["receipt_url"]
 
         return {
             "message": "Payment successful",
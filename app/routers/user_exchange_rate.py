@@ -16,6 +16,7 @@ from app.schemas.exchange_rates import (
 from app.models.transaction_fees import TransactionFees
 
 from app.security import JWTBearer, get_current_user
+from app.utils.transaction_totals import get_balance_totals
 from app.models.users import User, Role
 from app.models.transactions import Transaction, TransactionStatus
 from sqlalchemy.orm import Session
@@ -44,26 +45,18 @@ def get_user_stripe_balance(
     """
     Get user's Stripe balance information including current balance and growth percentage.
     Returns data in a format suitable for displaying as a balance insight card.
+    Growth compares this calendar month so far with last month.
     """
-    # Get successful transactions
     current_user = get_current_user(db, token)
-    successful_transactions = db.query(Transaction)\
-        .filter(
-            Transaction.user_id == current_user.user_id,
-            # Add any additional filters for successful transactions here
-        ).all()
-
-    # Calculate total amount
-    total_amount = sum(t.amount + (t.transfer_fee or Decimal(0)) for t in successful_transactions)
-    
-    # For demonstration, using a fixed growth percentage - you might calculate this based on previous period
-    growth_percentage = 4.3  # In a real app, this would be calculated from historical data
+    totals = get_balance_totals(db, current_user.user_id)
+    # Keeps the totals row if this was the user's first read
+    db.commit()
 
     return {
         "title": "Insight",
-        "current_balance": round(total_amount, 2),
+        "current_balance": round(totals.total_amount, 2),
         "currency": "birr",  
-        "growth_percentage": growth_percentage,
+        "growth_percentage": totals.growth_percentage,
         
     }
 
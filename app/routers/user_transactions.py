@@ -1,11 +1,13 @@
 # app/routers/user_transactions.py
-from fastapi import APIRouter, Depends, HTTPException, logger, status, Form
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, logger, status, Form, Header, Query, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 from app.database.database import get_db
 from app.models.transactions import Transaction, TransactionStatus
-from app.schemas.transactions import TransactionCreate, TransactionResponse, AccountType, TransactionUpdate
+from app.schemas.transactions import TransactionCreate, TransactionResponse, AccountType, TransactionUpdate, TransferJobResponse
 from decimal import Decimal
 from app.security import JWTBearer, get_current_user
 from app.models.users import User, Role
@@ -13,15 +15,60 @@ from app.models.payment_cards import PaymentCard
 import stripe
 import os
 from app.core.config import settings 
-from app.models.notifications import Notification, ChannelType
 from app.utils.boa_service import BoABeneficiaryService, BoAServiceError
+from app.models.transfer_jobs import TransferJob
+from app.utils.transfer_pipeline import TransferPipelineError
+from app.utils.transfer_worker import enqueue_transfer, transfer_worker
+from app.utils.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
+from app.utils.stripe_client import get_stripe_client
+from app.utils.outbox import enqueue_notification
+from app.utils.transaction_totals import record_transaction
+from app.utils.spend_limits import WeeklyLimitExceeded, release_weekly_spend, reserve_weekly_spend
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursorError, collection_etag, keyset_page
+)
 
 
 
 router = APIRouter()
-stripe.api_key = settings.STRIPE_SECRET_KEY
+
+
+def _owned_card(db: Session, payment_card_id: int, user_id: int) -> Optional[PaymentCard]:
+    return db.query(PaymentCard).filter(
+        PaymentCard.payment_card_id == payment_card_id,
+        PaymentCard.user_id == user_id
+    ).first()
+
+
+def _save_transaction(db: Session, transaction: Transaction, amount: Decimal, currency: str) -> Transaction:
+    """Record the transaction with its totals and notification in one commit; its weekly spend is already reserved"""
+    try:
+        db.add(transaction)
+        record_transaction(db, transaction)
+
+        # 5. Queue the notification with the transaction
+        enqueue_notification(
+            db,
+            user_id=transaction.user_id,
+            title="Transaction Created",
+            message=f"Your transaction with Amount: {amount} {currency} has been created and is pending.",
+            type="transaction_created"
+        )
+
+        db.commit()
+        db.refresh(transaction)
+
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Transaction creation failed: {str(e)}"
+        )
+    return transaction
+
+
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-def create_user_transaction(
+async def create_user_transaction(
     amount: Decimal = Form(...),
     currency: str = Form("usd"),
     transaction_reference: Optional[str] = Form(...),
@@ -47,10 +94,12 @@ def create_user_transaction(
 ):
     """
     Create a new transaction using either a saved card or manual card entry.
+    Database work runs in a worker thread so awaiting Stripe never blocks
+    the event loop.
     """
 
     # 🚫 Prevent admins from using this endpoint
-    current_user = get_current_user(db, token)
+    current_user = await asyncio.to_thread(get_current_user, db, token)
     if current_user.role == Role.admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -68,13 +117,9 @@ def create_user_transaction(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Amount must be greater than zero."
         )
-
     if payment_card_id:
         # ✅ Use saved card
-        card = db.query(PaymentCard).filter(
-            PaymentCard.payment_card_id == payment_card_id,
-            PaymentCard.user_id == current_user.user_id
-        ).first()
+        card = await asyncio.to_thread(_owned_card, db, payment_card_id, current_user.user_id)
 
         if not card:
             raise HTTPException(
@@ -85,225 +130,147 @@ def create_user_transaction(
         payment_method_id = card.stripe_payment_method_id
 
         customer_id = card.stripe_customer_id
-        
-
-        # Stripe logic for saved card
-        try:
-            payment_intent = stripe.PaymentIntent.create(
-                amount=stripe_amount,
-                currency=currency.lower(),
-                customer=customer_id,
-                payment_method=payment_method_id,
-                confirm=True,
-                automatic_payment_methods={"enabled": True, "allow_redirects": "never"},
-                metadata={
-                    "user_id": str(current_user.user_id),
-                    "transaction_reference": transaction_reference,
-                }
-            )
-            stripe_charge_id = payment_intent.id
-        except stripe.error.StripeError as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stripe payment failed: {e.user_message or str(e)}"
-            )
-
-        transaction = Transaction(
-            amount=amount,
-            transfer_fee=transfer_fee,
-            currency=currency,
-            transaction_reference=transaction_reference,
-            payment_card_id=payment_card_id,
-            stripe_charge_id=stripe_charge_id,
-            full_name=full_name,
-            account_type=account_type,
-            bank_name=bank_name,
-            account_number=account_number,
-            telebirr_number=telebirr_number,
-            user_id=current_user.user_id,
-            status=TransactionStatus.pending
-        )
-    elif card_number:
-        # ✅ Use manual card (not Stripe, just save info)
-        transaction = Transaction(
-            amount=amount,
-            transfer_fee=transfer_fee,
-            currency=currency,
-            transaction_reference=transaction_reference,
-            payment_card_id=None,
-            stripe_charge_id=None,
-            full_name=full_name,
-            account_type=account_type,
-            bank_name=bank_name,
-            account_number=account_number,
-            telebirr_number=telebirr_number,
-            user_id=current_user.user_id,
-            status=TransactionStatus.pending,
-            is_manual=True,
-            manual_card_number=card_number,
-            # manual_card_exp_month=exp_month,
-            manual_card_exp_year=exp_year,
-            manual_card_cvc=cvc,
-            manual_card_country=country,
-            manual_card_zip=zip
-        )
-    else:
+    elif not card_number:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You must provide either a payment_card_id or a manual card number."
         )
 
+    # The amount is reserved in the user's weekly spend and committed before
+    # the card is charged, so no lock is held while Stripe answers; it is
+    # given back if the transaction is not created
     try:
-        db.add(transaction)
-
-        # 5. Create Notification
-        notification = Notification(
-            user_id=current_user.user_id,
-            title="Transaction Created",
-            message=f"Your transaction with Amount: {amount} {currency} has been created and is pending.",
-            channel=ChannelType.push,
-            type="transaction_created",
-            is_sent=True,
-            sent_at=datetime.utcnow()
-        )
-        db.add(notification)
-
-        db.commit()
-        db.refresh(transaction)
-
-    except Exception as e:
-        db.rollback()
+        reservation = await asyncio.to_thread(reserve_weekly_spend, db, current_user, amount)
+    except WeeklyLimitExceeded as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Transaction creation failed: {str(e)}"
-        )
-
-    return transaction
-
-@router.post("/{transaction_id}/process-boa-transfer")
-async def process_boa_transfer(
-    transaction_id: int,
-    db: Session = Depends(get_db),
-    token: dict = Depends(JWTBearer())
-):
-    """
-    Process a transaction through Bank of Abyssinia API
-    """
-    # Get the transaction
-    current_user = get_current_user(db, token)
-    transaction = db.query(Transaction).filter(
-        Transaction.transaction_id == transaction_id,
-        Transaction.user_id == current_user.user_id
-    ).first()
-
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transaction not found"
-        )
-
-    if transaction.status != TransactionStatus.pending:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Transaction is not in pending status"
+            detail=str(e)
         )
 
     try:
-        # Validate beneficiary if it's a bank transfer
-        if transaction.account_type == AccountType.bank_account and transaction.account_number:
-            beneficiary_result = await BoABeneficiaryService.fetch_beneficiary_name(
-                transaction.account_number, db
-            )
-
-            if not beneficiary_result:
+        if payment_card_id:
+            # Stripe logic for saved card
+            try:
+                payment_intent = await get_stripe_client().payment_intents.create_async({
+                    "amount": stripe_amount,
+                    "currency": currency.lower(),
+                    "customer": customer_id,
+                    "payment_method": payment_method_id,
+                    "confirm": True,
+                    "automatic_payment_methods": {"enabled": True, "allow_redirects": "never"},
+                    "metadata": {
+                        "user_id": str(current_user.user_id),
+                        "transaction_reference": transaction_reference,
+                    }
+                })
+                stripe_charge_id = payment_intent.id
+            except stripe.error.StripeError as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Unable to verify beneficiary account"
+                    detail=f"Stripe payment failed: {e.user_message or str(e)}"
                 )
 
-        # Process the transfer based on account type
-        if transaction.account_type == AccountType.bank_account:
-            # Within BoA transfer
-            transfer_result = await BoABeneficiaryService.fetch_beneficiary_name(
-                transaction.account_number, db
+            transaction = Transaction(
+                amount=amount,
+                transfer_fee=transfer_fee,
+                currency=currency,
+                transaction_reference=transaction_reference,
+                payment_card_id=payment_card_id,
+                stripe_charge_id=stripe_charge_id,
+                full_name=full_name,
+                account_type=account_type,
+                bank_name=bank_name,
+                account_number=account_number,
+                telebirr_number=telebirr_number,
+                user_id=current_user.user_id,
+                status=TransactionStatus.pending,
+                created_at=reservation.created_at
             )
-
-            if transfer_result and transfer_result.get("account_currency") == "ETB":
-                # This is a BoA account, use within BoA transfer
-                from app.utils.boa_service import BoATransferService
-
-                boa_result = await BoATransferService.initiate_within_boa_transfer(
-                    transaction_id=transaction_id,
-                    amount=str(transaction.amount),
-                    account_number=transaction.account_number,
-                    reference=transaction.transaction_reference or f"TXN{transaction_id}",
-                    db=db
-                )
-
-                # Update transaction status
-                transaction.status = TransactionStatus.completed
-                transaction.completed_at = datetime.utcnow()
-
-                # Create success notification
-                notification = Notification(
-                    user_id=current_user.user_id,
-                    title="Transfer Completed",
-                    message=f"Your transfer of {transaction.amount} {transaction.currency} to {beneficiary_result.get('customer_name', 'beneficiary')} has been completed successfully.",
-                    channel=ChannelType.push,
-                    type="transfer_completed",
-                    is_sent=True,
-                    sent_at=datetime.utcnow()
-                )
-                db.add(notification)
-
-            else:
-                # Other bank transfer - would need bank ID from user
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Other bank transfers require bank selection. Please contact support."
-                )
-
-        elif transaction.account_type == AccountType.telebirr:
-            # For telebirr, we could integrate with mobile money APIs
-            # For now, mark as completed (this would be replaced with actual API call)
-            transaction.status = TransactionStatus.completed
-            transaction.completed_at = datetime.utcnow()
-
-            # Create success notification
-            notification = Notification(
+        else:
+            # ✅ Use manual card (not Stripe, just save info)
+            transaction = Transaction(
+                amount=amount,
+                transfer_fee=transfer_fee,
+                currency=currency,
+                transaction_reference=transaction_reference,
+                payment_card_id=None,
+                stripe_charge_id=None,
+                full_name=full_name,
+                account_type=account_type,
+                bank_name=bank_name,
+                account_number=account_number,
+                telebirr_number=telebirr_number,
                 user_id=current_user.user_id,
-                title="Mobile Money Transfer Completed",
-                message=f"Your mobile money transfer of {transaction.amount} {transaction.currency} has been completed successfully.",
-                channel=ChannelType.push,
-                type="transfer_completed",
-                is_sent=True,
-                sent_at=datetime.utcnow()
+                status=TransactionStatus.pending,
+                created_at=reservation.created_at,
+                is_manual=True,
+                manual_card_number=card_number,
+                # manual_card_exp_month=exp_month,
+                manual_card_exp_year=exp_year,
+                manual_card_cvc=cvc,
+                manual_card_country=country,
+                manual_card_zip=zip
             )
-            db.add(notification)
 
-        db.commit()
-        db.refresh(transaction)
+        return await asyncio.to_thread(_save_transaction, db, transaction, amount, currency)
+    except BaseException:
+        await asyncio.to_thread(release_weekly_spend, db, reservation)
+        raise
 
-        return {
-            "message": "Transfer processed successfully",
-            "transaction_id": transaction_id,
-            "status": transaction.status.value,
-            "completed_at": transaction.completed_at
-        }
+@router.post(
+    "/{transaction_id}/process-boa-transfer",
+    response_model=TransferJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def process_boa_transfer(
+    transaction_id: int,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: Session = Depends(get_db),
+    token: dict = Depends(JWTBearer())
+):
+    """
+    Queue a transaction for processing through Bank of Abyssinia API.
+    Answers 202 with a job handle right away; poll
+    /transfer-jobs/{job_id} for the outcome.
+    Send an Idempotency-Key header to make retries safe.
+    """
+    current_user = await asyncio.to_thread(get_current_user, db, token)
 
-    except BoAServiceError as e:
-        logger.error(f"BoA service error processing transfer: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Transfer processing failed: {str(e)}"
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Error processing transfer: {str(e)}")
+    def enqueue() -> TransferJobResponse:
+        # Reading the committed job refreshes it, so that stays in the worker thread too
+        return TransferJobResponse.model_validate(enqueue_transfer(db, transaction_id, current_user.user_id))
+
+    async def process():
+        try:
+            job = await asyncio.to_thread(enqueue)
+        except TransferPipelineError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        transfer_worker.start()
+        return job
+
+    return await run_idempotent(
+        f"user:{current_user.user_id}:process-boa-transfer", idempotency_key,
+        {"transaction_id": transaction_id}, process, status_code=status.HTTP_202_ACCEPTED
+    )
+
+@router.get("/transfer-jobs/{job_id}", response_model=TransferJobResponse)
+def get_transfer_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    token: dict = Depends(JWTBearer())
+):
+    """Status of a transfer queued by process-boa-transfer"""
+    current_user = get_current_user(db, token)
+    job = db.query(TransferJob).filter(
+        TransferJob.id == job_id,
+        TransferJob.user_id == current_user.user_id
+    ).first()
+    if not job:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Transfer processing failed: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transfer job not found"
         )
+    return job
 
 @router.post("/{transaction_id}/validate-beneficiary")
 async def validate_beneficiary(
@@ -360,19 +327,49 @@ async def validate_beneficiary(
 
 @router.get("", response_model=List[TransactionResponse])
 def get_user_transactions(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     token: dict = Depends(JWTBearer())
 ):
     """
-    Get all transactions for the authenticated user
+    Get the authenticated user's transactions, newest first, one page at a time.
+    The next page's cursor is returned in the X-Next-Cursor header (absent on
+    the last page). Send the ETag back as If-None-Match to get 304 while the
+    history is unchanged.
     """
     current_user = get_current_user(db, token)
-    return db.query(Transaction)\
-        .options(joinedload(Transaction.payment_card))\
+    transactions = db.query(Transaction)\
         .filter(Transaction.user_id == current_user.user_id)\
-        .filter(Transaction.amount > 0)\
-        .order_by(Transaction.created_at.desc())\
-        .all()
+        .filter(Transaction.amount > 0)
+
+    latest_update, total = transactions.with_entities(
+        func.max(Transaction.updated_at), func.count(Transaction.transaction_id)
+    ).one()
+    headers = {
+        "ETag": collection_etag(current_user.user_id, latest_update, total, cursor, limit),
+        "Cache-Control": "private, no-cache"
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        page, next_cursor = keyset_page(
+            transactions.options(joinedload(Transaction.payment_card)),
+            Transaction.created_at,
+            Transaction.transaction_id,
+            cursor,
+            limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    response.headers.update(headers)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return page
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 def get_user_transaction(
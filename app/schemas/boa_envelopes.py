@@ -0,0 +1,190 @@
+# app/schemas/boa_envelopes.py
+
+from pydantic import BaseModel, ConfigDict, Field, BeforeValidator, field_validator
+from typing import Annotated, Any, Dict, Generic, List, Optional, TypeVar
+
+# Typed models for the raw Bank of Abyssinia API responses.
+# BankOfAbyssiniaAPI decodes each response once, straight from bytes, into one of
+# the envelope aliases at the bottom of this file; services and routers only
+# ever see these objects, never the raw JSON dict.
+
+BodyT = TypeVar("BodyT")
+
+
+def _as_list(value: Any) -> Any:
+    """BoA sometimes returns a single object where a list is documented"""
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return [value]
+    return value
+
+
+def _first_item(value: Any) -> Any:
+    """...and sometimes a one-item list where an object is documented"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+class BoAModel(BaseModel):
+    model_config = ConfigDict(
+        extra="allow",
+        populate_by_name=True,
+        coerce_numbers_to_str=True,
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dump back to BoA's camelCase shape, e.g. for debugging payloads"""
+        return self.model_dump(by_alias=True, exclude_none=True)
+
+
+class BoAHeader(BoAModel):
+    status: Optional[str] = None
+    id: Optional[str] = None
+    unique_identifier: Optional[str] = Field(None, alias="uniqueIdentifier")
+    transaction_status: Optional[str] = Field(None, alias="transactionStatus")
+    code: Optional[str] = None
+    message: Optional[str] = None
+    audit: Optional[Dict[str, Any]] = None
+
+
+class BoAErrorDetail(BoAModel):
+    code: Optional[str] = None
+    message: Optional[str] = None
+
+
+class BoAError(BoAModel):
+    type: Optional[str] = None
+    message: Optional[str] = None
+    error_details: Annotated[List[BoAErrorDetail], BeforeValidator(_as_list)] = Field(default_factory=list, alias="errorDetails")
+
+
+# Body types
+
+class BoAAccount(BoAModel):
+    customer_name: Optional[str] = Field(None, alias="customerName")
+    account_currency: Optional[str] = Field(None, alias="accountCurrency")
+
+
+class BoAOtherBankAccount(BoAModel):
+    error_code: Optional[str] = Field(None, alias="errorCode")
+    err_desc: Optional[str] = Field(None, alias="errDesc")
+    beneficiary_name: Optional[str] = Field(None, alias="beneficiaryName")
+    customer_name: Optional[str] = Field(None, alias="customerName")
+    account_currency: Optional[str] = Field(None, alias="accountCurrency")
+    enquiry_status: Optional[str] = Field(None, alias="enquiryStatus")
+
+    @property
+    def is_ok(self) -> bool:
+        return (self.error_code or "ok").lower() == "ok"
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.beneficiary_name or self.customer_name
+
+
+class BoABank(BoAModel):
+    id: str
+    # Optional so one incomplete entry does not fail the whole list; callers skip it
+    institution_name: Optional[str] = Field(None, alias="institutionName")
+
+
+class BoATransferBody(BoAModel):
+    transaction_type: Optional[str] = Field(None, alias="transactionType")
+    debit_account_id: Optional[str] = Field(None, alias="debitAccountId")
+    credit_account_id: Optional[str] = Field(None, alias="creditAccountId")
+    debit_amount: Optional[str] = Field(None, alias="debitAmount")
+    credit_amount: Optional[str] = Field(None, alias="creditAmount")
+    debit_currency: Optional[str] = Field(None, alias="debitCurrency")
+    credit_currency: Optional[str] = Field(None, alias="creditCurrency")
+    reason: Optional[str] = None
+    transaction_date: Optional[str] = Field(None, alias="transactionDate")
+    infinity_reference: Optional[str] = Field(None, alias="infinityReference")
+
+
+class BoATransactionStatusBody(BoAModel):
+    id: Optional[str] = None
+    boa_reference: Optional[str] = Field(None, alias="boaReference")
+    status: Optional[str] = None
+
+
+class BoARate(BoAModel):
+    currency_code: Optional[str] = Field(None, alias="currencyCode")
+    currency_name: Optional[str] = Field(None, alias="currencyName")
+    buy_rate: Optional[str] = Field(None, alias="buyRate")
+    sell_rate: Optional[str] = Field(None, alias="sellRate")
+
+
+class BoABalanceBody(BoAModel):
+    account_currency: Optional[str] = Field(None, alias="accountCurrency")
+    working_balance: Optional[str] = Field(None, alias="workingBalance")
+    balance: Optional[str] = None
+
+    @property
+    def amount(self) -> Optional[str]:
+        return self.working_balance if self.working_balance is not None else self.balance
+
+
+BoAList = Annotated[List[BodyT], BeforeValidator(_as_list)]
+BoAObject = Annotated[Optional[BodyT], BeforeValidator(_first_item)]
+
+
+class BoAEnvelope(BoAModel, Generic[BodyT]):
+    """
+    Standard BoA response: {"header": {...}, "body": ..., "error": {...}}.
+    `http_status` is not part of the payload; the client sets it after decoding.
+    """
+    header: BoAHeader = Field(default_factory=BoAHeader)
+    body: Optional[BodyT] = None
+    error: Optional[BoAError] = None
+    error_description: Optional[str] = Field(None, alias="errorDescription")
+    http_status: int = 200
+
+    @field_validator("error", mode="before")
+    @classmethod
+    def _coerce_error(cls, value: Any) -> Any:
+        # OAuth-style errors arrive as a bare string, e.g. "invalid_request"
+        if isinstance(value, str):
+            return {"message": value}
+        return value
+
+    @property
+    def is_success(self) -> bool:
+        return self.http_status < 400 and self.header.status == "success"
+
+    def first(self) -> Any:
+        """First item of a list body, or the body itself for object bodies"""
+        if isinstance(self.body, list):
+            return self.body[0] if self.body else None
+        return self.body
+
+    def error_message(self, default: str = "Try again later") -> str:
+        """Most specific human readable error BoA gave us, whatever shape it used"""
+        if self.error:
+            for detail in self.error.error_details:
+                if detail.message:
+                    return detail.message
+            if self.error.message:
+                return self.error.message
+        return self.error_description or self.header.message or default
+
+    @classmethod
+    def failure(cls, http_status: int, message: str) -> "BoAEnvelope":
+        """Envelope for failures that never produced a usable BoA payload"""
+        return cls(
+            header=BoAHeader(status="failed", code=str(http_status), message=message),
+            error=BoAError(type="TECHNICAL", message=message),
+            http_status=http_status,
+        )
+
+
+# Envelope per BoA operation
+
+AccountEnvelope = BoAEnvelope[BoAList[BoAAccount]]
+OtherBankAccountEnvelope = BoAEnvelope[BoAList[BoAOtherBankAccount]]
+BankListEnvelope = BoAEnvelope[BoAList[BoABank]]
+TransferEnvelope = BoAEnvelope[BoAObject[BoATransferBody]]
+TransactionStatusEnvelope = BoAEnvelope[BoAList[BoATransactionStatusBody]]
+RateEnvelope = BoAEnvelope[BoAList[BoARate]]
+BalanceEnvelope = BoAEnvelope[BoAList[BoABalanceBody]]
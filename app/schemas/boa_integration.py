@@ -1,8 +1,9 @@
 # app/schemas/boa_integration.py
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from decimal import Decimal
+from datetime import datetime
 
 # Beneficiary Response Schema
 class BoABeneficiaryResponse(BaseModel):
@@ -67,6 +68,45 @@ class BoATransferResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Bulk payout Schemas
+class BoAPayoutItemRequest(BaseModel):
+    """
+    One transfer in a bulk payout. Other bank transfers also need
+    `bank_code` and `receiver_name`.
+    """
+    transfer_type: Literal["within_boa", "other_bank"] = Field(..., description="'within_boa' or 'other_bank' (EthSwitch)")
+    transaction_id: int = Field(..., description="Internal transaction ID for tracking")
+    amount: str = Field(..., description="Transfer amount as string (e.g., '100.00')")
+    account_number: str = Field(..., description="Recipient account number")
+    reference: str = Field(..., description="Unique transaction reference")
+    bank_code: Optional[str] = Field(None, description="Destination bank code, other bank transfers only")
+    receiver_name: Optional[str] = Field(None, description="Full name of the receiver, other bank transfers only")
+
+class BoABulkPayoutRequest(BaseModel):
+    items: List[BoAPayoutItemRequest] = Field(..., min_length=1, description="Transfers to dispatch")
+
+class BoAPayoutItemResponse(BaseModel):
+    position: int
+    transaction_id: int
+    transfer_type: str
+    reference: str
+    status: str = Field(..., description="'queued', 'processing', 'succeeded' or 'failed'")
+    boa_reference: Optional[str] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class BoAPayoutJobResponse(BaseModel):
+    job_id: int
+    status: str = Field(..., description="'queued', 'running' or 'completed'")
+    total_items: int
+    succeeded: int
+    failed: int
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    items: Optional[List[BoAPayoutItemResponse]] = None
+
 # Status Response Schema
 class BoAStatusResponse(BaseModel):
     """
@@ -110,6 +150,28 @@ class BoABalanceResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Balance history Response Schemas
+class BoALatestBalanceResponse(BaseModel):
+    """
+    Most recent recorded settlement balance, served from cache.
+    """
+    account_currency: Optional[str] = Field(None, description="Account currency (typically 'ETB')")
+    balance: Optional[Decimal] = Field(None, description="Balance at the time of the reading")
+    as_of: Optional[datetime] = Field(None, description="When the balance was read from BOA")
+
+class BoABalancePointResponse(BaseModel):
+    """
+    One bucket of the settlement balance time series.
+    """
+    bucket_start: datetime = Field(..., description="Start of the minute or hour bucket (UTC)")
+    balance: Decimal = Field(..., description="Last balance read in the bucket")
+    min_balance: Decimal = Field(..., description="Lowest balance read in the bucket")
+    max_balance: Decimal = Field(..., description="Highest balance read in the bucket")
+    sample_count: int = Field(..., description="Number of readings in the bucket")
+
+    class Config:
+        from_attributes = True
+
 # Bank List Response Schema
 class BoABankListResponse(BaseModel):
     """
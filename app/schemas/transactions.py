@@ -1,6 +1,6 @@
 # app\schemas/transactions.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from decimal import Decimal
 from enum import Enum
 from datetime import datetime
@@ -57,6 +57,36 @@ class TransactionUpdate(BaseModel):
     is_verified: Optional[bool] = None
     is_manual: Optional[bool] = None
     
+# Bulk status change from the admin transaction list
+class TransactionBulkStatusUpdate(BaseModel):
+    transaction_ids: List[int] = Field(..., min_length=1, max_length=500, description="Transactions to update")
+    status: TransactionStatus
+    admin_note: Optional[str] = Field(None, max_length=500, description="Replaces the note on every updated transaction")
+
+class TransactionBulkStatusResult(BaseModel):
+    transaction_id: int
+    outcome: Literal["updated", "unchanged", "not_found"]
+    manual_deposit_created: bool = False
+
+class TransactionBulkStatusResponse(BaseModel):
+    status: TransactionStatus
+    updated: int
+    results: List[TransactionBulkStatusResult]
+
+# Background BoA transfer queued by process-boa-transfer
+class TransferJobResponse(BaseModel):
+    job_id: int = Field(..., validation_alias="id")
+    transaction_id: int
+    status: Literal["queued", "running", "succeeded", "failed", "needs_review"]
+    step: Optional[str] = None
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class TransactionDepotsit(BaseModel):
     transaction_id: int
     amount: Decimal = Field(..., gt=0, description="Amount associated with the deposit", example=100.0)
@@ -5,13 +5,92 @@ import asyncio
 import os
 import time
 import json
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Type
 from datetime import datetime, timedelta
 import logging
+from pydantic import ValidationError
 from app.core.config import settings
+from app.utils.metrics import registry
+from app.schemas.boa_envelopes import (
+    BoAEnvelope,
+    AccountEnvelope,
+    OtherBankAccountEnvelope,
+    BankListEnvelope,
+    TransferEnvelope,
+    TransactionStatusEnvelope,
+    RateEnvelope,
+    BalanceEnvelope,
+)
 
 logger = logging.getLogger(__name__)
 
+# Upstream metrics, kept separate from our own request latency so BoA slowness can be alerted on by itself
+BOA_REQUEST_DURATION = registry.histogram(
+    "boa_request_duration_seconds",
+    "Latency of calls to the Bank of Abyssinia API",
+    ["operation", "http_status"],
+)
+BOA_REQUESTS = registry.counter(
+    "boa_requests_total",
+    "Calls to the Bank of Abyssinia API by outcome",
+    ["operation", "http_status", "boa_status", "error_class"],
+)
+
+# Endpoint prefix -> operation name, most specific first
+BOA_OPERATIONS = (
+    ("oauth2/token", "oauth2_token"),
+    ("otherBank/getAccount", "other_bank_get_account"),
+    ("otherBank/bankId", "bank_list"),
+    ("otherBank/transferEthswitch", "transfer_other_bank"),
+    ("getAccount", "get_account"),
+    ("transferWithin", "transfer_within"),
+    ("moneySend", "money_send"),
+    ("transactionStatus", "transaction_status"),
+    ("rate", "currency_rate"),
+    ("getBalance", "get_balance"),
+)
+
+BOA_BASE_PATH = httpx.URL(settings.BOA_BASE_URL).path.rstrip("/")
+
+def boa_operation_for(path: str) -> str:
+    """Map a BoA URL path or endpoint to a low-cardinality operation name"""
+    if BOA_BASE_PATH and path.startswith(BOA_BASE_PATH):
+        path = path[len(BOA_BASE_PATH):]
+    path = path.lstrip("/")
+    for prefix, operation in BOA_OPERATIONS:
+        if path == prefix or path.startswith(prefix + "/"):
+            return operation
+    return "other"
+
+def boa_error_class(envelope: Optional[BoAEnvelope], http_status: int) -> str:
+    """Classify a BoA response into a coarse error class for alerting"""
+    if envelope is not None and envelope.is_success:
+        return "none"
+    if http_status in (401, 403):
+        return "auth"
+    if http_status == 429:
+        return "rate_limit"
+    if http_status == 504:
+        return "gateway_timeout"
+    if envelope is not None and envelope.error and envelope.error.type:
+        return envelope.error.type.lower()
+    if http_status >= 500:
+        return "upstream_5xx"
+    if http_status >= 400:
+        return "client_4xx"
+    return "unknown"
+
+def record_boa_outcome(operation: str, http_status: Any, envelope: Optional[BoAEnvelope], error_class: Optional[str] = None) -> None:
+    """Count one BoA call by HTTP status, BoA header.status and error class"""
+    if error_class is None:
+        error_class = boa_error_class(envelope, http_status if isinstance(http_status, int) else 500)
+    BOA_REQUESTS.inc(
+        operation=operation,
+        http_status=str(http_status),
+        boa_status=str((envelope.header.status if envelope is not None else None) or "none"),
+        error_class=error_class,
+    )
+
 class BoAAuthenticationError(Exception):
     """Raised when BoA API authentication fails"""
     pass
@@ -53,9 +132,7 @@ class BankOfAbyssiniaAPI:
             base_url=self.base_url,
             timeout=30.0,
             limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
-            event_hooks={
-                "request": [self._log_request_url]
-            }
+            event_hooks=self._event_hooks()
         )
     def update_refresh_token(self, new_refresh_token: str) -> None:
         """update the refresh token in memory"""
@@ -63,9 +140,28 @@ class BankOfAbyssiniaAPI:
         
     async def __aenter__(self):
         return self
+    def _event_hooks(self) -> Dict[str, list]:
+        return {
+            "request": [self._log_request_url, self._start_timer],
+            "response": [self._observe_latency],
+        }
+
     async def _log_request_url(self, request: httpx.Request):
         logger.debug(f"BOA request url: {request.url}")
 
+    async def _start_timer(self, request: httpx.Request):
+        request.extensions["boa_started_at"] = time.perf_counter()
+
+    async def _observe_latency(self, response: httpx.Response):
+        started_at = response.request.extensions.get("boa_started_at")
+        if started_at is None:
+            return
+        BOA_REQUEST_DURATION.observe(
+            time.perf_counter() - started_at,
+            operation=boa_operation_for(response.request.url.path),
+            http_status=str(response.status_code),
+        )
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.client.aclose()
 
@@ -127,12 +223,18 @@ class BankOfAbyssiniaAPI:
 
         try:
             # Use a separate client for token request to avoid base_url issues
-            async with httpx.AsyncClient(timeout=30.0) as token_client:
+            async with httpx.AsyncClient(timeout=30.0, event_hooks=self._event_hooks()) as token_client:
                 response = await token_client.post(
                     token_url,
                     json=payload,
                     headers={"Content-Type": "application/json"}
                 )
+                record_boa_outcome(
+                    "oauth2_token",
+                    response.status_code,
+                    None,
+                    error_class="none" if response.is_success else boa_error_class(None, response.status_code)
+                )
                 response.raise_for_status()
                 
                 token_data = response.json()
@@ -161,6 +263,10 @@ class BankOfAbyssiniaAPI:
                 raise BoAAuthenticationError(f"Authentication failed: {e.response.text}")
             else:
                 raise BoAAPIError(f"Token request failed: {e.response.text}")
+        except httpx.RequestError as e:
+            record_boa_outcome("oauth2_token", "network", None, error_class="network")
+            logger.error(f"BoA network error during authentication: {str(e)}")
+            raise BoAAPIError(f"Authentication error: {str(e)}")
         except Exception as e:
             logger.error(f"Unexpected error during BoA authentication: {str(e)}")
             raise BoAAPIError(f"Authentication error: {str(e)}")
@@ -171,9 +277,10 @@ class BankOfAbyssiniaAPI:
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
-        include_auth: bool = True
-    ) -> Dict[str, Any]:
-        """Make authenticated request to BoA API"""
+        include_auth: bool = True,
+        envelope: Type[BoAEnvelope] = BoAEnvelope
+    ) -> BoAEnvelope:
+        """Make authenticated request to BoA API and decode the response into `envelope`"""
 
         if include_auth:
             access_token = await self._ensure_authenticated()
@@ -186,6 +293,7 @@ class BankOfAbyssiniaAPI:
         if include_auth and access_token:
             headers["Authorization"] = f"{self.auth_prefix}{access_token}"
 
+        operation = boa_operation_for(endpoint)
         try:
             response = await self.client.request(
                 method=method,
@@ -194,23 +302,24 @@ class BankOfAbyssiniaAPI:
                 params=params,
                 headers=headers
             )
-
-            # DO NOT raise_for_status → BoA returns JSON even on 400/404/401
-            result = response.json()
-            result["http_status"] = response.status_code  # keep original status
-            return result
-
         except httpx.RequestError as e:
             logger.error(f"BoA network error: {str(e)}")
-            return {
-                "header": {
-                    "status": "failed",
-                    "code": 500,
-                    "message": "Network error contacting BOA"
-                },
-                "body": None,
-                "http_status": 500
-            }
+            record_boa_outcome(operation, "network", None, error_class="network")
+            return envelope.failure(500, "Network error contacting BOA")
+
+        # DO NOT raise_for_status → BoA returns JSON even on 400/404/401
+        try:
+            # Decode straight from bytes into the typed envelope, no intermediate dict
+            result = envelope.model_validate_json(response.content)
+            result.http_status = response.status_code  # keep original status
+        except ValidationError as e:
+            logger.error(f"Unreadable BoA response for {operation} ({response.status_code}): {str(e)}")
+            result = envelope.failure(
+                response.status_code if response.status_code >= 400 else 502,
+                "Invalid response from BOA"
+            )
+        record_boa_outcome(operation, response.status_code, result)
+        return result
 
 
     # API Methods based on documentation
@@ -219,22 +328,22 @@ class BankOfAbyssiniaAPI:
         """Get new access token using refresh token"""
         return await self._authenticate()
 
-    async def fetch_beneficiary_name(self, account_id: str) -> Dict[str, Any]:
+    async def fetch_beneficiary_name(self, account_id: str) -> AccountEnvelope:
         """Fetch beneficiary name for BoA account"""
         endpoint = f"getAccount/{account_id}"
-        return await self._make_request("GET", endpoint)
+        return await self._make_request("GET", endpoint, envelope=AccountEnvelope)
 
-    async def fetch_beneficiary_name_other_bank(self, bank_id: str, account_id: str) -> Dict[str, Any]:
+    async def fetch_beneficiary_name_other_bank(self, bank_id: str, account_id: str) -> OtherBankAccountEnvelope:
         """Fetch beneficiary name for other bank account"""
         endpoint = f"otherBank/getAccount/{bank_id}/{account_id}"
-        return await self._make_request("GET", endpoint)
+        return await self._make_request("GET", endpoint, envelope=OtherBankAccountEnvelope)
 
     async def initiate_within_boa_transfer(
         self,
         amount: str,
         account_number: str,
         reference: str
-    ) -> Dict[str, Any]:
+    ) -> TransferEnvelope:
         """Initiate transfer within Bank of Abyssinia"""
         endpoint = "transferWithin"
         data = {
@@ -243,12 +352,12 @@ class BankOfAbyssiniaAPI:
             "accountNumber": account_number,
             "reference": reference
         }
-        return await self._make_request("POST", endpoint, data=data)
+        return await self._make_request("POST", endpoint, data=data, envelope=TransferEnvelope)
 
-    async def get_bank_list(self) -> Dict[str, Any]:
+    async def get_bank_list(self) -> BankListEnvelope:
         """Get list of available banks for other bank transfers"""
         endpoint = "otherBank/bankId"
-        return await self._make_request("GET", endpoint)
+        return await self._make_request("GET", endpoint, envelope=BankListEnvelope)
 
     async def initiate_other_bank_transfer(
         self,
@@ -257,7 +366,7 @@ class BankOfAbyssiniaAPI:
         account_number: str,
         reference: str,
         receiver_name: str
-    ) -> Dict[str, Any]:
+    ) -> TransferEnvelope:
         """Initiate transfer to other bank using EthSwitch"""
         endpoint = "otherBank/transferEthswitch"
         data = {
@@ -268,25 +377,25 @@ class BankOfAbyssiniaAPI:
             "accountNumber": account_number,
             "reference": reference
         }
-        return await self._make_request("POST", endpoint, data=data)
+        return await self._make_request("POST", endpoint, data=data, envelope=TransferEnvelope)
 
-    async def check_transaction_status(self, transaction_id: str) -> Dict[str, Any]:
+    async def check_transaction_status(self, transaction_id: str) -> TransactionStatusEnvelope:
         """Check status of a transaction"""
         endpoint = f"transactionStatus/{transaction_id}"
-        return await self._make_request("GET", endpoint)
+        return await self._make_request("GET", endpoint, envelope=TransactionStatusEnvelope)
 
-    async def get_currency_rate(self, base_currency: str) -> Dict[str, Any]:
+    async def get_currency_rate(self, base_currency: str) -> RateEnvelope:
         """Get currency exchange rate"""
         endpoint = f"rate/{base_currency}"
-        return await self._make_request("GET", endpoint)
+        return await self._make_request("GET", endpoint, envelope=RateEnvelope)
 
-    async def get_balance(self) -> Dict[str, Any]:
+    async def get_balance(self) -> BalanceEnvelope:
         """Get remitter account balance"""
         endpoint = "getBalance"
         data = {
             "client_id": self.client_id
         }
-        return await self._make_request("POST", endpoint, data=data)
+        return await self._make_request("POST", endpoint, data=data, envelope=BalanceEnvelope)
 
     async def initiate_money_send(
         self,
@@ -298,7 +407,7 @@ class BankOfAbyssiniaAPI:
         receiver_phone: str,
         reference: str,
         secret_code: str
-    ) -> Dict[str, Any]:
+    ) -> TransferEnvelope:
         """Initiate money send (wallet transfer)"""
         endpoint = "moneySend"
         data = {
@@ -312,7 +421,7 @@ class BankOfAbyssiniaAPI:
             "reference": reference,
             "secretCode": secret_code
         }
-        return await self._make_request("POST", endpoint, data=data)
+        return await self._make_request("POST", endpoint, data=data, envelope=TransferEnvelope)
 
 # Global instance for dependency injection
 boa_api = BankOfAbyssiniaAPI()
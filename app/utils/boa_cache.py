@@ -0,0 +1,445 @@
+# app/utils/boa_cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.database import database
+from app.database.database import SessionLocal
+from app.models.boa_integration import BoABeneficiaryInquiry
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Lookup order for beneficiary names: known-bad accounts first, then
+# in-process memory, then Redis (shared across workers), then the
+# boa_beneficiary_inquiries table. A hit in a slower tier is copied into the
+# faster ones.
+CACHE_TIERS = ("negative", "memory", "redis", "db")
+
+# Failures that depend only on the account being looked up. Auth, rate limit,
+# timeout and 5xx failures say nothing about the account and are never cached.
+NEGATIVE_CACHE_ERROR_CLASSES = ("business", "not_found")
+
+BENEFICIARY_CACHE_LOOKUPS = registry.counter(
+    "boa_beneficiary_cache_lookups_total",
+    "Beneficiary cache lookups per tier and result",
+    ["inquiry_type", "tier", "result"],
+)
+
+
+BENEFICIARY_NEGATIVE_CACHE_STORES = registry.counter(
+    "boa_beneficiary_negative_cache_stores_total",
+    "Failed beneficiary lookups remembered in the negative cache",
+    ["inquiry_type", "error_class"],
+)
+
+BENEFICIARY_INQUIRIES_PURGED = registry.counter(
+    "boa_beneficiary_inquiries_purged_total",
+    "Expired boa_beneficiary_inquiries rows deleted by the purge job",
+)
+
+
+def _inquiry_ttls() -> Dict[str, int]:
+    return {
+        "boa": settings.BOA_BENEFICIARY_CACHE_TTL_BOA,
+        "other_bank": settings.BOA_BENEFICIARY_CACHE_TTL_OTHER_BANK,
+    }
+
+
+def beneficiary_cache_hit_ratio(inquiry_type: str) -> float:
+    """Share of lookups answered by any cache tier instead of BoA"""
+    hits = sum(
+        BENEFICIARY_CACHE_LOOKUPS.value(inquiry_type=inquiry_type, tier=tier, result="hit")
+        for tier in CACHE_TIERS
+    )
+    # Every lookup that misses the last tier goes upstream
+    misses = BENEFICIARY_CACHE_LOOKUPS.value(inquiry_type=inquiry_type, tier=CACHE_TIERS[-1], result="miss")
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+registry.gauge(
+    "boa_beneficiary_cache_hit_ratio",
+    "Share of beneficiary lookups served without calling BoA",
+    ["inquiry_type"],
+    callback=lambda: {(inquiry_type,): beneficiary_cache_hit_ratio(inquiry_type) for inquiry_type in _inquiry_ttls()},
+)
+
+
+async def _redis_get_json(key: str, label: str) -> Optional[Dict[str, Any]]:
+    redis = database.redis_client
+    if redis is None:
+        return None
+    try:
+        raw = await redis.get(key)
+    except RedisError as e:
+        logger.warning(f"Redis error reading {label}: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+async def _redis_set_json(key: str, value: Dict[str, Any], ttl: int, label: str) -> None:
+    redis = database.redis_client
+    if redis is None or ttl <= 0:
+        return
+    try:
+        await redis.set(key, json.dumps(value), ex=ttl)
+    except RedisError as e:
+        logger.warning(f"Redis error writing {label}: {e}")
+
+
+class BeneficiaryCache:
+    """Tiered cache of beneficiary name lookups keyed by (inquiry_type, bank_id, account_id)"""
+
+    def __init__(self, maxsize: int, ttls: Dict[str, int], negative_ttl: int, purge_chunk_size: int = 1000):
+        self.ttls = ttls
+        self.negative_ttl = negative_ttl
+        self.purge_chunk_size = purge_chunk_size
+        self._memory = {
+            inquiry_type: TTLCache(maxsize=maxsize, ttl=ttl)
+            for inquiry_type, ttl in ttls.items()
+        }
+        self._negative = TTLCache(maxsize=maxsize, ttl=max(negative_ttl, 1))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def redis_key(inquiry_type: str, account_id: str, bank_id: Optional[str] = None) -> str:
+        return f"boa:beneficiary:{inquiry_type}:{bank_id or '-'}:{account_id}"
+
+    @staticmethod
+    def negative_redis_key(inquiry_type: str, account_id: str, bank_id: Optional[str] = None) -> str:
+        return f"boa:beneficiary:negative:{inquiry_type}:{bank_id or '-'}:{account_id}"
+
+    async def get_failure(self, inquiry_type: str, account_id: str, bank_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the remembered failure for an account BoA recently rejected:
+        {"error_class", "http_status", "message"}
+        """
+        if self.negative_ttl <= 0:
+            return None
+        key = (inquiry_type, bank_id or "", account_id)
+
+        with self._lock:
+            failure = self._negative.get(key)
+        if failure is None:
+            failure = await _redis_get_json(self.negative_redis_key(inquiry_type, account_id, bank_id), "beneficiary negative cache")
+            if failure is not None:
+                with self._lock:
+                    self._negative[key] = failure
+        self._record(inquiry_type, "negative", failure is not None)
+        return failure
+
+    async def set_failure(
+        self,
+        inquiry_type: str,
+        account_id: str,
+        bank_id: Optional[str],
+        error_class: str,
+        http_status: int,
+        message: str
+    ) -> None:
+        """Remember a failed lookup for a short while, if the failure is about the account itself"""
+        if self.negative_ttl <= 0 or error_class not in NEGATIVE_CACHE_ERROR_CLASSES:
+            return
+        failure = {"error_class": error_class, "http_status": http_status, "message": message}
+        with self._lock:
+            self._negative[(inquiry_type, bank_id or "", account_id)] = failure
+        await _redis_set_json(
+            self.negative_redis_key(inquiry_type, account_id, bank_id), failure, self.negative_ttl, "beneficiary negative cache"
+        )
+        BENEFICIARY_NEGATIVE_CACHE_STORES.inc(inquiry_type=inquiry_type, error_class=error_class)
+
+    def _record(self, inquiry_type: str, tier: str, hit: bool) -> None:
+        BENEFICIARY_CACHE_LOOKUPS.inc(inquiry_type=inquiry_type, tier=tier, result="hit" if hit else "miss")
+
+    async def get(self, inquiry_type: str, account_id: str, bank_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached beneficiary from the fastest tier that has it"""
+        key = (bank_id or "", account_id)
+
+        with self._lock:
+            entry = self._memory[inquiry_type].get(key)
+        self._record(inquiry_type, "memory", entry is not None)
+        if entry is not None:
+            return {**entry, "cached": True}
+
+        entry = await self._redis_get(inquiry_type, account_id, bank_id)
+        self._record(inquiry_type, "redis", entry is not None)
+        if entry is not None:
+            self._memory_set(inquiry_type, key, entry)
+            return {**entry, "cached": True}
+
+        row = self._db_get(inquiry_type, account_id, bank_id)
+        self._record(inquiry_type, "db", row is not None)
+        if row is not None:
+            entry, expires_at = row
+            remaining = int((expires_at - datetime.utcnow()).total_seconds())
+            self._memory_set(inquiry_type, key, entry)
+            await self._redis_set(inquiry_type, account_id, bank_id, entry, remaining)
+            return {**entry, "cached": True}
+
+        return None
+
+    async def set(
+        self,
+        inquiry_type: str,
+        account_id: str,
+        bank_id: Optional[str],
+        entry: Dict[str, Any],
+        boa_response: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Store a fresh upstream result in every tier"""
+        ttl = self.ttls[inquiry_type]
+        self._memory_set(inquiry_type, (bank_id or "", account_id), entry)
+        await self._redis_set(inquiry_type, account_id, bank_id, entry, ttl)
+
+        db = SessionLocal()
+        try:
+            db.add(BoABeneficiaryInquiry(
+                account_id=account_id,
+                bank_id=bank_id,
+                inquiry_type=inquiry_type,
+                customer_name=entry.get("customer_name"),
+                account_currency=entry.get("account_currency"),
+                enquiry_status=entry.get("enquiry_status"),
+                boa_response=boa_response,
+                expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+            ))
+            db.commit()
+        except SQLAlchemyError as e:
+            # The lookup itself succeeded, the faster tiers still hold the result
+            db.rollback()
+            logger.error(f"Database error caching beneficiary info for {account_id}: {str(e)}")
+        finally:
+            db.close()
+
+    async def purge_expired(self) -> int:
+        """
+        Scheduled job: delete expired boa_beneficiary_inquiries rows a chunk
+        at a time, so no single statement locks or logs much of the table.
+        """
+        purged = 0
+        cutoff = datetime.utcnow()
+        while True:
+            db = SessionLocal()
+            try:
+                expired_ids = db.query(BoABeneficiaryInquiry.id).filter(
+                    BoABeneficiaryInquiry.expires_at < cutoff
+                ).limit(self.purge_chunk_size).subquery()
+                deleted = db.query(BoABeneficiaryInquiry).filter(
+                    BoABeneficiaryInquiry.id.in_(select(expired_ids.c.id))
+                ).delete(synchronize_session=False)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Database error purging expired beneficiary inquiries: {str(e)}")
+                break
+            finally:
+                db.close()
+            purged += deleted
+            BENEFICIARY_INQUIRIES_PURGED.inc(deleted)
+            if deleted < self.purge_chunk_size:
+                break
+            # Let request handlers run between chunks
+            await asyncio.sleep(0)
+        if purged:
+            logger.info(f"Purged {purged} expired beneficiary inquiries")
+        return purged
+
+    def _memory_set(self, inquiry_type: str, key, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[inquiry_type][key] = entry
+
+    @staticmethod
+    def _db_get(inquiry_type: str, account_id: str, bank_id: Optional[str]) -> Optional[Tuple[Dict[str, Any], datetime]]:
+        # Short-lived session of its own, so callers never hold a pooled
+        # connection while the lookup goes on to wait for BoA
+        db = SessionLocal()
+        try:
+            query = db.query(
+                BoABeneficiaryInquiry.customer_name,
+                BoABeneficiaryInquiry.account_currency,
+                BoABeneficiaryInquiry.enquiry_status,
+                BoABeneficiaryInquiry.expires_at
+            ).filter(
+                BoABeneficiaryInquiry.account_id == account_id,
+                BoABeneficiaryInquiry.inquiry_type == inquiry_type,
+                BoABeneficiaryInquiry.expires_at > datetime.utcnow()
+            )
+            if bank_id:
+                query = query.filter(BoABeneficiaryInquiry.bank_id == bank_id)
+            row = query.order_by(BoABeneficiaryInquiry.expires_at.desc()).first()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error reading beneficiary cache: {str(e)}")
+            return None
+        finally:
+            db.close()
+        if row is None:
+            return None
+        entry = {
+            "customer_name": row.customer_name,
+            "account_currency": row.account_currency,
+            "enquiry_status": row.enquiry_status,
+        }
+        return entry, row.expires_at
+
+    async def _redis_get(self, inquiry_type: str, account_id: str, bank_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        return await _redis_get_json(self.redis_key(inquiry_type, account_id, bank_id), "beneficiary cache")
+
+    async def _redis_set(self, inquiry_type: str, account_id: str, bank_id: Optional[str], entry: Dict[str, Any], ttl: int) -> None:
+        await _redis_set_json(self.redis_key(inquiry_type, account_id, bank_id), entry, ttl, "beneficiary cache")
+
+
+beneficiary_cache = BeneficiaryCache(
+    maxsize=settings.BOA_BENEFICIARY_CACHE_SIZE,
+    ttls=_inquiry_ttls(),
+    negative_ttl=settings.BOA_BENEFICIARY_NEGATIVE_CACHE_TTL,
+    purge_chunk_size=settings.BOA_BENEFICIARY_PURGE_CHUNK_SIZE,
+)
+
+
+class BankListSnapshot:
+    """
+    Versioned in-memory copy of the active BoA bank list served by /api/boa/banks.
+    The ETag is a hash of the content, so every worker hands out the same tag
+    for the same list and clients can revalidate against any of them.
+    """
+
+    def __init__(self):
+        self.banks: List[Dict[str, str]] = []
+        self.version = 0
+        self.etag: Optional[str] = None
+        self.refreshed_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.etag is not None
+
+    def replace(self, banks: List[Dict[str, str]]) -> bool:
+        """Swap in a new list; returns True when the content actually changed"""
+        banks = sorted(banks, key=lambda bank: bank["bank_id"])
+        digest = hashlib.sha256(json.dumps(banks, sort_keys=True).encode()).hexdigest()[:32]
+        etag = f'"{digest}"'
+        with self._lock:
+            self.refreshed_at = datetime.utcnow()
+            if etag == self.etag:
+                return False
+            self.banks = banks
+            self.etag = etag
+            self.version += 1
+        logger.info(f"Bank list snapshot updated to version {self.version} with {len(banks)} banks")
+        return True
+
+
+bank_list_snapshot = BankListSnapshot()
+
+
+class RateSnapshot:
+    """
+    Latest currency rates kept by the background refresher, in memory and in
+    Redis so every worker can serve them. Entries carry the epoch time they
+    were fetched; readers decide how stale is too stale.
+    """
+
+    def __init__(self, max_staleness: int):
+        self.max_staleness = max_staleness
+        self._rates: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def redis_key(currency: str) -> str:
+        return f"boa:rate:{currency}"
+
+    def age(self, currency: str) -> Optional[float]:
+        with self._lock:
+            entry = self._rates.get(currency)
+        return time.time() - entry["fetched_at"] if entry else None
+
+    async def get(self, currency: str) -> Optional[Dict[str, Any]]:
+        """Return the rate for `currency` if it was fetched within max_staleness"""
+        with self._lock:
+            entry = self._rates.get(currency)
+        if entry is None or not self._is_fresh(entry):
+            entry = await _redis_get_json(self.redis_key(currency), "rate snapshot")
+            if entry is None or not self._is_fresh(entry):
+                return None
+            with self._lock:
+                self._rates[currency] = entry
+        return entry["rate"]
+
+    async def set(self, currency: str, rate: Dict[str, Any]) -> None:
+        entry = {"rate": rate, "fetched_at": time.time()}
+        with self._lock:
+            self._rates[currency] = entry
+        await _redis_set_json(self.redis_key(currency), entry, self.max_staleness, "rate snapshot")
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["fetched_at"] <= self.max_staleness
+
+
+def refreshed_rate_currencies() -> List[str]:
+    """Upper-cased currency codes listed in BOA_RATE_CURRENCIES"""
+    return [code.strip().upper() for code in settings.BOA_RATE_CURRENCIES.split(",") if code.strip()]
+
+
+rate_snapshot = RateSnapshot(max_staleness=settings.BOA_RATE_MAX_STALENESS)
+
+registry.gauge(
+    "boa_rate_snapshot_age_seconds",
+    "Seconds since each currency rate in this worker's snapshot was fetched from BoA",
+    ["currency"],
+    callback=lambda: {
+        (currency,): age
+        for currency in refreshed_rate_currencies()
+        if (age := rate_snapshot.age(currency)) is not None
+    },
+)
+
+
+class LatestBalanceCache:
+    """
+    Most recent settlement balance per currency, in memory and in Redis,
+    so /api/boa/balance/latest is answered without reading the time series.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def redis_key(currency: str) -> str:
+        return f"boa:balance:latest:{currency}"
+
+    async def get(self, currency: str) -> Optional[Dict[str, Any]]:
+        # Redis first: only the polling leader takes readings, so this worker's copy may be behind
+        shared = await _redis_get_json(self.redis_key(currency), "latest balance cache")
+        with self._lock:
+            reading = self._latest.get(currency)
+            if shared is not None and (reading is None or shared["as_of"] > reading["as_of"]):
+                self._latest[currency] = reading = shared
+        return reading
+
+    async def set(self, currency: str, reading: Dict[str, Any]) -> None:
+        """Keep `reading` ({"account_currency", "balance", "as_of"}) unless a newer one is already cached"""
+        with self._lock:
+            current = self._latest.get(currency)
+            if current is not None and current["as_of"] > reading["as_of"]:
+                return
+            self._latest[currency] = reading
+        await _redis_set_json(self.redis_key(currency), reading, self.ttl, "latest balance cache")
+
+
+latest_balance_cache = LatestBalanceCache(ttl=settings.BOA_BALANCE_MINUTE_RETENTION_DAYS * 86400)
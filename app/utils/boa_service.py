@@ -1,17 +1,24 @@
 # app/utils/boa_service.py
 
 from sqlalchemy.orm import Session
+from sqlalchemy import case
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
-from .boa_api_service import boa_api, BoAAuthenticationError, BoAAPIError, BoARateLimitError
+from .boa_api_service import boa_api, boa_error_class, BoAAuthenticationError, BoAAPIError, BoARateLimitError
 from app.models.boa_integration import (
-    BoATransaction, BoABeneficiaryInquiry, BoABankList,
-    BoACurrencyRate, BoABalance
+    BoATransaction, BoABankList,
+    BoACurrencyRate, BoABalanceReading
 )
-from app.database.database import SessionLocal
+from app.core.config import settings
+from app.database.database import SessionLocal, bulk_upsert, dialect_insert
+from app.schemas.boa_envelopes import BoAEnvelope, TransferEnvelope, BoATransferBody, RateEnvelope, BalanceEnvelope
+from app.utils.status_poller import FINAL_BOA_STATUSES, next_status_poll_at
+from app.utils.boa_cache import beneficiary_cache, bank_list_snapshot, rate_snapshot, refreshed_rate_currencies, latest_balance_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,146 +30,179 @@ class BoABeneficiaryService:
     """Service for handling beneficiary-related operations"""
 
     @staticmethod
-    async def fetch_beneficiary_name(account_id: str, db: Session) -> Optional[Dict[str, Any]]:
+    async def lookup(
+        inquiry_type: str,
+        account_id: str,
+        bank_id: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[BoAEnvelope]]:
         """
-        Fetch beneficiary name for BoA account
-        Returns cached result if available and not expired
+        Resolve a beneficiary name through the cache tiers, falling back to BoA.
+        Returns (beneficiary, None) on success or (None, failure envelope) when
+        BoA rejected the lookup, so callers can relay BoA's status and message.
+        The cache manages its own short DB sessions, so no connection is held
+        while waiting on BoA.
         """
-        try:
-            # Check cache first (24 hours expiry)
-            cached = db.query(BoABeneficiaryInquiry).filter(
-                BoABeneficiaryInquiry.account_id == account_id,
-                BoABeneficiaryInquiry.inquiry_type == "boa",
-                BoABeneficiaryInquiry.expires_at > datetime.utcnow()
-            ).first()
-
-            if cached:
-                logger.info(f"Returning cached beneficiary info for account {account_id}")
-                return {
-                    "customer_name": cached.customer_name,
-                    "account_currency": cached.account_currency,
-                    "cached": True
-                }
+        known_failure = await beneficiary_cache.get_failure(inquiry_type, account_id, bank_id)
+        if known_failure:
+            logger.info(f"Rejecting {inquiry_type} beneficiary lookup for {bank_id or ''}{account_id} from negative cache")
+            return None, BoAEnvelope.failure(known_failure["http_status"], known_failure["message"])
 
-            # Fetch from BoA API
-            response = await boa_api.fetch_beneficiary_name(account_id)
+        cached = await beneficiary_cache.get(inquiry_type, account_id, bank_id)
+        if cached:
+            logger.info(f"Returning cached {inquiry_type} beneficiary info for {bank_id or ''}{account_id}")
+            return cached, None
 
-            if not response or response.get("header", {}).get("status") != "success":
-                logger.error(f"Failed to fetch beneficiary name for account {account_id}")
-                return None
+        try:
+            if inquiry_type == "other_bank":
+                response = await boa_api.fetch_beneficiary_name_other_bank(bank_id, account_id)
+            else:
+                response = await boa_api.fetch_beneficiary_name(account_id)
+        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
+            logger.error(f"BoA API error fetching {inquiry_type} beneficiary name: {str(e)}")
+            raise BoAServiceError(f"Failed to fetch beneficiary name: {str(e)}")
 
-            body = response.get("body", [])
-            if not body or len(body) == 0:
-                logger.error(f"No beneficiary data found for account {account_id}")
-                return None
+        if not response.is_success:
+            await BoABeneficiaryService._remember_failure(inquiry_type, account_id, bank_id, response)
+            return None, response
+
+        beneficiary_data = response.first()
+        if not beneficiary_data:
+            failure = response.failure(404, "Beneficiary not found")
+            await BoABeneficiaryService._remember_failure(inquiry_type, account_id, bank_id, failure, "not_found")
+            return None, failure
+
+        if inquiry_type == "other_bank":
+            if not beneficiary_data.is_ok:
+                failure = response.failure(400, beneficiary_data.err_desc or "Unknown error")
+                await BoABeneficiaryService._remember_failure(inquiry_type, account_id, bank_id, failure, "business")
+                return None, failure
+            entry = {
+                "customer_name": beneficiary_data.name,
+                "account_currency": beneficiary_data.account_currency,
+                "enquiry_status": beneficiary_data.enquiry_status,
+            }
+        else:
+            entry = {
+                "customer_name": beneficiary_data.customer_name,
+                "account_currency": beneficiary_data.account_currency,
+                "enquiry_status": "1",  # Success
+            }
 
-            beneficiary_data = body[0]
-            customer_name = beneficiary_data.get("customerName")
-            account_currency = beneficiary_data.get("accountCurrency")
-
-            # Cache the result
-            inquiry = BoABeneficiaryInquiry(
-                account_id=account_id,
-                inquiry_type="boa",
-                customer_name=customer_name,
-                account_currency=account_currency,
-                enquiry_status="1",  # Success
-                boa_response=response,
-                expires_at=datetime.utcnow() + timedelta(hours=24)
-            )
-            db.add(inquiry)
-            db.commit()
+        # The name, currency and status already have columns; keep only the header for tracing
+        boa_response = {"header": response.header.model_dump(by_alias=True, exclude_none=True, exclude={"audit"})}
+        await beneficiary_cache.set(inquiry_type, account_id, bank_id, entry, boa_response)
+        logger.info(f"Successfully fetched and cached {inquiry_type} beneficiary info for {bank_id or ''}{account_id}")
+        return {**entry, "cached": False}, None
 
-            logger.info(f"Successfully fetched and cached beneficiary info for account {account_id}")
-            return {
-                "customer_name": customer_name,
-                "account_currency": account_currency,
-                "cached": False
-            }
+    @staticmethod
+    async def _remember_failure(
+        inquiry_type: str,
+        account_id: str,
+        bank_id: Optional[str],
+        failure: BoAEnvelope,
+        error_class: Optional[str] = None
+    ) -> None:
+        """Negative-cache a rejected lookup; the cache drops anything that isn't about the account"""
+        if error_class is None:
+            error_class = boa_error_class(failure, failure.http_status)
+            if failure.http_status == 404 and error_class in ("client_4xx", "technical"):
+                error_class = "not_found"
+        await beneficiary_cache.set_failure(
+            inquiry_type, account_id, bank_id,
+            error_class, failure.http_status, failure.error_message()
+        )
 
-        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
-            logger.error(f"BoA API error fetching beneficiary name: {str(e)}")
-            raise BoAServiceError(f"Failed to fetch beneficiary name: {str(e)}")
-        except SQLAlchemyError as e:
-            db.rollback()
-            logger.error(f"Database error caching beneficiary info: {str(e)}")
-            raise BoAServiceError(f"Database error: {str(e)}")
+    @staticmethod
+    async def fetch_beneficiary_name(account_id: str, db: Session) -> Optional[Dict[str, Any]]:
+        """
+        Fetch beneficiary name for BoA account
+        Returns cached result if available and not expired
+        """
+        beneficiary, failure = await BoABeneficiaryService.lookup("boa", account_id)
+        if failure:
+            logger.error(f"Failed to fetch beneficiary name for account {account_id}: {failure.error_message()}")
+        return beneficiary
 
     @staticmethod
     async def fetch_beneficiary_name_other_bank(bank_id: str, account_id: str, db: Session) -> Optional[Dict[str, Any]]:
         """
         Fetch beneficiary name for other bank account
         """
-        try:
-            # Check cache first
-            cache_key = f"{bank_id}_{account_id}"
-            cached = db.query(BoABeneficiaryInquiry).filter(
-                BoABeneficiaryInquiry.account_id == account_id,
-                BoABeneficiaryInquiry.bank_id == bank_id,
-                BoABeneficiaryInquiry.inquiry_type == "other_bank",
-                BoABeneficiaryInquiry.expires_at > datetime.utcnow()
-            ).first()
-
-            if cached:
-                logger.info(f"Returning cached other bank beneficiary info for {cache_key}")
-                return {
-                    "customer_name": cached.customer_name,
-                    "account_currency": cached.account_currency,
-                    "enquiry_status": cached.enquiry_status,
-                    "cached": True
-                }
+        beneficiary, failure = await BoABeneficiaryService.lookup("other_bank", account_id, bank_id=bank_id)
+        if failure:
+            logger.error(f"BoA API returned error for other bank inquiry {bank_id}_{account_id}: {failure.error_message()}")
+        return beneficiary
 
-            # Fetch from BoA API
-            response = await boa_api.fetch_beneficiary_name_other_bank(bank_id, account_id)
 
-            if not response:
-                logger.error(f"Empty response from BoA API for other bank inquiry {cache_key}")
-                return None
+class BoATransferService:
+    """Service for handling transfer operations"""
 
-            header = response.get("header", {})
-            body = response.get("body", {})
+    @staticmethod
+    def build_boa_transaction(
+        transaction_id: int,
+        response: TransferEnvelope,
+        transaction_type: Optional[str] = None
+    ) -> BoATransaction:
+        """Map a successful transfer envelope onto a BoATransaction row"""
+        header = response.header
+        body = response.body or BoATransferBody()
+        now = datetime.utcnow()
+        is_final = (header.transaction_status or "").lower() in FINAL_BOA_STATUSES
+        return BoATransaction(
+            transaction_id=transaction_id,
+            boa_reference=header.id,
+            unique_identifier=header.unique_identifier,
+            transaction_type=transaction_type or body.transaction_type,
+            boa_transaction_status=header.transaction_status,
+            next_poll_at=None if is_final else next_status_poll_at(now, now),
+            poll_attempts=0,
+            debit_account_id=body.debit_account_id,
+            credit_account_id=body.credit_account_id,
+            debit_amount=body.debit_amount,
+            credit_amount=body.credit_amount,
+            debit_currency=body.debit_currency,
+            credit_currency=body.credit_currency,
+            reason=body.reason,
+            transaction_date=body.transaction_date,
+            infinity_reference=body.infinity_reference,
+            audit_info=header.audit,
+            created_at=now,
+            updated_at=now
+        )
 
-            if header.get("status") != "success":
-                logger.error(f"BoA API returned error for other bank inquiry {cache_key}: {header}")
-                return None
+    @staticmethod
+    def transfer_result(response: TransferEnvelope) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "boa_reference": response.header.id,
+            "unique_identifier": response.header.unique_identifier,
+            "transaction_status": response.header.transaction_status,
+            "response": response.to_dict()
+        }
 
-            customer_name = body.get("customerName")
-            account_currency = body.get("accountCurrency")
-            enquiry_status = body.get("enquiryStatus")
-
-            # Cache the result
-            inquiry = BoABeneficiaryInquiry(
-                account_id=account_id,
-                bank_id=bank_id,
-                inquiry_type="other_bank",
-                customer_name=customer_name,
-                account_currency=account_currency,
-                enquiry_status=enquiry_status,
-                boa_response=response,
-                expires_at=datetime.utcnow() + timedelta(hours=24)
+    @staticmethod
+    async def dispatch_within_boa_transfer(
+        amount: str,
+        account_number: str,
+        reference: str
+    ) -> TransferEnvelope:
+        """
+        Send a within-BoA transfer to BoA without touching the database,
+        so callers can release their session while BoA processes it
+        """
+        try:
+            response = await boa_api.initiate_within_boa_transfer(
+                amount=amount,
+                account_number=account_number,
+                reference=reference
             )
-            db.add(inquiry)
-            db.commit()
-
-            logger.info(f"Successfully fetched and cached other bank beneficiary info for {cache_key}")
-            return {
-                "customer_name": customer_name,
-                "account_currency": account_currency,
-                "enquiry_status": enquiry_status,
-                "cached": False
-            }
-
         except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
-            logger.error(f"BoA API error fetching other bank beneficiary name: {str(e)}")
-            raise BoAServiceError(f"Failed to fetch other bank beneficiary name: {str(e)}")
-        except SQLAlchemyError as e:
-            db.rollback()
-            logger.error(f"Database error caching other bank beneficiary info: {str(e)}")
-            raise BoAServiceError(f"Database error: {str(e)}")
+            logger.error(f"BoA API error during transfer: {str(e)}")
+            raise BoAServiceError(f"Transfer failed: {str(e)}")
 
-
-class BoATransferService:
-    """Service for handling transfer operations"""
+        if not response.is_success:
+            raise BoAServiceError(f"BoA transfer failed: {response.error_message('Transfer failed')}")
+        return response
 
     @staticmethod
     async def initiate_within_boa_transfer(
@@ -175,81 +215,33 @@ class BoATransferService:
         """
         Initiate transfer within Bank of Abyssinia
         """
+        response = await BoATransferService.dispatch_within_boa_transfer(amount, account_number, reference)
         try:
-            # Call BoA API
-            response = await boa_api.initiate_within_boa_transfer(
-                amount=amount,
-                account_number=account_number,
-                reference=reference
-            )
-
-            if not response:
-                raise BoAServiceError("Empty response from BoA API")
-
-            header = response.get("header", {})
-            body = response.get("body", {})
-
-            if header.get("status") != "success":
-                error_msg = "Transfer failed"
-                if "error" in response:
-                    error_msg = response["error"].get("errorDetails", [{}])[0].get("message", error_msg)
-                raise BoAServiceError(f"BoA transfer failed: {error_msg}")
-
             # Save transaction details
-            boa_transaction = BoATransaction(
-                transaction_id=transaction_id,
-                boa_reference=header.get("id"),
-                unique_identifier=header.get("uniqueIdentifier"),
-                transaction_type=body.get("transactionType"),
-                boa_transaction_status=header.get("transactionStatus"),
-                debit_account_id=body.get("debitAccountId"),
-                credit_account_id=body.get("creditAccountId"),
-                debit_amount=body.get("debitAmount"),
-                credit_amount=body.get("creditAmount"),
-                debit_currency=body.get("debitCurrency"),
-                credit_currency=body.get("creditCurrency"),
-                reason=body.get("reason"),
-                transaction_date=body.get("transactionDate"),
-                infinity_reference=body.get("infinityReference"),
-                audit_info=header.get("audit"),
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
+            boa_transaction = BoATransferService.build_boa_transaction(transaction_id, response)
             db.add(boa_transaction)
             db.commit()
 
             logger.info(f"Successfully initiated BoA transfer for transaction {transaction_id}")
-            return {
-                "success": True,
-                "boa_reference": header.get("id"),
-                "unique_identifier": header.get("uniqueIdentifier"),
-                "transaction_status": header.get("transactionStatus"),
-                "response": response
-            }
+            return BoATransferService.transfer_result(response)
 
-        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
-            logger.error(f"BoA API error during transfer: {str(e)}")
-            raise BoAServiceError(f"Transfer failed: {str(e)}")
         except SQLAlchemyError as e:
             db.rollback()
             logger.error(f"Database error saving BoA transaction: {str(e)}")
             raise BoAServiceError(f"Database error: {str(e)}")
 
     @staticmethod
-    async def initiate_other_bank_transfer(
-        transaction_id: int,
+    async def dispatch_other_bank_transfer(
         amount: str,
         bank_code: str,
         account_number: str,
         reference: str,
-        receiver_name: str,
-        db: Session
-    ) -> Dict[str, Any]:
+        receiver_name: str
+    ) -> TransferEnvelope:
         """
-        Initiate transfer to other bank using EthSwitch
+        Send an EthSwitch transfer to BoA without touching the database
         """
         try:
-            # Call BoA API
             response = await boa_api.initiate_other_bank_transfer(
                 amount=amount,
                 bank_code=bank_code,
@@ -257,53 +249,41 @@ class BoATransferService:
                 reference=reference,
                 receiver_name=receiver_name
             )
+        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
+            logger.error(f"BoA API error during other bank transfer: {str(e)}")
+            raise BoAServiceError(f"Other bank transfer failed: {str(e)}")
 
-            if not response:
-                raise BoAServiceError("Empty response from BoA API")
-
-            header = response.get("header", {})
-            body = response.get("body", {})
-
-            if header.get("status") != "success":
-                error_msg = "Other bank transfer failed"
-                if "error" in response:
-                    error_msg = response["error"].get("errorDetails", [{}])[0].get("message", error_msg)
-                raise BoAServiceError(f"BoA other bank transfer failed: {error_msg}")
+        if not response.is_success:
+            raise BoAServiceError(f"BoA other bank transfer failed: {response.error_message('Other bank transfer failed')}")
+        return response
 
+    @staticmethod
+    async def initiate_other_bank_transfer(
+        transaction_id: int,
+        amount: str,
+        bank_code: str,
+        account_number: str,
+        reference: str,
+        receiver_name: str,
+        db: Session
+    ) -> Dict[str, Any]:
+        """
+        Initiate transfer to other bank using EthSwitch
+        """
+        response = await BoATransferService.dispatch_other_bank_transfer(
+            amount, bank_code, account_number, reference, receiver_name
+        )
+        try:
             # Save transaction details
-            boa_transaction = BoATransaction(
-                transaction_id=transaction_id,
-                boa_reference=header.get("id"),
-                unique_identifier=header.get("uniqueIdentifier"),
-                transaction_type="other_bank_ethswitch",
-                boa_transaction_status=header.get("transactionStatus"),
-                debit_account_id=body.get("debitAccountId"),
-                credit_account_id=body.get("creditAccountId"),
-                debit_amount=body.get("debitAmount"),
-                credit_amount=body.get("creditAmount"),
-                debit_currency=body.get("debitCurrency"),
-                credit_currency=body.get("creditCurrency"),
-                reason=body.get("reason"),
-                transaction_date=body.get("transactionDate"),
-                audit_info=header.get("audit"),
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+            boa_transaction = BoATransferService.build_boa_transaction(
+                transaction_id, response, transaction_type="other_bank_ethswitch"
             )
             db.add(boa_transaction)
             db.commit()
 
             logger.info(f"Successfully initiated other bank transfer for transaction {transaction_id}")
-            return {
-                "success": True,
-                "boa_reference": header.get("id"),
-                "unique_identifier": header.get("uniqueIdentifier"),
-                "transaction_status": header.get("transactionStatus"),
-                "response": response
-            }
+            return BoATransferService.transfer_result(response)
 
-        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
-            logger.error(f"BoA API error during other bank transfer: {str(e)}")
-            raise BoAServiceError(f"Other bank transfer failed: {str(e)}")
         except SQLAlchemyError as e:
             db.rollback()
             logger.error(f"Database error saving other bank BoA transaction: {str(e)}")
@@ -321,22 +301,15 @@ class BoAStatusService:
         try:
             response = await boa_api.check_transaction_status(transaction_id)
 
-            if not response:
-                logger.error(f"Empty response from BoA status check for {transaction_id}")
+            status_data = response.first()
+            if not response.is_success or not status_data:
+                logger.error(f"BoA status check failed for {transaction_id}: {response.error_message()}")
                 return None
 
-            header = response.get("header", {})
-            body = response.get("body", [])
-
-            if header.get("status") != "success" or not body:
-                logger.error(f"BoA status check failed for {transaction_id}: {header}")
-                return None
-
-            status_data = body[0]
             return {
-                "id": status_data.get("id"),
-                "boa_reference": status_data.get("boaReference"),
-                "status": status_data.get("status")
+                "id": status_data.id,
+                "boa_reference": status_data.boa_reference,
+                "status": status_data.status
             }
 
         except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
@@ -348,156 +321,440 @@ class BoARateService:
     """Service for currency rates and balance"""
 
     @staticmethod
-    async def get_currency_rate(base_currency: str, db: Session) -> Optional[Dict[str, Any]]:
+    async def fetch_rate(base_currency: str) -> Tuple[Optional[Dict[str, Any]], RateEnvelope]:
         """
-        Get currency exchange rate from BoA
+        Call BoA for one currency without touching the database.
+        Returns (rate, response); rate is None when BoA had no usable rate.
         """
         try:
             response = await boa_api.get_currency_rate(base_currency)
+        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
+            logger.error(f"BoA API error getting currency rate: {str(e)}")
+            raise BoAServiceError(f"Currency rate fetch failed: {str(e)}")
 
-            if not response:
-                logger.error(f"Empty response from BoA rate API for {base_currency}")
-                return None
+        rate_data = response.first()
+        if not response.is_success or not rate_data:
+            logger.error(f"BoA rate API failed for {base_currency}: {response.error_message()}")
+            return None, response
 
-            header = response.get("header", {})
-            body = response.get("body", [])
+        return {
+            "currency_code": rate_data.currency_code,
+            "currency_name": rate_data.currency_name,
+            "buy_rate": rate_data.buy_rate,
+            "sell_rate": rate_data.sell_rate
+        }, response
 
-            if header.get("status") != "success" or not body:
-                logger.error(f"BoA rate API failed for {base_currency}: {header}")
-                return None
+    @staticmethod
+    def save_rates(db: Session, responses: Dict[str, RateEnvelope]) -> None:
+        """Upsert the boa_currency_rates rows for several currencies in one commit"""
+        existing = {
+            rate.currency_code: rate
+            for rate in db.query(BoACurrencyRate).filter(
+                BoACurrencyRate.currency_code.in_(list(responses))
+            )
+        }
+        now = datetime.utcnow()
+        for currency_code, response in responses.items():
+            rate_data = response.first()
+            row = existing.get(currency_code)
+            if row is None:
+                row = BoACurrencyRate(currency_code=currency_code)
+                db.add(row)
+            row.currency_name = rate_data.currency_name
+            row.buy_rate = rate_data.buy_rate
+            row.sell_rate = rate_data.sell_rate
+            row.boa_response = response.to_dict()
+            row.last_updated = now
+        db.commit()
 
-            rate_data = body[0]
+    @staticmethod
+    async def get_currency_rate(base_currency: str, db: Session) -> Optional[Dict[str, Any]]:
+        """
+        Get currency exchange rate from BoA and store it
+        """
+        rate, response = await BoARateService.fetch_rate(base_currency)
+        if rate is None:
+            return None
 
-            # Update database
-            existing_rate = db.query(BoACurrencyRate).filter(
-                BoACurrencyRate.currency_code == base_currency
-            ).first()
+        try:
+            BoARateService.save_rates(db, {base_currency: response})
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error saving currency rate: {str(e)}")
+            raise BoAServiceError(f"Database error: {str(e)}")
 
-            if existing_rate:
-                existing_rate.buy_rate = rate_data.get("buyRate")
-                existing_rate.sell_rate = rate_data.get("sellRate")
-                existing_rate.currency_name = rate_data.get("currencyName")
-                existing_rate.boa_response = response
-                existing_rate.last_updated = datetime.utcnow()
-            else:
-                new_rate = BoACurrencyRate(
-                    currency_code=base_currency,
-                    currency_name=rate_data.get("currencyName"),
-                    buy_rate=rate_data.get("buyRate"),
-                    sell_rate=rate_data.get("sellRate"),
-                    boa_response=response,
-                    last_updated=datetime.utcnow()
-                )
-                db.add(new_rate)
+        return rate
 
-            db.commit()
+    @staticmethod
+    async def get_rate(base_currency: str) -> Tuple[Optional[Dict[str, Any]], Optional[RateEnvelope]]:
+        """
+        Serve a rate no older than BOA_RATE_MAX_STALENESS: from the refreshed
+        snapshot when it is fresh, otherwise straight from BoA.
+        Returns (rate, None) or (None, BoA response) when BoA had no rate.
+        """
+        rate = await rate_snapshot.get(base_currency)
+        if rate is not None:
+            return rate, None
 
-            return {
-                "currency_code": rate_data.get("currencyCode"),
-                "currency_name": rate_data.get("currencyName"),
-                "buy_rate": rate_data.get("buyRate"),
-                "sell_rate": rate_data.get("sellRate")
-            }
+        rate, response = await BoARateService.fetch_rate(base_currency)
+        if rate is None:
+            return None, response
+        await rate_snapshot.set(base_currency, rate)
+        return rate, None
 
-        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
-            logger.error(f"BoA API error getting currency rate: {str(e)}")
-            raise BoAServiceError(f"Currency rate fetch failed: {str(e)}")
+    @staticmethod
+    async def refresh_rates() -> None:
+        """Scheduled job: fetch every BOA_RATE_CURRENCIES rate concurrently and store them"""
+        currencies = refreshed_rate_currencies()
+        results = await asyncio.gather(
+            *(BoARateService.fetch_rate(currency) for currency in currencies),
+            return_exceptions=True
+        )
+
+        fetched = {}
+        for currency, result in zip(currencies, results):
+            if isinstance(result, Exception):
+                logger.error(f"Rate refresh for {currency} failed: {str(result)}")
+                continue
+            rate, response = result
+            if rate is None:
+                continue
+            await rate_snapshot.set(currency, rate)
+            fetched[currency] = response
+
+        if not fetched:
+            return
+        db = SessionLocal()
+        try:
+            BoARateService.save_rates(db, fetched)
         except SQLAlchemyError as e:
+            # The snapshot is already updated; the table only keeps history
             db.rollback()
-            logger.error(f"Database error saving currency rate: {str(e)}")
-            raise BoAServiceError(f"Database error: {str(e)}")
+            logger.error(f"Database error saving refreshed currency rates: {str(e)}")
+        finally:
+            db.close()
 
     @staticmethod
-    async def get_balance(db: Session) -> Optional[Dict[str, Any]]:
+    async def get_balance(db: Session) -> Tuple[Optional[Dict[str, Any]], Optional[BalanceEnvelope]]:
         """
-        Get BoA account balance
+        Get BoA account balance and record it in the balance history.
+        Returns (balance, None) or (None, BoA response) when BoA had no balance.
         """
         try:
             response = await boa_api.get_balance()
+        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
+            logger.error(f"BoA API error getting balance: {str(e)}")
+            raise BoAServiceError(f"Balance fetch failed: {str(e)}")
 
-            if not response:
-                logger.error("Empty response from BoA balance API")
-                return None
+        balance_data = response.first()
+        if not response.is_success or not balance_data:
+            logger.error(f"BoA balance API failed: {response.error_message()}")
+            return None, response
 
-            header = response.get("header", {})
-            body = response.get("body", {})
+        await BoABalanceService.record_reading(db, balance_data.account_currency or "ETB", balance_data.amount)
+        return {
+            "account_currency": balance_data.account_currency,
+            "balance": balance_data.amount
+        }, None
 
-            if header.get("status") != "success":
-                logger.error(f"BoA balance API failed: {header}")
-                return None
 
-            # Update database
-            balance_entry = BoABalance(
-                account_currency=body.get("accountCurrency"),
-                balance=body.get("balance"),
-                boa_response=response,
-                last_updated=datetime.utcnow()
-            )
-            db.add(balance_entry)
+def _bucket_start(at: datetime, resolution: str) -> datetime:
+    if resolution == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(second=0, microsecond=0)
+
+
+class BoABalanceService:
+    """
+    Settlement balance history. Readings are folded into one row per minute;
+    minutes older than BOA_BALANCE_MINUTE_RETENTION_DAYS are rolled up into
+    hourly rows, and hours older than BOA_BALANCE_HOURLY_RETENTION_DAYS are
+    dropped. The latest reading is also kept in latest_balance_cache.
+    """
+
+    @staticmethod
+    def _merge_buckets(db: Session, rows: List[Dict[str, Any]]) -> None:
+        """Upsert bucket rows, folding each into an existing bucket's range and count"""
+        if not rows:
+            return
+        stmt = dialect_insert(db, BoABalanceReading).values(rows)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["account_currency", "resolution", "bucket_start"],
+            set_={
+                "balance": excluded.balance,
+                "min_balance": case(
+                    (excluded.min_balance < BoABalanceReading.min_balance, excluded.min_balance),
+                    else_=BoABalanceReading.min_balance
+                ),
+                "max_balance": case(
+                    (excluded.max_balance > BoABalanceReading.max_balance, excluded.max_balance),
+                    else_=BoABalanceReading.max_balance
+                ),
+                "sample_count": BoABalanceReading.sample_count + excluded.sample_count,
+                "last_updated": excluded.last_updated,
+            },
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    async def record_reading(db: Session, currency: str, balance: Optional[str], at: Optional[datetime] = None) -> None:
+        """Store one balance reading; failures are logged, the reading itself stays valid"""
+        try:
+            amount = Decimal(str(balance))
+        except (InvalidOperation, ValueError):
+            logger.warning(f"Skipping unparseable BoA balance {balance!r}")
+            return
+        at = at or datetime.utcnow()
+
+        await latest_balance_cache.set(currency, {
+            "account_currency": currency,
+            "balance": str(amount),
+            "as_of": at.isoformat(),
+        })
+
+        try:
+            BoABalanceService._merge_buckets(db, [{
+                "account_currency": currency,
+                "resolution": "minute",
+                "bucket_start": _bucket_start(at, "minute"),
+                "balance": amount,
+                "min_balance": amount,
+                "max_balance": amount,
+                "sample_count": 1,
+                "last_updated": at,
+            }])
             db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error saving balance reading: {str(e)}")
 
-            return {
-                "account_currency": body.get("accountCurrency"),
-                "balance": body.get("balance")
-            }
+    @staticmethod
+    async def latest(db: Session, currency: str) -> Optional[Dict[str, Any]]:
+        """Latest reading from the cache; after a cold start, one indexed row read fills it"""
+        reading = await latest_balance_cache.get(currency)
+        if reading is not None:
+            return reading
+
+        for resolution in ("minute", "hour"):
+            row = db.query(BoABalanceReading).filter(
+                BoABalanceReading.account_currency == currency,
+                BoABalanceReading.resolution == resolution
+            ).order_by(BoABalanceReading.bucket_start.desc()).first()
+            if row is not None:
+                reading = {
+                    "account_currency": currency,
+                    "balance": str(row.balance),
+                    "as_of": row.last_updated.isoformat(),
+                }
+                await latest_balance_cache.set(currency, reading)
+                return reading
+        return None
 
-        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
-            logger.error(f"BoA API error getting balance: {str(e)}")
-            raise BoAServiceError(f"Balance fetch failed: {str(e)}")
+    @staticmethod
+    def history(
+        db: Session,
+        currency: str,
+        resolution: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 1440
+    ) -> List[BoABalanceReading]:
+        query = db.query(BoABalanceReading).filter(
+            BoABalanceReading.account_currency == currency,
+            BoABalanceReading.resolution == resolution
+        )
+        if since:
+            query = query.filter(BoABalanceReading.bucket_start >= since)
+        if until:
+            query = query.filter(BoABalanceReading.bucket_start < until)
+        # Newest `limit` buckets, returned oldest first
+        rows = query.order_by(BoABalanceReading.bucket_start.desc()).limit(limit).all()
+        return rows[::-1]
+
+    @staticmethod
+    def downsample(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Roll aged minute buckets into hour buckets and drop expired hours, in one commit"""
+        now = now or datetime.utcnow()
+        cutoff = _bucket_start(now - timedelta(days=settings.BOA_BALANCE_MINUTE_RETENTION_DAYS), "hour")
+
+        minute_rows = db.query(BoABalanceReading).filter(
+            BoABalanceReading.resolution == "minute",
+            BoABalanceReading.bucket_start < cutoff
+        ).order_by(BoABalanceReading.account_currency, BoABalanceReading.bucket_start).all()
+
+        hours: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        for row in minute_rows:
+            key = (row.account_currency, _bucket_start(row.bucket_start, "hour"))
+            bucket = hours.get(key)
+            if bucket is None:
+                hours[key] = {
+                    "account_currency": row.account_currency,
+                    "resolution": "hour",
+                    "bucket_start": key[1],
+                    "balance": row.balance,
+                    "min_balance": row.min_balance,
+                    "max_balance": row.max_balance,
+                    "sample_count": row.sample_count,
+                    "last_updated": now,
+                }
+            else:
+                bucket["balance"] = row.balance
+                bucket["min_balance"] = min(bucket["min_balance"], row.min_balance)
+                bucket["max_balance"] = max(bucket["max_balance"], row.max_balance)
+                bucket["sample_count"] += row.sample_count
+
+        BoABalanceService._merge_buckets(db, list(hours.values()))
+        db.query(BoABalanceReading).filter(
+            BoABalanceReading.resolution == "minute",
+            BoABalanceReading.bucket_start < cutoff
+        ).delete(synchronize_session=False)
+
+        expired = 0
+        if settings.BOA_BALANCE_HOURLY_RETENTION_DAYS > 0:
+            expired = db.query(BoABalanceReading).filter(
+                BoABalanceReading.resolution == "hour",
+                BoABalanceReading.bucket_start < now - timedelta(days=settings.BOA_BALANCE_HOURLY_RETENTION_DAYS)
+            ).delete(synchronize_session=False)
+        db.commit()
+
+        return {"minutes_rolled_up": len(minute_rows), "hours_written": len(hours), "hours_expired": expired}
+
+    @staticmethod
+    async def poll() -> None:
+        """Scheduled job: take one balance reading with its own session"""
+        db = SessionLocal()
+        try:
+            await BoARateService.get_balance(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def run_downsample() -> None:
+        """Scheduled job: downsample with its own session"""
+        db = SessionLocal()
+        try:
+            summary = BoABalanceService.downsample(db)
+            logger.info(f"Balance history downsampled: {summary}")
         except SQLAlchemyError as e:
             db.rollback()
-            logger.error(f"Database error saving balance: {str(e)}")
-            raise BoAServiceError(f"Database error: {str(e)}")
+            logger.error(f"Database error downsampling balance history: {str(e)}")
+        finally:
+            db.close()
 
 
 class BoABankService:
     """Service for bank list operations"""
 
     @staticmethod
-    async def get_bank_list(db: Session) -> List[Dict[str, Any]]:
+    async def sync_bank_list(db: Session) -> Tuple[Optional[Dict[str, Any]], Optional[BoAEnvelope]]:
         """
-        Get list of available banks from BoA
+        Fetch the bank list from BoA, apply only the differences to
+        boa_bank_list and refresh the in-memory snapshot.
+        Returns (summary, None) or (None, failure envelope).
         """
         try:
             response = await boa_api.get_bank_list()
+        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
+            logger.error(f"BoA API error getting bank list: {str(e)}")
+            raise BoAServiceError(f"Bank list fetch failed: {str(e)}")
 
-            if not response:
-                logger.error("Empty response from BoA bank list API")
-                return []
+        if not response.is_success:
+            logger.error(f"BoA bank list API failed: {response.error_message()}")
+            return None, response
+        banks = [
+            {"bank_id": bank.id, "institution_name": bank.institution_name}
+            for bank in response.body or []
+            if bank.institution_name
+        ]
+        if response.body and len(banks) < len(response.body):
+            logger.warning(f"Skipped {len(response.body) - len(banks)} BoA bank list entries without an institution name")
+        if not banks:
+            # Never deactivate every bank because BoA returned an empty list
+            logger.error("BoA bank list API returned no banks, keeping the stored list")
+            return None, response.failure(502, "BoA returned an empty bank list")
 
-            header = response.get("header", {})
-            body = response.get("body", [])
+        try:
+            existing = {
+                row.bank_id: (row.institution_name, row.is_active)
+                for row in db.query(BoABankList.bank_id, BoABankList.institution_name, BoABankList.is_active)
+            }
+            now = datetime.utcnow()
+            changed = [
+                {**bank, "is_active": True, "last_updated": now}
+                for bank in banks
+                if existing.get(bank["bank_id"]) != (bank["institution_name"], True)
+            ]
+            # A bank listed without a name keeps its stored row as it is
+            listed = {bank.id for bank in response.body}
+            removed = [
+                bank_id for bank_id, (_, is_active) in existing.items()
+                if is_active and bank_id not in listed
+            ]
+
+            bulk_upsert(db, BoABankList, changed, ["bank_id"], ["institution_name", "is_active", "last_updated"])
+            if removed:
+                db.query(BoABankList).filter(BoABankList.bank_id.in_(removed)).update(
+                    {"is_active": False, "last_updated": now},
+                    synchronize_session=False
+                )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error saving bank list: {str(e)}")
+            raise BoAServiceError(f"Database error: {str(e)}")
 
-            if header.get("status") != "success":
-                logger.error(f"BoA bank list API failed: {header}")
-                return []
+        bank_list_snapshot.replace(banks)
+        added = sum(1 for bank in changed if bank["bank_id"] not in existing)
+        logger.info(f"Bank list synced: {added} added, {len(changed) - added} updated, {len(removed)} deactivated")
+        return {
+            "banks": banks,
+            "added": added,
+            "updated": len(changed) - added,
+            "deactivated": len(removed),
+            "version": bank_list_snapshot.version
+        }, None
 
-            # Update database with fresh bank list
-            # Clear existing banks first
-            db.query(BoABankList).delete()
+    @staticmethod
+    async def get_bank_list(db: Session) -> List[Dict[str, Any]]:
+        """
+        Get list of available banks from BoA
+        """
+        summary, _ = await BoABankService.sync_bank_list(db)
+        return summary["banks"] if summary else []
 
-            banks = []
-            for bank_data in body:
-                bank = BoABankList(
-                    bank_id=bank_data.get("id"),
-                    institution_name=bank_data.get("institutionName"),
-                    is_active=True,
-                    last_updated=datetime.utcnow()
-                )
-                db.add(bank)
-                banks.append({
-                    "bank_id": bank_data.get("id"),
-                    "institution_name": bank_data.get("institutionName")
-                })
+    @staticmethod
+    def load_snapshot(db: Session, reload: bool = False) -> bool:
+        """Fill an empty snapshot from the stored active banks, e.g. right after startup"""
+        if bank_list_snapshot.is_loaded and not reload:
+            return True
+        rows = db.query(BoABankList.bank_id, BoABankList.institution_name).filter(
+            BoABankList.is_active == True
+        ).all()
+        if not rows:
+            return bank_list_snapshot.is_loaded
+        bank_list_snapshot.replace([
+            {"bank_id": row.bank_id, "institution_name": row.institution_name}
+            for row in rows
+        ])
+        return True
 
-            db.commit()
-            logger.info(f"Successfully updated bank list with {len(banks)} banks")
-            return banks
+    @staticmethod
+    async def refresh_snapshot() -> None:
+        """Scheduled job: re-sync the bank list with its own session"""
+        db = SessionLocal()
+        try:
+            await BoABankService.sync_bank_list(db)
+        finally:
+            db.close()
 
-        except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
-            logger.error(f"BoA API error getting bank list: {str(e)}")
-            raise BoAServiceError(f"Bank list fetch failed: {str(e)}")
+    @staticmethod
+    async def reload_snapshot() -> None:
+        """Scheduled job on workers that do not sync with BoA: pick up the stored list"""
+        db = SessionLocal()
+        try:
+            BoABankService.load_snapshot(db, reload=True)
         except SQLAlchemyError as e:
-            db.rollback()
-            logger.error(f"Database error saving bank list: {str(e)}")
-            raise BoAServiceError(f"Database error: {str(e)}")
\ No newline at end of file
+            logger.error(f"Database error reloading bank list snapshot: {str(e)}")
+        finally:
+            db.close()
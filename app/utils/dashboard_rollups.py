@@ -0,0 +1,229 @@
+# app/utils/dashboard_rollups.py
+"""
+Daily rollups behind the admin dashboard.
+
+daily_transaction_stats and daily_user_signups are updated from an
+after_flush hook, so any ORM insert, status change or delete of a
+Transaction or User moves the rollups in the same database transaction.
+Bulk UPDATEs that bypass the ORM call record_status_change themselves.
+Once a transaction that moved them commits, the cached dashboard responses
+are invalidated.
+
+Rebuild both tables from the raw rows with:
+
+    python -m app.utils.dashboard_rollups backfill
+"""
+
+import argparse
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import TIMESTAMP, Date, String, cast, event, func, insert, inspect, literal, select, text
+from sqlalchemy.orm import Session
+
+from app.database.database import SessionLocal, dialect_insert
+from app.models.dashboard_stats import DailyTransactionStats, DailyUserSignups
+from app.models.manual_deposits import ManualDeposit
+from app.models.transactions import Transaction
+from app.models.users import User
+from app.utils.response_cache import dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+TransactionKey = Tuple[date, str, str]
+
+_TRACKED_COLUMNS = ("created_at", "currency", "status", "amount")
+
+# Session.info flag: this transaction changed something the dashboard shows
+_DASHBOARD_CHANGED = "dashboard_changed"
+
+
+def _status_value(status: Any) -> str:
+    return getattr(status, "value", status) or ""
+
+
+def _transaction_key(created_at: datetime, currency: str, status: Any) -> TransactionKey:
+    return (created_at or datetime.utcnow()).date(), currency or "", _status_value(status)
+
+
+def _previous_value(obj: Any, column: str) -> Any:
+    """The column's value as of the last flush"""
+    history = inspect(obj).attrs[column].history
+    return history.deleted[0] if history.deleted else getattr(obj, column)
+
+
+def apply_transaction_deltas(db: Session, deltas: Dict[TransactionKey, List]) -> None:
+    """Add [count, amount] deltas to their (date, currency, status) rows with one upsert"""
+    rows = [
+        {"stat_date": stat_date, "currency": currency, "status": status,
+         "transaction_count": count, "amount": amount, "last_updated": datetime.utcnow()}
+        for (stat_date, currency, status), (count, amount) in deltas.items()
+        if count or amount
+    ]
+    if not rows:
+        return
+    stmt = dialect_insert(db, DailyTransactionStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["stat_date", "currency", "status"],
+        set_={
+            "transaction_count": DailyTransactionStats.transaction_count + stmt.excluded.transaction_count,
+            "amount": DailyTransactionStats.amount + stmt.excluded.amount,
+            "last_updated": stmt.excluded.last_updated,
+        },
+    )
+    db.connection().execute(stmt)
+
+
+def apply_signup_deltas(db: Session, deltas: Dict[date, int]) -> None:
+    rows = [
+        {"stat_date": stat_date, "signup_count": count, "last_updated": datetime.utcnow()}
+        for stat_date, count in deltas.items()
+        if count
+    ]
+    if not rows:
+        return
+    stmt = dialect_insert(db, DailyUserSignups).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["stat_date"],
+        set_={
+            "signup_count": DailyUserSignups.signup_count + stmt.excluded.signup_count,
+            "last_updated": stmt.excluded.last_updated,
+        },
+    )
+    db.connection().execute(stmt)
+
+
+def record_status_change(db: Session, rows: Iterable[Any], new_status: Any) -> None:
+    """
+    Move transactions changed by a bulk UPDATE to their new status' rows.
+    Each item needs created_at, currency, amount and the status it had
+    before the update.
+    """
+    deltas: Dict[TransactionKey, List] = defaultdict(lambda: [0, Decimal("0")])
+    for row in rows:
+        if _status_value(row.status) == _status_value(new_status):
+            continue
+        amount = Decimal(str(row.amount))
+        old = deltas[_transaction_key(row.created_at, row.currency, row.status)]
+        old[0] -= 1
+        old[1] -= amount
+        new = deltas[_transaction_key(row.created_at, row.currency, new_status)]
+        new[0] += 1
+        new[1] += amount
+    apply_transaction_deltas(db, deltas)
+    if deltas:
+        db.info[_DASHBOARD_CHANGED] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_rollups(session: Session, flush_context: Any) -> None:
+    transaction_deltas: Dict[TransactionKey, List] = defaultdict(lambda: [0, Decimal("0")])
+    signup_deltas: Dict[date, int] = defaultdict(int)
+
+    def add(key: TransactionKey, sign: int, amount: Any) -> None:
+        delta = transaction_deltas[key]
+        delta[0] += sign
+        delta[1] += sign * Decimal(str(amount or 0))
+
+    def previous_key(obj: Transaction) -> TransactionKey:
+        return _transaction_key(*(_previous_value(obj, column) for column in _TRACKED_COLUMNS[:3]))
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            add(_transaction_key(obj.created_at, obj.currency, obj.status), 1, obj.amount)
+        elif isinstance(obj, User):
+            signup_deltas[(obj.created_at or datetime.utcnow()).date()] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            add(previous_key(obj), -1, _previous_value(obj, "amount"))
+        elif isinstance(obj, User):
+            signup_deltas[(_previous_value(obj, "created_at") or datetime.utcnow()).date()] -= 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[column].history.has_changes() for column in _TRACKED_COLUMNS):
+            continue
+        add(previous_key(obj), -1, _previous_value(obj, "amount"))
+        add(_transaction_key(obj.created_at, obj.currency, obj.status), 1, obj.amount)
+
+    if transaction_deltas:
+        apply_transaction_deltas(session, transaction_deltas)
+    if signup_deltas:
+        apply_signup_deltas(session, signup_deltas)
+
+    # Pending manual deposits are counted live by the summary
+    if transaction_deltas or signup_deltas or any(
+        isinstance(obj, ManualDeposit) for obj in (*session.new, *session.deleted, *session.dirty)
+    ):
+        session.info[_DASHBOARD_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboard_cache(session: Session) -> None:
+    if session.info.pop(_DASHBOARD_CHANGED, False):
+        dashboard_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_dashboard_changes(session: Session) -> None:
+    session.info.pop(_DASHBOARD_CHANGED, None)
+
+
+def backfill(db: Session) -> Dict[str, int]:
+    """Rebuild both rollups from the transactions and users tables in one commit"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Writers wait until the rebuilt rollups are committed, so none of their changes are lost
+        db.execute(text("LOCK TABLE transactions, users IN SHARE MODE"))
+
+    db.query(DailyTransactionStats).delete(synchronize_session=False)
+    db.query(DailyUserSignups).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    # date() rather than CAST(... AS DATE), which SQLite turns into a number
+    stat_date = func.date(Transaction.created_at, type_=Date)
+    currency = func.coalesce(Transaction.currency, "")
+    status = func.coalesce(cast(Transaction.status, String(20)), "")
+    db.execute(insert(DailyTransactionStats).from_select(
+        ["stat_date", "currency", "status", "transaction_count", "amount", "last_updated"],
+        select(
+            stat_date, currency, status,
+            func.count(Transaction.transaction_id),
+            func.coalesce(func.sum(Transaction.amount), 0),
+            literal(now, TIMESTAMP),
+        ).where(Transaction.created_at.is_not(None)).group_by(stat_date, currency, status)
+    ))
+
+    signup_date = func.date(User.created_at, type_=Date)
+    db.execute(insert(DailyUserSignups).from_select(
+        ["stat_date", "signup_count", "last_updated"],
+        select(signup_date, func.count(User.user_id), literal(now, TIMESTAMP))
+        .where(User.created_at.is_not(None)).group_by(signup_date)
+    ))
+    db.info[_DASHBOARD_CHANGED] = True
+    db.commit()
+
+    return {
+        "daily_transaction_stats": db.query(DailyTransactionStats).count(),
+        "daily_user_signups": db.query(DailyUserSignups).count(),
+    }
+
+
+if __name__ == "__main__":
+    import main  # noqa: F401 - loads every model so the mappers configure
+
+    parser = argparse.ArgumentParser(description="Maintain the admin dashboard rollups")
+    parser.add_argument("command", choices=["backfill"], help="backfill: rebuild the rollups from raw rows")
+    parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        for table, count in backfill(session).items():
+            print(f"{table}: {count} rows")
+    finally:
+        session.close()
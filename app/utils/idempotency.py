@@ -0,0 +1,265 @@
+# app/utils/idempotency.py
+
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from redis.exceptions import RedisError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.core.config import settings
+from app.database import database
+from app.database.database import SessionLocal
+from app.models.idempotency_keys import IdempotencyKey
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+IDEMPOTENCY_OUTCOMES = registry.counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key, by how they were answered",
+    ["scope", "outcome"],
+)
+
+
+@dataclass
+class IdempotencyClaim:
+    """Result of claiming a key: either we own it, or there is something to answer with"""
+    owned: bool = False
+    replay: Optional[Dict[str, Any]] = None  # {"status_code", "body"} of the first request
+    conflict: Optional[str] = None  # Why the request cannot run now
+
+
+def request_fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True).encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Remembers the response to each (scope, Idempotency-Key) for `ttl` seconds.
+    Redis is the primary store: claiming a key is a single
+    SET key value NX GET EX round trip, which either takes the key or
+    returns what is already there. When Redis is not configured or fails,
+    the unique (scope, idempotency_key) constraint on idempotency_keys
+    does the same job; that database work runs in a worker thread so it
+    does not block the event loop.
+    """
+
+    def __init__(self, ttl: int, in_progress_ttl: int):
+        self.ttl = ttl
+        self.in_progress_ttl = in_progress_ttl
+
+    @staticmethod
+    def redis_key(scope: str, key: str) -> str:
+        return f"idempotency:{scope}:{key}"
+
+    async def claim(self, scope: str, key: str, fingerprint: str) -> IdempotencyClaim:
+        marker = {"state": "in_progress", "fingerprint": fingerprint}
+        redis = database.redis_client
+        if redis is not None:
+            try:
+                existing = await redis.set(
+                    self.redis_key(scope, key), json.dumps(marker), nx=True, get=True, ex=self.in_progress_ttl
+                )
+                return self._claim_from(json.loads(existing) if existing else None, fingerprint)
+            except RedisError as e:
+                logger.warning(f"Redis error claiming idempotency key, using the database: {e}")
+        return await asyncio.to_thread(self._db_claim, scope, key, fingerprint)
+
+    async def complete(self, scope: str, key: str, fingerprint: str, status_code: int, body: Any) -> None:
+        record = {"state": "completed", "fingerprint": fingerprint, "status_code": status_code, "body": body}
+        redis = database.redis_client
+        if redis is not None:
+            try:
+                await redis.set(self.redis_key(scope, key), json.dumps(record), ex=self.ttl)
+                return
+            except RedisError as e:
+                logger.warning(f"Redis error storing idempotent response, using the database: {e}")
+        await asyncio.to_thread(self._db_complete, scope, key, record)
+
+    async def release(self, scope: str, key: str) -> None:
+        """Forget a claim whose request failed before producing a response, so it can be retried"""
+        redis = database.redis_client
+        if redis is not None:
+            try:
+                await redis.delete(self.redis_key(scope, key))
+                return
+            except RedisError as e:
+                logger.warning(f"Redis error releasing idempotency key: {e}")
+        await asyncio.to_thread(self._db_release, scope, key)
+
+    async def purge_expired(self) -> None:
+        """Scheduled job: drop fallback rows whose replay window has passed"""
+        await asyncio.to_thread(self._db_purge)
+
+    @staticmethod
+    def _claim_from(existing: Optional[Dict[str, Any]], fingerprint: str) -> IdempotencyClaim:
+        if existing is None:
+            return IdempotencyClaim(owned=True)
+        if existing.get("fingerprint") != fingerprint:
+            return IdempotencyClaim(conflict="Idempotency-Key was already used with a different request")
+        if existing.get("state") != "completed":
+            return IdempotencyClaim(conflict="A request with this Idempotency-Key is still being processed")
+        return IdempotencyClaim(replay={"status_code": existing["status_code"], "body": existing["body"]})
+
+    def _db_claim(self, scope: str, key: str, fingerprint: str) -> IdempotencyClaim:
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.add(IdempotencyKey(
+                scope=scope,
+                idempotency_key=key,
+                fingerprint=fingerprint,
+                state="in_progress",
+                expires_at=now + timedelta(seconds=self.in_progress_ttl)
+            ))
+            db.commit()
+            return IdempotencyClaim(owned=True)
+        except IntegrityError:
+            db.rollback()
+            # Someone holds the key; an expired row is taken over atomically
+            taken_over = db.query(IdempotencyKey).filter(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.idempotency_key == key,
+                IdempotencyKey.expires_at < now
+            ).update({
+                IdempotencyKey.fingerprint: fingerprint,
+                IdempotencyKey.state: "in_progress",
+                IdempotencyKey.response_status: None,
+                IdempotencyKey.response_body: None,
+                IdempotencyKey.expires_at: now + timedelta(seconds=self.in_progress_ttl),
+            }, synchronize_session=False)
+            db.commit()
+            if taken_over:
+                return IdempotencyClaim(owned=True)
+            row = db.query(IdempotencyKey).filter(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.idempotency_key == key
+            ).first()
+            if row is None:
+                return IdempotencyClaim(conflict="A request with this Idempotency-Key is still being processed")
+            return self._claim_from({
+                "state": row.state,
+                "fingerprint": row.fingerprint,
+                "status_code": row.response_status,
+                "body": row.response_body,
+            }, fingerprint)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _db_release(scope: str, key: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.idempotency_key == key,
+                IdempotencyKey.state == "in_progress"
+            ).delete(synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error releasing idempotency key: {str(e)}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _db_purge() -> None:
+        db = SessionLocal()
+        try:
+            deleted = db.query(IdempotencyKey).filter(
+                IdempotencyKey.expires_at < datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info(f"Purged {deleted} expired idempotency keys")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error purging idempotency keys: {str(e)}")
+        finally:
+            db.close()
+
+    def _db_complete(self, scope: str, key: str, record: Dict[str, Any]) -> None:
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.idempotency_key == key
+            ).update({
+                IdempotencyKey.state: "completed",
+                IdempotencyKey.response_status: record["status_code"],
+                IdempotencyKey.response_body: record["body"],
+                IdempotencyKey.expires_at: datetime.utcnow() + timedelta(seconds=self.ttl),
+            }, synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error storing idempotent response: {str(e)}")
+        finally:
+            db.close()
+
+
+idempotency_store = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+    in_progress_ttl=settings.IDEMPOTENCY_IN_PROGRESS_TTL_SECONDS,
+)
+
+
+async def run_idempotent(
+    scope: str,
+    key: Optional[str],
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    status_code: int = 200
+) -> Any:
+    """
+    Run `handler` at most once per (scope, key) within the key TTL;
+    `status_code` is what the endpoint answers with on success.
+    A repeat of a finished request gets the stored response back without
+    running the handler; a repeat while the first is still running gets 409.
+    Requests without a key run as before.
+    """
+    if not key:
+        return await handler()
+
+    fingerprint = request_fingerprint(payload)
+    claim = await idempotency_store.claim(scope, key, fingerprint)
+    if claim.replay is not None:
+        IDEMPOTENCY_OUTCOMES.inc(scope=scope, outcome="replayed")
+        return JSONResponse(
+            status_code=claim.replay["status_code"],
+            content=claim.replay["body"],
+            headers={"Idempotent-Replayed": "true"}
+        )
+    if claim.conflict is not None:
+        IDEMPOTENCY_OUTCOMES.inc(scope=scope, outcome="conflict")
+        return JSONResponse(status_code=409, content={"detail": claim.conflict})
+
+    try:
+        result = await handler()
+    except HTTPException as e:
+        # A deliberate error answer is replayed like any other response
+        await idempotency_store.complete(scope, key, fingerprint, e.status_code, {"detail": jsonable_encoder(e.detail)})
+        IDEMPOTENCY_OUTCOMES.inc(scope=scope, outcome="executed")
+        raise
+    except Exception:
+        await idempotency_store.release(scope, key)
+        raise
+
+    if isinstance(result, Response):
+        status_code = result.status_code
+        body = json.loads(result.body) if result.body else None
+    else:
+        body = jsonable_encoder(result)
+    await idempotency_store.complete(scope, key, fingerprint, status_code, body)
+    IDEMPOTENCY_OUTCOMES.inc(scope=scope, outcome="executed")
+    return JSONResponse(status_code=status_code, content=body)
@@ -0,0 +1,280 @@
+# app/utils/outbox.py
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.notifications import Notification, ChannelType
+from app.models.outbox_events import OutboxEvent
+from app.models.users import User
+from app.utils.email_service import send_email_async
+from app.utils.metrics import registry
+from app.utils.sms_service import send_sms
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_EVENT_PREFIX = "notification."
+# The in-app notification; a user sees one Notification row per notification, written for this event
+PUSH_EVENT_TYPE = f"{NOTIFICATION_EVENT_PREFIX}{ChannelType.push.value}"
+
+# How long a claimed event is hidden from other dispatchers while it is delivered
+CLAIM_LEASE = timedelta(minutes=2)
+
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+OUTBOX_DISPATCHED = registry.counter(
+    "outbox_events_dispatched_total",
+    "Outbox events handled by the dispatcher, by type and outcome",
+    ["event_type", "outcome"],
+)
+
+
+def enqueue_notification(
+    db: Session,
+    user_id: int,
+    title: str,
+    message: str,
+    type: str,
+    channels: Iterable[ChannelType] = (ChannelType.push,)
+) -> None:
+    """
+    Queue a notification to `user_id` on each channel as part of `db`'s
+    current transaction; nothing is delivered unless that transaction commits.
+    """
+    payload = {"user_id": user_id, "title": title, "message": message, "type": type}
+    db.add_all([
+        OutboxEvent(event_type=f"{NOTIFICATION_EVENT_PREFIX}{ChannelType(channel).value}", payload=payload)
+        for channel in channels
+    ])
+
+
+def enqueue_notifications(
+    db: Session,
+    user_ids: Iterable[int],
+    title: str,
+    message: str,
+    type: str,
+    channels: Iterable[ChannelType] = (ChannelType.push,)
+) -> None:
+    """The same notification to many users, queued with one multi-row INSERT"""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "event_type": f"{NOTIFICATION_EVENT_PREFIX}{ChannelType(channel).value}",
+            "payload": {"user_id": user_id, "title": title, "message": message, "type": type},
+            "status": "pending",
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+        }
+        for user_id in user_ids
+        for channel in channels
+    ]
+    if rows:
+        db.execute(insert(OutboxEvent), rows)
+
+
+@dataclass(frozen=True)
+class ClaimedEvent:
+    id: int
+    event_type: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+@dataclass(frozen=True)
+class DeliveryResult:
+    error: Optional[str] = None
+    retry: bool = True  # False when trying again cannot help, e.g. no address on file
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(RETRY_BASE_DELAY * 2 ** min(attempts, 10), RETRY_MAX_DELAY)
+
+
+class OutboxDispatcher:
+    """
+    Delivers outbox events in batches. Each tick claims due rows with
+    FOR UPDATE SKIP LOCKED and leases them, delivers emails and SMS with
+    bounded concurrency while holding no connection, then writes the
+    notification rows and every event's outcome in one commit. Push
+    notifications are the in-app notification rows themselves, so they
+    are written exactly once; email and SMS are retried with backoff and
+    their outcome stays on the outbox row.
+    """
+
+    def __init__(self, batch_size: int, concurrency: int, max_attempts: int, retention: timedelta):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retention = retention
+
+    def claim(self, db: Session, now: datetime) -> List[ClaimedEvent]:
+        rows = db.query(OutboxEvent).filter(
+            OutboxEvent.status == "pending",
+            OutboxEvent.available_at <= now
+        ).order_by(OutboxEvent.available_at).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        claimed = [ClaimedEvent(row.id, row.event_type, row.payload or {}, row.attempts or 0) for row in rows]
+        if claimed:
+            db.query(OutboxEvent).filter(
+                OutboxEvent.id.in_([event.id for event in claimed])
+            ).update({OutboxEvent.available_at: now + CLAIM_LEASE}, synchronize_session=False)
+        db.commit()
+        return claimed
+
+    @staticmethod
+    def load_contacts(db: Session, claimed: List[ClaimedEvent]) -> Dict[int, Any]:
+        user_ids = {event.payload.get("user_id") for event in claimed if event.event_type != PUSH_EVENT_TYPE}
+        if not user_ids:
+            return {}
+        rows = db.query(User.user_id, User.email, User.phone).filter(User.user_id.in_(user_ids)).all()
+        return {row.user_id: row for row in rows}
+
+    async def deliver(self, claimed: List[ClaimedEvent], contacts: Dict[int, Any]) -> Dict[int, DeliveryResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(event: ClaimedEvent) -> DeliveryResult:
+            payload = event.payload
+            contact = contacts.get(payload.get("user_id"))
+            if event.event_type == PUSH_EVENT_TYPE:
+                return DeliveryResult()
+            if event.event_type == "notification.email":
+                if contact is None or not contact.email:
+                    return DeliveryResult("User has no email address", retry=False)
+                async with semaphore:
+                    result = await send_email_async(payload["title"], contact.email, payload["message"])
+                return DeliveryResult(result.get("error")) if "error" in result else DeliveryResult()
+            if event.event_type == "notification.sms":
+                if contact is None or not contact.phone:
+                    return DeliveryResult("User has no phone number", retry=False)
+                async with semaphore:
+                    sent = await asyncio.to_thread(send_sms, contact.phone, payload["message"])
+                return DeliveryResult() if sent else DeliveryResult("SMS could not be sent")
+            return DeliveryResult(f"Unknown outbox event type {event.event_type}", retry=False)
+
+        results = await asyncio.gather(*(send(event) for event in claimed))
+        return {event.id: result for event, result in zip(claimed, results)}
+
+    def apply(self, db: Session, claimed: List[ClaimedEvent], results: Dict[int, DeliveryResult], now: datetime) -> Dict[str, int]:
+        """Write the in-app notification rows and every event outcome from one batch in a single commit"""
+        sent: List[int] = []
+        retry_at: Dict[int, datetime] = {}
+        errors: Dict[int, str] = {}
+        notifications: List[Notification] = []
+
+        for event in claimed:
+            result = results[event.id]
+            if result.error is None:
+                sent.append(event.id)
+                outcome = "sent"
+            else:
+                errors[event.id] = result.error
+                if result.retry and event.attempts + 1 < self.max_attempts:
+                    retry_at[event.id] = now + retry_delay(event.attempts)
+                    outcome = "retry"
+                else:
+                    outcome = "failed"
+            OUTBOX_DISPATCHED.inc(event_type=event.event_type, outcome=outcome)
+
+            if event.event_type == PUSH_EVENT_TYPE and outcome != "retry":
+                payload = event.payload
+                notifications.append(Notification(
+                    user_id=payload["user_id"],
+                    title=payload["title"],
+                    message=payload["message"],
+                    channel=ChannelType.push,
+                    type=payload["type"],
+                    is_sent=outcome == "sent",
+                    sent_at=now if outcome == "sent" else None
+                ))
+            if result.error is not None:
+                logger.warning(f"Outbox event {event.id} ({event.event_type}) {outcome}: {result.error}")
+
+        if sent:
+            db.query(OutboxEvent).filter(OutboxEvent.id.in_(sent)).update({
+                OutboxEvent.status: "sent",
+                OutboxEvent.attempts: OutboxEvent.attempts + 1,
+                OutboxEvent.processed_at: now,
+            }, synchronize_session=False)
+
+        if retry_at:
+            db.query(OutboxEvent).filter(OutboxEvent.id.in_(list(retry_at))).update({
+                OutboxEvent.attempts: OutboxEvent.attempts + 1,
+                OutboxEvent.available_at: case(retry_at, value=OutboxEvent.id),
+                OutboxEvent.last_error: case({event_id: errors[event_id] for event_id in retry_at}, value=OutboxEvent.id),
+            }, synchronize_session=False)
+
+        failed = {event_id: error for event_id, error in errors.items() if event_id not in retry_at}
+        if failed:
+            db.query(OutboxEvent).filter(OutboxEvent.id.in_(list(failed))).update({
+                OutboxEvent.status: "failed",
+                OutboxEvent.attempts: OutboxEvent.attempts + 1,
+                OutboxEvent.last_error: case(failed, value=OutboxEvent.id),
+                OutboxEvent.processed_at: now,
+            }, synchronize_session=False)
+
+        db.add_all(notifications)
+        db.commit()
+        return {"sent": len(sent), "retry": len(retry_at), "failed": len(failed)}
+
+    async def run_once(self) -> int:
+        """Claim, deliver and apply one batch; returns the number of events claimed"""
+        db = SessionLocal()
+        try:
+            claimed = self.claim(db, datetime.utcnow())
+            if not claimed:
+                return 0
+            contacts = self.load_contacts(db, claimed)
+            # No connection is held while emails and SMS go out
+            db.close()
+            results = await self.deliver(claimed, contacts)
+            summary = self.apply(db, claimed, results, datetime.utcnow())
+            logger.info(f"Dispatched {len(claimed)} outbox events: {summary}")
+            return len(claimed)
+        except SQLAlchemyError as e:
+            # Claimed events become due again when their lease runs out
+            db.rollback()
+            logger.error(f"Database error dispatching outbox events: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        """Scheduled job: drain every due batch"""
+        while await self.run_once() >= self.batch_size:
+            pass
+
+    async def purge_processed(self) -> None:
+        """Scheduled job: drop sent and failed events older than the retention window"""
+        db = SessionLocal()
+        try:
+            deleted = db.query(OutboxEvent).filter(
+                OutboxEvent.status != "pending",
+                OutboxEvent.processed_at < datetime.utcnow() - self.retention
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info(f"Purged {deleted} processed outbox events")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error purging outbox events: {str(e)}")
+        finally:
+            db.close()
+
+
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    concurrency=settings.OUTBOX_CONCURRENCY,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retention=timedelta(days=settings.OUTBOX_RETENTION_DAYS),
+)
@@ -0,0 +1,101 @@
+# app/utils/pagination.py
+
+import base64
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.orm import Query, Session
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Exact counts stand in for planner estimates on databases without EXPLAIN (FORMAT JSON)
+COUNT_CACHE_SECONDS = 60
+_count_cache: TTLCache = TTLCache(maxsize=256, ttl=COUNT_CACHE_SECONDS)
+_count_cache_lock = threading.Lock()
+
+
+class InvalidCursorError(ValueError):
+    """The cursor was not produced by encode_cursor"""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_page(
+    query: Query,
+    created_at_column: Any,
+    id_column: Any,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Page of `query` ordered by (created_at, id), newest first unless
+    `descending` is False, starting after `cursor`. Unlike OFFSET, the cost
+    does not grow with the page number and rows inserted meanwhile neither
+    shift nor repeat entries.
+    Returns the rows and the cursor of the next page (None on the last one).
+    """
+    key = tuple_(created_at_column, id_column)
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.filter(key < position if descending else key > position)
+    if descending:
+        query = query.order_by(created_at_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(created_at_column.asc(), id_column.asc())
+    # One extra row tells whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_at_column.key), getattr(last, id_column.key))
+
+
+def collection_etag(*parts: Any) -> str:
+    """Weak validator for a collection page, e.g. from its owner, latest updated_at, size and page parameters"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def estimate_count(db: Session, query: Query) -> int:
+    """
+    Approximate number of rows `query` matches, without counting them.
+    On PostgreSQL this is the planner's row estimate; elsewhere an exact
+    count cached for COUNT_CACHE_SECONDS per distinct query.
+    """
+    dialect = db.get_bind().dialect
+    statement = query.order_by(None).statement
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "postgresql":
+        # Colons are escaped so text() does not read literals as bind parameters
+        plan = db.execute(text("EXPLAIN (FORMAT JSON) " + sql.replace(":", "\\:"))).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    with _count_cache_lock:
+        count = _count_cache.get(sql)
+    if count is None:
+        count = db.execute(select(func.count()).select_from(statement.subquery())).scalar()
+        with _count_cache_lock:
+            _count_cache[sql] = count
+    return count
@@ -0,0 +1,451 @@
+# app/utils/payout_jobs.py
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.boa_integration import BoAPayoutJob, BoAPayoutItem, BoATransaction
+from app.models.transactions import Transaction, TransactionStatus
+from app.schemas.boa_integration import BoAPayoutItemRequest
+from app.utils.boa_cache import bank_list_snapshot
+from app.utils.boa_service import BoATransferService, BoAServiceError
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+FINAL_ITEM_STATUSES = ("succeeded", "failed")
+
+PAYOUT_ITEMS = registry.counter(
+    "boa_payout_items_total",
+    "Bulk payout transfers dispatched, by type and outcome",
+    ["transfer_type", "outcome"],
+)
+
+# Runner tasks started in this process, kept referenced until they finish
+_running: Set[asyncio.Task] = set()
+
+
+class PayoutValidationError(Exception):
+    """Raised when a bulk payout is rejected; `errors` lists every problem found"""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} invalid payout item(s)")
+        self.errors = errors
+
+
+def _same_amount(submitted: str, stored: Decimal) -> bool:
+    try:
+        return Decimal(submitted) == stored
+    except InvalidOperation:
+        # Already reported as an invalid amount
+        return True
+
+
+def validate_payout(db: Session, items: List[BoAPayoutItemRequest]) -> None:
+    """
+    Check the whole submission in one pass, with one query per lookup
+    instead of one per item, and report every problem at once. Each item
+    must pay out a pending transaction with the same amount and account.
+    """
+    errors: List[Dict[str, Any]] = []
+
+    def reject(position: int, message: str):
+        errors.append({"position": position, "message": message})
+
+    if len(items) > settings.BOA_PAYOUT_MAX_ITEMS:
+        raise PayoutValidationError([{"position": None, "message": f"At most {settings.BOA_PAYOUT_MAX_ITEMS} transfers per payout"}])
+
+    known_banks = {bank["bank_id"] for bank in bank_list_snapshot.banks}
+    seen_references: Dict[str, int] = {}
+    seen_transactions: Dict[int, int] = {}
+    for position, item in enumerate(items):
+        try:
+            if Decimal(item.amount) <= 0:
+                reject(position, "Amount must be positive")
+        except InvalidOperation:
+            reject(position, f"Invalid amount {item.amount!r}")
+        if item.reference in seen_references:
+            reject(position, f"Duplicate reference, also used by item {seen_references[item.reference]}")
+        seen_references.setdefault(item.reference, position)
+        if item.transaction_id in seen_transactions:
+            reject(position, f"Duplicate transaction_id, also used by item {seen_transactions[item.transaction_id]}")
+        seen_transactions.setdefault(item.transaction_id, position)
+        if item.transfer_type == "other_bank":
+            if not item.bank_code or not item.receiver_name:
+                reject(position, "Other bank transfers need bank_code and receiver_name")
+            elif known_banks and item.bank_code not in known_banks:
+                reject(position, f"Unknown bank_code {item.bank_code}")
+
+    transaction_ids = list(seen_transactions)
+    existing = {
+        row.transaction_id: row
+        for row in db.query(
+            Transaction.transaction_id, Transaction.amount, Transaction.account_number, Transaction.status
+        ).filter(Transaction.transaction_id.in_(transaction_ids))
+    }
+    already_sent = {
+        row.transaction_id
+        for row in db.query(BoATransaction.transaction_id).filter(BoATransaction.transaction_id.in_(transaction_ids))
+    }
+    in_flight = {
+        row.transaction_id
+        for row in db.query(BoAPayoutItem.transaction_id).filter(
+            BoAPayoutItem.transaction_id.in_(transaction_ids),
+            BoAPayoutItem.status.notin_(FINAL_ITEM_STATUSES)
+        )
+    }
+    for transaction_id, position in seen_transactions.items():
+        transaction = existing.get(transaction_id)
+        if transaction is None:
+            reject(position, f"Transaction {transaction_id} not found")
+        elif transaction.status != TransactionStatus.pending:
+            reject(position, f"Transaction {transaction_id} is {transaction.status.value}, not pending")
+        elif not _same_amount(items[position].amount, transaction.amount):
+            reject(position, f"Amount does not match transaction {transaction_id} ({transaction.amount})")
+        elif items[position].account_number != transaction.account_number:
+            reject(position, f"Account number does not match transaction {transaction_id}")
+        elif transaction_id in already_sent:
+            reject(position, f"Transaction {transaction_id} was already sent to BoA")
+        elif transaction_id in in_flight:
+            reject(position, f"Transaction {transaction_id} is part of a payout still in progress")
+
+    if errors:
+        raise PayoutValidationError(sorted(errors, key=lambda error: error["position"]))
+
+
+def create_payout_job(db: Session, items: List[BoAPayoutItemRequest], created_by: Optional[int]) -> BoAPayoutJob:
+    """Store the job and all of its items in one commit"""
+    job = BoAPayoutJob(created_by=created_by, status="queued", total_items=len(items))
+    job.items = [
+        BoAPayoutItem(
+            position=position,
+            transaction_id=item.transaction_id,
+            transfer_type=item.transfer_type,
+            amount=item.amount,
+            account_number=item.account_number,
+            bank_code=item.bank_code,
+            receiver_name=item.receiver_name,
+            reference=item.reference,
+            status="queued"
+        )
+        for position, item in enumerate(items)
+    ]
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+class PayoutLeaseLostError(Exception):
+    """Another runner took the payout job over after this one's lease ran out"""
+
+
+INTERRUPTED_ITEM_ERROR = "Interrupted before BoA answered; check the transfer status before resubmitting"
+
+
+class BoAPayoutRunner:
+    """
+    Dispatch a payout job's items in waves of `flush_size`: mark the wave
+    processing, send it to BoA with at most `concurrency` calls in flight,
+    then write the wave's results, BoATransaction rows and job counters in
+    one commit. If the process dies, only the current wave is left in doubt.
+
+    The job is claimed and leased like a transfer job: claiming bumps its
+    attempts, and every later write is fenced on that value, so once a
+    lease runs out and another runner takes over, the old one stops
+    before sending anything else.
+    """
+
+    def __init__(self, job_id: int, concurrency: int, flush_size: int, lease: timedelta):
+        self.job_id = job_id
+        self.concurrency = concurrency
+        self.flush_size = flush_size
+        self.lease = lease
+        self.attempt: Optional[int] = None
+
+    async def run(self) -> None:
+        if not self._claim_job():
+            return
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            wave = self._claim_wave()
+            if not wave:
+                break
+            results = await asyncio.gather(*(self._send(item, semaphore) for item in wave))
+            self._persist(results)
+        self._finish()
+
+    def _fenced(self, db: Session):
+        return db.query(BoAPayoutJob).filter(
+            BoAPayoutJob.id == self.job_id,
+            BoAPayoutJob.attempts == self.attempt,
+            BoAPayoutJob.status == "running"
+        )
+
+    def _claim_job(self) -> bool:
+        """Take the job if it is queued or its runner's lease ran out; False when someone else has it"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            job = db.query(BoAPayoutJob).filter(
+                BoAPayoutJob.id == self.job_id,
+                or_(
+                    BoAPayoutJob.status == "queued",
+                    and_(BoAPayoutJob.status == "running", BoAPayoutJob.lease_until < now)
+                )
+            ).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.commit()
+                return False
+            if job.status == "running":
+                # The previous runner's wave may or may not have reached BoA
+                interrupted = db.query(BoAPayoutItem).filter(
+                    BoAPayoutItem.job_id == self.job_id,
+                    BoAPayoutItem.status == "processing"
+                ).update({
+                    BoAPayoutItem.status: "failed",
+                    BoAPayoutItem.error: INTERRUPTED_ITEM_ERROR,
+                }, synchronize_session=False)
+                job.failed = job.failed + interrupted
+            job.status = "running"
+            job.attempts = (job.attempts or 0) + 1
+            job.lease_until = now + self.lease
+            job.started_at = job.started_at or now
+            self.attempt = job.attempts
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def _claim_wave(self) -> List[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            # Holding the job row keeps a takeover from failing items between our read and update
+            if self._fenced(db).with_for_update().first() is None:
+                db.rollback()
+                raise PayoutLeaseLostError()
+            items = db.query(BoAPayoutItem).filter(
+                BoAPayoutItem.job_id == self.job_id,
+                BoAPayoutItem.status == "queued"
+            ).order_by(BoAPayoutItem.position).limit(self.flush_size).with_for_update(skip_locked=True).all()
+            wave = [
+                {
+                    "id": item.id,
+                    "transaction_id": item.transaction_id,
+                    "transfer_type": item.transfer_type,
+                    "amount": item.amount,
+                    "account_number": item.account_number,
+                    "bank_code": item.bank_code,
+                    "receiver_name": item.receiver_name,
+                    "reference": item.reference,
+                }
+                for item in items
+            ]
+            if wave:
+                db.query(BoAPayoutItem).filter(
+                    BoAPayoutItem.id.in_([item["id"] for item in wave])
+                ).update({BoAPayoutItem.status: "processing"}, synchronize_session=False)
+                self._fenced(db).update(
+                    {BoAPayoutJob.lease_until: datetime.utcnow() + self.lease}, synchronize_session=False
+                )
+            db.commit()
+            return wave
+        finally:
+            db.close()
+
+    async def _send(self, item: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                if item["transfer_type"] == "other_bank":
+                    response = await BoATransferService.dispatch_other_bank_transfer(
+                        item["amount"], item["bank_code"], item["account_number"], item["reference"], item["receiver_name"]
+                    )
+                else:
+                    response = await BoATransferService.dispatch_within_boa_transfer(
+                        item["amount"], item["account_number"], item["reference"]
+                    )
+            except BoAServiceError as e:
+                PAYOUT_ITEMS.inc(transfer_type=item["transfer_type"], outcome="failed")
+                return {**item, "status": "failed", "error": str(e)[:255], "response": None}
+        PAYOUT_ITEMS.inc(transfer_type=item["transfer_type"], outcome="succeeded")
+        return {**item, "status": "succeeded", "error": None, "response": response}
+
+    def _persist(self, results: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            ids = [result["id"] for result in results]
+            # Items a takeover already failed as interrupted; BoA's answer still wins,
+            # but they were counted as failed then
+            recounted = len(db.query(BoAPayoutItem.id).filter(
+                BoAPayoutItem.id.in_(ids),
+                BoAPayoutItem.status != "processing"
+            ).with_for_update().all())
+            if recounted:
+                logger.warning(f"Payout job {self.job_id} was taken over while {recounted} item(s) were with BoA")
+            db.bulk_update_mappings(BoAPayoutItem, [
+                {
+                    "id": result["id"],
+                    "status": result["status"],
+                    "boa_reference": result["response"].header.id if result["response"] else None,
+                    "error": result["error"],
+                    "updated_at": now,
+                }
+                for result in results
+            ])
+            db.add_all([
+                BoATransferService.build_boa_transaction(
+                    result["transaction_id"],
+                    result["response"],
+                    transaction_type="other_bank_ethswitch" if result["transfer_type"] == "other_bank" else None
+                )
+                for result in results if result["response"] is not None
+            ])
+            succeeded = sum(1 for result in results if result["status"] == "succeeded")
+            db.query(BoAPayoutJob).filter(BoAPayoutJob.id == self.job_id).update({
+                BoAPayoutJob.succeeded: BoAPayoutJob.succeeded + succeeded,
+                BoAPayoutJob.failed: BoAPayoutJob.failed + len(results) - succeeded - recounted,
+            }, synchronize_session=False)
+            self._fenced(db).update({BoAPayoutJob.lease_until: now + self.lease}, synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            # BoA accepted these transfers; leave the items "processing" so
+            # they are reconciled by hand instead of being sent twice
+            db.rollback()
+            logger.error(f"Database error saving payout job {self.job_id} results: {str(e)}")
+        finally:
+            db.close()
+
+    def _finish(self) -> None:
+        db = SessionLocal()
+        try:
+            finished = self._fenced(db).update({
+                BoAPayoutJob.status: "completed",
+                BoAPayoutJob.lease_until: None,
+                BoAPayoutJob.completed_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if not finished:
+            raise PayoutLeaseLostError()
+        logger.info(f"Payout job {self.job_id} completed")
+
+
+def start_payout_job(job_id: int) -> None:
+    runner = BoAPayoutRunner(
+        job_id, settings.BOA_PAYOUT_CONCURRENCY, settings.BOA_PAYOUT_FLUSH_SIZE,
+        lease=timedelta(seconds=settings.BOA_PAYOUT_LEASE_SECONDS)
+    )
+
+    async def _run():
+        try:
+            await runner.run()
+        except PayoutLeaseLostError:
+            logger.warning(f"Payout job {job_id} was taken over by another runner")
+        except Exception as e:
+            # The lease runs out and the job is resumed
+            logger.error(f"Payout job {job_id} stopped: {str(e)}")
+
+    task = asyncio.create_task(_run(), name=f"payout-job-{job_id}")
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+
+
+async def resume_interrupted_payouts() -> None:
+    """
+    Scheduled on the leader only. Restarts running jobs whose runner's
+    lease ran out, and queued jobs nobody picked up within a lease. The
+    new runner claims the job under its row lock and fails the items that
+    were in flight for manual checking, so a job whose runner is still
+    alive is never dispatched twice.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        job_ids = [
+            row.id for row in db.query(BoAPayoutJob.id).filter(or_(
+                and_(BoAPayoutJob.status == "running", BoAPayoutJob.lease_until < now),
+                and_(
+                    BoAPayoutJob.status == "queued",
+                    BoAPayoutJob.created_at < now - timedelta(seconds=settings.BOA_PAYOUT_LEASE_SECONDS)
+                )
+            ))
+        ]
+    except SQLAlchemyError as e:
+        logger.error(f"Database error looking for stalled payout jobs: {str(e)}")
+        return
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        logger.info(f"Resuming payout job {job_id}")
+        start_payout_job(job_id)
+
+
+def payout_job_summary(job: BoAPayoutJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total_items": job.total_items,
+        "succeeded": job.succeeded,
+        "failed": job.failed,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+    }
+
+
+async def stream_payout_progress(job_id: int, interval: float = 1.0) -> AsyncIterator[str]:
+    """
+    NDJSON progress feed: one {"type": "item"} line per item as it reaches
+    a final status, a {"type": "job"} line whenever the counters move, and
+    a last job line once the job is completed
+    """
+    reported: Set[int] = set()
+    last_counts = None
+    while True:
+        db = SessionLocal()
+        try:
+            job = db.query(BoAPayoutJob).filter(BoAPayoutJob.id == job_id).first()
+            if job is None:
+                return
+            summary = payout_job_summary(job)
+            items = db.query(
+                BoAPayoutItem.id, BoAPayoutItem.position, BoAPayoutItem.transaction_id,
+                BoAPayoutItem.status, BoAPayoutItem.boa_reference, BoAPayoutItem.error
+            ).filter(
+                BoAPayoutItem.job_id == job_id,
+                BoAPayoutItem.status.in_(FINAL_ITEM_STATUSES)
+            ).order_by(BoAPayoutItem.position).all()
+        finally:
+            db.close()
+
+        for item in items:
+            if item.id in reported:
+                continue
+            reported.add(item.id)
+            yield json.dumps({
+                "type": "item",
+                "position": item.position,
+                "transaction_id": item.transaction_id,
+                "status": item.status,
+                "boa_reference": item.boa_reference,
+                "error": item.error,
+            }) + "\n"
+
+        counts = (summary["status"], summary["succeeded"], summary["failed"])
+        if counts != last_counts:
+            last_counts = counts
+            yield json.dumps({"type": "job", **summary}, default=str) + "\n"
+        if summary["status"] == "completed":
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,212 @@
+# app/utils/response_cache.py
+
+import asyncio
+import json
+import logging
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from cachetools import TTLCache
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.database import database
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# How often a request with nothing to serve checks whether the lock holder has stored its result
+LOCK_POLL_SECONDS = 0.05
+
+RESPONSE_CACHE_LOOKUPS = registry.counter(
+    "response_cache_lookups_total",
+    "Cached endpoint lookups by how they were answered",
+    ["namespace", "endpoint", "result"],
+)
+
+
+class ResponseCache:
+    """
+    Short-lived cache of JSON response bodies keyed by endpoint and
+    parameters, shared through Redis, or kept in-process when Redis is not
+    configured or fails.
+
+    Two things keep a popular key from being recomputed by every request at
+    once. Each entry remembers how long it took to compute, and readers
+    refresh it early with a probability that rises as expiry nears and with
+    that cost (probabilistic early expiration), so one request usually
+    refreshes it while the rest are still served. Whoever recomputes takes a
+    short lock: other readers keep serving the current entry, or, when there
+    is none, wait for the lock holder's result instead of repeating the work.
+
+    invalidate() moves every key to a new version, so writers never need to
+    know which endpoints and parameters are cached.
+    """
+
+    def __init__(self, namespace: str, ttl: int, lock_ttl: int, beta: float = 1.0, maxsize: int = 1024):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.beta = beta
+        self._memory = TTLCache(maxsize=maxsize, ttl=max(ttl, 1))
+        self._computing: Set[str] = set()
+        self._version = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def version_key(self) -> str:
+        return f"cache:{self.namespace}:version"
+
+    def entry_key(self, version: int, endpoint: str, params: Dict[str, Any]) -> str:
+        return f"cache:{self.namespace}:v{version}:{endpoint}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    async def get_or_compute(self, endpoint: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """
+        Return the JSON-encoded body for (endpoint, params), running the
+        blocking `compute` in a worker thread when the entry is missing or
+        due for an early refresh.
+        """
+        if self.ttl <= 0:
+            return jsonable_encoder(await asyncio.to_thread(compute))
+        if database.redis_client is not None:
+            # invalidate() may run in a worker thread and needs the loop the Redis client lives on
+            self._loop = asyncio.get_running_loop()
+
+        key = self.entry_key(await self._current_version(), endpoint, params)
+        deadline = time.monotonic() + self.lock_ttl
+        waited = False
+        while True:
+            entry = await self._load(key)
+            if entry is not None and not self._refresh_early(entry):
+                self._record(endpoint, "waited" if waited else "hit")
+                return entry["body"]
+
+            if await self._acquire(key):
+                self._record(endpoint, "miss" if entry is None else "early_refresh")
+                try:
+                    return await self._compute_and_store(key, compute)
+                finally:
+                    await self._release(key)
+
+            if entry is not None:
+                # Another request is already refreshing it
+                self._record(endpoint, "hit")
+                return entry["body"]
+            if time.monotonic() >= deadline:
+                # The lock holder is slow or gone, stop waiting for it
+                self._record(endpoint, "lock_timeout")
+                return await self._compute_and_store(key, compute)
+            waited = True
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+
+    def invalidate(self) -> None:
+        """Drop every cached body. Safe to call from sync code, on or off the event loop."""
+        with self._lock:
+            self._version += 1
+            self._memory.clear()
+        if database.redis_client is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            task = loop.create_task(self._bump_redis_version())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._bump_redis_version(), self._loop)
+        else:
+            # Not running under the app (e.g. a CLI); shared entries expire on their own within ttl
+            logger.info(f"No event loop to invalidate the {self.namespace} cache in Redis")
+
+    def _refresh_early(self, entry: Dict[str, Any]) -> bool:
+        # -log(u) for u in (0, 1] is exponentially distributed, so early refreshes are rare until expiry is close
+        return time.time() - entry["delta"] * self.beta * math.log(1.0 - random.random()) >= entry["expires_at"]
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        body = jsonable_encoder(await asyncio.to_thread(compute))
+        entry = {"body": body, "delta": time.monotonic() - started, "expires_at": time.time() + self.ttl}
+        await self._store(key, entry)
+        return body
+
+    def _record(self, endpoint: str, result: str) -> None:
+        RESPONSE_CACHE_LOOKUPS.inc(namespace=self.namespace, endpoint=endpoint, result=result)
+
+    async def _current_version(self) -> int:
+        redis = database.redis_client
+        if redis is not None:
+            try:
+                return int(await redis.get(self.version_key) or 0)
+            except RedisError as e:
+                logger.warning(f"Redis error reading {self.namespace} cache version: {e}")
+        return self._version
+
+    async def _bump_redis_version(self) -> None:
+        redis = database.redis_client
+        if redis is None:
+            return
+        try:
+            await redis.incr(self.version_key)
+        except RedisError as e:
+            logger.warning(f"Redis error invalidating {self.namespace} cache: {e}")
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        redis = database.redis_client
+        if redis is not None:
+            try:
+                raw = await redis.get(key)
+                return json.loads(raw) if raw else None
+            except RedisError as e:
+                logger.warning(f"Redis error reading {self.namespace} cache: {e}")
+        with self._lock:
+            return self._memory.get(key)
+
+    async def _store(self, key: str, entry: Dict[str, Any]) -> None:
+        redis = database.redis_client
+        if redis is not None:
+            try:
+                await redis.set(key, json.dumps(entry), ex=self.ttl)
+                return
+            except RedisError as e:
+                logger.warning(f"Redis error writing {self.namespace} cache: {e}")
+        with self._lock:
+            self._memory[key] = entry
+
+    async def _acquire(self, key: str) -> bool:
+        redis = database.redis_client
+        if redis is not None:
+            try:
+                return bool(await redis.set(f"{key}:lock", "1", nx=True, ex=self.lock_ttl))
+            except RedisError as e:
+                logger.warning(f"Redis error locking {self.namespace} cache entry: {e}")
+        with self._lock:
+            if key in self._computing:
+                return False
+            self._computing.add(key)
+            return True
+
+    async def _release(self, key: str) -> None:
+        with self._lock:
+            self._computing.discard(key)
+        redis = database.redis_client
+        if redis is None:
+            return
+        try:
+            await redis.delete(f"{key}:lock")
+        except RedisError as e:
+            logger.warning(f"Redis error unlocking {self.namespace} cache entry: {e}")
+
+
+dashboard_cache = ResponseCache(
+    "dashboard",
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    lock_ttl=settings.DASHBOARD_CACHE_LOCK_SECONDS,
+)
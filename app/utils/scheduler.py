@@ -0,0 +1,92 @@
+# app/utils/scheduler.py
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.database import database
+
+logger = logging.getLogger(__name__)
+
+# Background jobs started from the FastAPI startup hook, one asyncio task each
+_tasks: Dict[str, asyncio.Task] = {}
+
+# Identifies this process as the holder of a leader lock
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def leader_key(name: str) -> str:
+    return f"scheduler:leader:{name}"
+
+
+async def is_leader(name: str, ttl: int) -> bool:
+    """
+    Take or renew the Redis lock that lets one worker run job `name`.
+    The holder renews it every tick; if it stops, another worker takes
+    over once the lock expires. Without Redis, or when Redis fails,
+    every worker runs the job.
+    """
+    redis = database.redis_client
+    if redis is None:
+        return True
+    key = leader_key(name)
+    try:
+        if await redis.set(key, WORKER_ID, nx=True, ex=ttl):
+            return True
+        if await redis.get(key) == WORKER_ID:
+            await redis.expire(key, ttl)
+            return True
+        return False
+    except RedisError as e:
+        logger.warning(f"Redis error taking the {name} leader lock, running the job here: {e}")
+        return True
+
+
+def start_periodic(
+    name: str,
+    interval_seconds: float,
+    job: Callable[[], Awaitable[None]],
+    run_immediately: bool = True,
+    leader_only: bool = False,
+    on_follower: Optional[Callable[[], Awaitable[None]]] = None
+) -> None:
+    """
+    Run `job` every `interval_seconds` until shutdown; failures are logged and retried next tick.
+    With leader_only, only the worker holding the job's leader lock runs it; the
+    others run `on_follower` instead (e.g. to pick up what the leader stored), if given.
+    """
+    if interval_seconds <= 0 or name in _tasks:
+        return
+    lock_ttl = max(int(interval_seconds * 2), 1)
+
+    async def _tick():
+        if not leader_only or await is_leader(name, lock_ttl):
+            await job()
+        elif on_follower is not None:
+            await on_follower()
+
+    async def _loop():
+        if not run_immediately:
+            await asyncio.sleep(interval_seconds)
+        while True:
+            try:
+                await _tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Periodic job {name} failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    _tasks[name] = asyncio.create_task(_loop(), name=name)
+    logger.info(f"Started periodic job {name} every {interval_seconds}s")
+
+
+async def stop_all() -> None:
+    for task in _tasks.values():
+        task.cancel()
+    await asyncio.gather(*_tasks.values(), return_exceptions=True)
+    _tasks.clear()
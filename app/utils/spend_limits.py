@@ -0,0 +1,154 @@
+# app/utils/spend_limits.py
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database.database import SessionLocal, dialect_insert
+from app.models.transactions import TransactionStatus
+from app.models.user_spend_buckets import UserSpendBucket
+from app.models.users import User
+
+logger = logging.getLogger(__name__)
+
+SPEND_WINDOW_DAYS = 7
+
+
+class WeeklyLimitExceeded(Exception):
+    """Raised when a new transaction would take the user past their weekly limit"""
+
+    def __init__(self, limit: Decimal, spent: Decimal):
+        super().__init__(f"Weekly limit of {limit} exceeded: {spent} already sent in the last {SPEND_WINDOW_DAYS} days")
+        self.limit = limit
+        self.spent = spent
+
+
+def bucket_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def window_start(now: datetime) -> datetime:
+    """First bucket of the rolling window: today and the six days before it"""
+    return bucket_start(now) - timedelta(days=SPEND_WINDOW_DAYS - 1)
+
+
+def counts_towards_limit(status: Any) -> bool:
+    """Every transaction counts until it fails; accepts the model or the schema enum"""
+    return getattr(status, "value", status) != TransactionStatus.failed.value
+
+
+def adjust_spend(db: Session, transactions: Iterable[Any], sign: int = 1) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) transactions from their users' daily
+    buckets in `db`'s current transaction, with one upsert. Each item needs
+    user_id, amount and created_at. Days already outside the window are
+    skipped since no limit check reads them again.
+    """
+    now = datetime.utcnow()
+    oldest = window_start(now)
+    deltas: Dict[Tuple[int, datetime], list] = defaultdict(lambda: [Decimal("0"), 0])
+    for transaction in transactions:
+        day = bucket_start(transaction.created_at or now)
+        if day < oldest:
+            continue
+        delta = deltas[(transaction.user_id, day)]
+        delta[0] += sign * Decimal(transaction.amount)
+        delta[1] += sign
+    if not deltas:
+        return
+
+    stmt = dialect_insert(db, UserSpendBucket).values([
+        {
+            "user_id": user_id,
+            "bucket_start": day,
+            "amount": amount,
+            "transaction_count": count,
+            "last_updated": now,
+        }
+        for (user_id, day), (amount, count) in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "bucket_start"],
+        set_={
+            "amount": UserSpendBucket.amount + stmt.excluded.amount,
+            "transaction_count": UserSpendBucket.transaction_count + stmt.excluded.transaction_count,
+            "last_updated": stmt.excluded.last_updated,
+        },
+    )
+    db.execute(stmt)
+
+
+def weekly_spend(db: Session, user_id: int, now: Optional[datetime] = None) -> Decimal:
+    """Sum of at most SPEND_WINDOW_DAYS bucket rows, read through the bucket's unique index"""
+    spent = db.query(func.coalesce(func.sum(UserSpendBucket.amount), 0)).filter(
+        UserSpendBucket.user_id == user_id,
+        UserSpendBucket.bucket_start >= window_start(now or datetime.utcnow())
+    ).scalar()
+    return Decimal(spent)
+
+
+@dataclass(frozen=True)
+class SpendReservation:
+    """Spend added to a user's bucket ahead of the transaction it is for"""
+    user_id: int
+    amount: Decimal
+    created_at: datetime
+
+
+def reserve_weekly_spend(db: Session, user: User, amount: Decimal) -> SpendReservation:
+    """
+    Add `amount` to the user's bucket for today and commit, or raise
+    WeeklyLimitExceeded with nothing added if that takes them past their
+    weekly limit. The upsert locks only today's bucket row, and only until
+    this commit, so a user's concurrent requests queue there briefly and
+    each is checked against the spend the others reserved. The transaction
+    must then be created with the reservation's created_at and without
+    adding its spend again; if it is not, release_weekly_spend gives the
+    amount back.
+    """
+    reservation = SpendReservation(user.user_id, Decimal(amount), datetime.utcnow())
+    try:
+        adjust_spend(db, [reservation])
+        if user.user_weekly_limit is not None:
+            spent = weekly_spend(db, user.user_id, reservation.created_at)
+            if spent > Decimal(user.user_weekly_limit):
+                raise WeeklyLimitExceeded(Decimal(user.user_weekly_limit), spent - reservation.amount)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return reservation
+
+
+def release_weekly_spend(db: Session, reservation: SpendReservation) -> None:
+    """Take back a reservation whose transaction was never created"""
+    try:
+        adjust_spend(db, [reservation], sign=-1)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error releasing {reservation.amount} reserved for user {reservation.user_id}: {str(e)}")
+
+
+async def purge_expired_buckets() -> None:
+    """Scheduled job: drop buckets that have left the rolling window"""
+    db = SessionLocal()
+    try:
+        deleted = db.query(UserSpendBucket).filter(
+            UserSpendBucket.bucket_start < window_start(datetime.utcnow())
+        ).delete(synchronize_session=False)
+        db.commit()
+        if deleted:
+            logger.info(f"Purged {deleted} expired spend buckets")
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error purging spend buckets: {str(e)}")
+    finally:
+        db.close()
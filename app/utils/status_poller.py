@@ -0,0 +1,240 @@
+# app/utils/status_poller.py
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.boa_integration import BoATransaction
+from app.models.notifications import ChannelType
+from app.models.transactions import Transaction, TransactionStatus
+from app.utils.boa_api_service import boa_api, BoAAuthenticationError, BoAAPIError, BoARateLimitError
+from app.utils.metrics import registry
+from app.utils.outbox import enqueue_notification
+from app.utils.spend_limits import adjust_spend
+from app.utils.dashboard_rollups import record_status_change
+
+logger = logging.getLogger(__name__)
+
+# boa_transaction_status values that are never polled again
+FINAL_BOA_STATUSES = ("success", "failed", "timeout")
+
+# BoA's status check answers SUCCESS / FAILED / PENDING
+_BOA_STATUS_MAP = {"SUCCESS": "success", "FAILED": "failed"}
+
+# (transfer age, delay before the next poll): young transfers settle quickly
+# and are polled often, older ones back off
+POLL_SCHEDULE = (
+    (timedelta(minutes=2), timedelta(seconds=15)),
+    (timedelta(minutes=15), timedelta(minutes=1)),
+    (timedelta(hours=2), timedelta(minutes=5)),
+)
+SLOWEST_POLL_DELAY = timedelta(minutes=30)
+
+# How long a claimed row is hidden from other workers while its poll is in flight
+CLAIM_LEASE = timedelta(minutes=2)
+
+STATUS_POLL_RESULTS = registry.counter(
+    "boa_status_poll_results_total",
+    "Background BoA transfer status polls by outcome",
+    ["outcome"],
+)
+
+
+def next_status_poll_at(created_at: datetime, now: Optional[datetime] = None, failed_attempts: int = 0) -> datetime:
+    """When a transfer created at `created_at` should next be polled; each consecutive error doubles the delay"""
+    now = now or datetime.utcnow()
+    age = now - created_at
+    delay = next((delay for max_age, delay in POLL_SCHEDULE if age < max_age), SLOWEST_POLL_DELAY)
+    if failed_attempts:
+        delay = min(delay * 2 ** min(failed_attempts, 4), SLOWEST_POLL_DELAY)
+    return now + delay
+
+
+@dataclass(frozen=True)
+class ClaimedTransfer:
+    id: int
+    transaction_id: int
+    boa_reference: str
+    created_at: datetime
+    poll_attempts: int
+    poll_errors: int
+
+
+class BoAStatusPoller:
+    """
+    Background replacement for client-side status polling.
+    Each tick claims due boa_transactions rows with FOR UPDATE SKIP LOCKED,
+    pushes their next_poll_at out by a lease so other workers leave them
+    alone, polls BoA with bounded concurrency and writes all transitions
+    back in one commit.
+    """
+
+    def __init__(self, batch_size: int, concurrency: int, max_age: timedelta):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_age = max_age
+
+    def claim(self, db: Session, now: datetime) -> List[ClaimedTransfer]:
+        rows = db.query(BoATransaction).filter(
+            BoATransaction.next_poll_at <= now,
+            # NULL NOT IN (...) is not true, so rows saved without a status need their own test
+            or_(
+                BoATransaction.boa_transaction_status.is_(None),
+                BoATransaction.boa_transaction_status.notin_(FINAL_BOA_STATUSES)
+            ),
+            BoATransaction.boa_reference.isnot(None)
+        ).order_by(BoATransaction.next_poll_at).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        claimed = [
+            ClaimedTransfer(row.id, row.transaction_id, row.boa_reference, row.created_at or now,
+                            row.poll_attempts or 0, row.poll_errors or 0)
+            for row in rows
+        ]
+        if claimed:
+            db.query(BoATransaction).filter(
+                BoATransaction.id.in_([transfer.id for transfer in claimed])
+            ).update({BoATransaction.next_poll_at: now + CLAIM_LEASE}, synchronize_session=False)
+        db.commit()
+        return claimed
+
+    async def poll(self, claimed: List[ClaimedTransfer]) -> Dict[int, Optional[str]]:
+        """BoA status per claimed row id: "success", "failed", "pending" or None when the check failed"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(transfer: ClaimedTransfer) -> Optional[str]:
+            async with semaphore:
+                try:
+                    response = await boa_api.check_transaction_status(transfer.boa_reference)
+                except (BoAAuthenticationError, BoAAPIError, BoARateLimitError) as e:
+                    logger.warning(f"Status poll for {transfer.boa_reference} failed: {str(e)}")
+                    return None
+            status_data = response.first()
+            if not response.is_success or not status_data:
+                logger.warning(f"Status poll for {transfer.boa_reference} failed: {response.error_message()}")
+                return None
+            return _BOA_STATUS_MAP.get((status_data.status or "").upper(), "pending")
+
+        results = await asyncio.gather(*(check(transfer) for transfer in claimed))
+        return {transfer.id: result for transfer, result in zip(claimed, results)}
+
+    def apply(self, db: Session, claimed: List[ClaimedTransfer], results: Dict[int, Optional[str]], now: datetime) -> Dict[str, int]:
+        """Write every transition from one batch with a handful of UPDATEs and a single commit"""
+        final: Dict[str, List[ClaimedTransfer]] = {status: [] for status in FINAL_BOA_STATUSES}
+        next_poll: Dict[int, datetime] = {}
+        poll_errors: Dict[int, int] = {}
+        for transfer in claimed:
+            outcome = results.get(transfer.id)
+            if outcome in final:
+                final[outcome].append(transfer)
+            elif now - transfer.created_at >= self.max_age:
+                final["timeout"].append(transfer)
+            else:
+                # Errors back off until BoA answers again
+                poll_errors[transfer.id] = transfer.poll_errors + 1 if outcome is None else 0
+                next_poll[transfer.id] = next_status_poll_at(transfer.created_at, now, poll_errors[transfer.id])
+            STATUS_POLL_RESULTS.inc(outcome=outcome or "error")
+
+        for status, transfers in final.items():
+            if transfers:
+                db.query(BoATransaction).filter(
+                    BoATransaction.id.in_([transfer.id for transfer in transfers])
+                ).update({
+                    BoATransaction.boa_transaction_status: status,
+                    BoATransaction.next_poll_at: None,
+                    BoATransaction.poll_attempts: BoATransaction.poll_attempts + 1,
+                }, synchronize_session=False)
+
+        if next_poll:
+            db.query(BoATransaction).filter(
+                BoATransaction.id.in_(list(next_poll))
+            ).update({
+                BoATransaction.next_poll_at: case(next_poll, value=BoATransaction.id),
+                BoATransaction.poll_attempts: BoATransaction.poll_attempts + 1,
+                BoATransaction.poll_errors: case(poll_errors, value=BoATransaction.id),
+            }, synchronize_session=False)
+
+        settled_ids = [transfer.transaction_id for transfer in final["success"]]
+        if settled_ids:
+            settled_transactions = db.query(
+                Transaction.amount, Transaction.currency, Transaction.status, Transaction.created_at
+            ).filter(
+                Transaction.transaction_id.in_(settled_ids),
+                Transaction.status != TransactionStatus.completed
+            ).all()
+            db.query(Transaction).filter(
+                Transaction.transaction_id.in_(settled_ids),
+                Transaction.status != TransactionStatus.completed
+            ).update({
+                Transaction.status: TransactionStatus.completed,
+                Transaction.completed_at: now,
+            }, synchronize_session=False)
+            record_status_change(db, settled_transactions, TransactionStatus.completed)
+
+        failed_ids = [transfer.transaction_id for transfer in final["failed"]]
+        if failed_ids:
+            failed_transactions = db.query(
+                Transaction.transaction_id, Transaction.user_id, Transaction.amount, Transaction.currency,
+                Transaction.status, Transaction.created_at
+            ).filter(
+                Transaction.transaction_id.in_(failed_ids),
+                Transaction.status != TransactionStatus.failed
+            ).all()
+            db.query(Transaction).filter(
+                Transaction.transaction_id.in_(failed_ids)
+            ).update({Transaction.status: TransactionStatus.failed}, synchronize_session=False)
+            adjust_spend(db, failed_transactions, sign=-1)
+            record_status_change(db, failed_transactions, TransactionStatus.failed)
+            for transaction in failed_transactions:
+                enqueue_notification(
+                    db,
+                    user_id=transaction.user_id,
+                    title="Transfer Failed",
+                    message=f"Your transfer of {transaction.amount} {transaction.currency} could not be completed by the bank.",
+                    type="transfer_failed",
+                    channels=(ChannelType.push, ChannelType.email, ChannelType.sms)
+                )
+
+        db.commit()
+        return {status: len(transfers) for status, transfers in final.items()} | {"pending": len(next_poll)}
+
+    async def run_once(self) -> int:
+        """Claim, poll and apply one batch; returns the number of rows claimed"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            claimed = self.claim(db, now)
+            if not claimed:
+                return 0
+            # No connection is held while BoA answers
+            db.close()
+            results = await self.poll(claimed)
+            summary = self.apply(db, claimed, results, datetime.utcnow())
+            logger.info(f"Polled {len(claimed)} BoA transfers: {summary}")
+            return len(claimed)
+        except SQLAlchemyError as e:
+            # Claimed rows become due again when their lease runs out
+            db.rollback()
+            logger.error(f"Database error polling BoA transfer statuses: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        """Scheduled job: drain every due batch"""
+        while await self.run_once() >= self.batch_size:
+            pass
+
+
+status_poller = BoAStatusPoller(
+    batch_size=settings.BOA_STATUS_POLL_BATCH_SIZE,
+    concurrency=settings.BOA_STATUS_POLL_CONCURRENCY,
+    max_age=timedelta(hours=settings.BOA_STATUS_POLL_MAX_AGE_HOURS),
+)
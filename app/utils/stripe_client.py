@@ -0,0 +1,44 @@
+# app/utils/stripe_client.py
+
+import logging
+from typing import Optional
+
+import stripe
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[stripe.StripeClient] = None
+_http_client: Optional[stripe.HTTPXClient] = None
+
+
+def get_stripe_client() -> stripe.StripeClient:
+    """
+    Process-wide Stripe client for the *_async methods.
+    It is built on first use so a missing STRIPE_SECRET_KEY surfaces as a
+    StripeError in the request that needed it, and its httpx connection
+    pool is reused by every request after that.
+    """
+    global _client, _http_client
+    if _client is None:
+        http_client = stripe.HTTPXClient(timeout=settings.STRIPE_TIMEOUT_SECONDS)
+        _client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            http_client=http_client,
+            max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+        )
+        _http_client = http_client
+    return _client
+
+
+async def close_stripe_client() -> None:
+    global _client, _http_client
+    if _http_client is None:
+        return
+    try:
+        await _http_client.close_async()
+    except Exception as e:
+        logger.warning(f"Error closing Stripe HTTP client: {str(e)}")
+    _client = None
+    _http_client = None
@@ -0,0 +1,140 @@
+# app/utils/transaction_totals.py
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.transactions import Transaction
+from app.models.user_transaction_totals import UserTransactionTotals
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def previous_month_start(start: datetime) -> datetime:
+    return start.replace(year=start.year - 1, month=12) if start.month == 1 else start.replace(month=start.month - 1)
+
+
+@dataclass(frozen=True)
+class BalanceTotals:
+    total_amount: Decimal
+    transaction_count: int
+    current_period_amount: Decimal
+    previous_period_amount: Decimal
+
+    @property
+    def growth_percentage(self) -> float:
+        """This month so far against the whole of last month"""
+        if self.previous_period_amount > 0:
+            change = (self.current_period_amount - self.previous_period_amount) / self.previous_period_amount
+            return round(float(change * 100), 1)
+        return 100.0 if self.current_period_amount > 0 else 0.0
+
+
+def _period_amounts(totals: UserTransactionTotals, period_start: datetime):
+    """(current, previous) month amounts of a totals row as of the month starting at `period_start`"""
+    if totals.period_start == period_start:
+        return totals.current_period_amount, totals.previous_period_amount
+    if totals.period_start == previous_month_start(period_start):
+        return ZERO, totals.current_period_amount
+    return ZERO, ZERO
+
+
+def compute_totals(db: Session, user_id: int, now: datetime) -> UserTransactionTotals:
+    """Build a user's totals from their transaction history with one aggregate query"""
+    period_start = month_start(now)
+    previous_start = previous_month_start(period_start)
+    value = Transaction.amount + func.coalesce(Transaction.transfer_fee, 0)
+
+    row = db.query(
+        func.coalesce(func.sum(value), 0).label("total_amount"),
+        func.count(Transaction.transaction_id).label("transaction_count"),
+        func.coalesce(func.sum(case((Transaction.created_at >= period_start, value), else_=0)), 0).label("current"),
+        func.coalesce(func.sum(case(
+            ((Transaction.created_at >= previous_start) & (Transaction.created_at < period_start), value),
+            else_=0
+        )), 0).label("previous"),
+    ).filter(Transaction.user_id == user_id).one()
+
+    return UserTransactionTotals(
+        user_id=user_id,
+        total_amount=Decimal(row.total_amount),
+        transaction_count=row.transaction_count,
+        period_start=period_start,
+        current_period_amount=Decimal(row.current),
+        previous_period_amount=Decimal(row.previous),
+    )
+
+
+def _load_totals(db: Session, user_id: int, for_update: bool) -> UserTransactionTotals:
+    """
+    The user's totals row, built from their history the first time it is
+    needed. Autoflush is off so a transaction added to (or deleted from)
+    the session but not yet flushed is left to the caller to apply.
+    """
+    with db.no_autoflush:
+        query = db.query(UserTransactionTotals).filter(UserTransactionTotals.user_id == user_id)
+        totals = (query.with_for_update() if for_update else query).first()
+        if totals is not None:
+            return totals
+
+        totals = compute_totals(db, user_id, datetime.utcnow())
+        try:
+            with db.begin_nested():
+                db.add(totals)
+        except IntegrityError:
+            # Built concurrently by another request; use theirs
+            totals = (query.with_for_update() if for_update else query).one()
+        return totals
+
+
+def record_transaction(db: Session, transaction: Transaction, sign: int = 1) -> None:
+    """
+    Apply a created (sign=1) or deleted (sign=-1) transaction to its user's
+    totals in `db`'s current transaction; call it before committing. The
+    totals row is locked so concurrent changes for one user add up.
+    """
+    now = datetime.utcnow()
+    totals = _load_totals(db, transaction.user_id, for_update=True)
+
+    period_start = month_start(now)
+    current, previous = _period_amounts(totals, period_start)
+    delta = sign * (Decimal(transaction.amount) + Decimal(transaction.transfer_fee or 0))
+    created_at = transaction.created_at or now
+    if created_at >= period_start:
+        current += delta
+    elif created_at >= previous_month_start(period_start):
+        previous += delta
+
+    totals.total_amount = totals.total_amount + delta
+    totals.transaction_count = totals.transaction_count + sign
+    totals.period_start = period_start
+    totals.current_period_amount = current
+    totals.previous_period_amount = previous
+
+
+def get_balance_totals(db: Session, user_id: int, now: Optional[datetime] = None) -> BalanceTotals:
+    """
+    A user's totals from their single totals row, whatever the length of
+    their history. The first read builds the row and adds it to `db`;
+    committing it is left to the caller.
+    """
+    totals = _load_totals(db, user_id, for_update=False)
+    current, previous = _period_amounts(totals, month_start(now or datetime.utcnow()))
+    return BalanceTotals(
+        total_amount=Decimal(totals.total_amount),
+        transaction_count=totals.transaction_count,
+        current_period_amount=Decimal(current),
+        previous_period_amount=Decimal(previous),
+    )
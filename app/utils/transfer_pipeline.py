@@ -0,0 +1,239 @@
+# app/utils/transfer_pipeline.py
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.notifications import ChannelType
+from app.models.transactions import Transaction, TransactionStatus, AccountType
+from app.schemas.boa_envelopes import TransferEnvelope
+from app.utils.boa_service import BoABeneficiaryService, BoATransferService, BoAServiceError
+from app.utils.metrics import registry
+from app.utils.outbox import enqueue_notification
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_STAGE_DURATION = registry.histogram(
+    "boa_transfer_pipeline_stage_seconds",
+    "Time spent in each stage of processing a BoA transfer",
+    ["stage", "outcome"],
+)
+
+TRANSFER_CONFLICTS = registry.counter(
+    "boa_transfer_conflicts_total",
+    "Transfers BoA accepted after their transaction had already left pending",
+)
+
+
+class TransferPipelineError(Exception):
+    """Raised when a transfer cannot proceed; carries the HTTP status to answer with"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class TransferConflictError(TransferPipelineError):
+    """BoA accepted the transfer but the transaction was changed meanwhile; kept for manual review"""
+
+
+@dataclass(frozen=True)
+class TransferSnapshot:
+    """Plain values copied from the Transaction row, safe to use after the session is released"""
+    transaction_id: int
+    user_id: int
+    amount: str
+    currency: str
+    account_type: Optional[AccountType]
+    account_number: Optional[str]
+    reference: str
+
+
+@contextmanager
+def _timed(stage: str):
+    started_at = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        TRANSFER_STAGE_DURATION.observe(time.perf_counter() - started_at, stage=stage, outcome=outcome)
+
+
+class BoATransferPipeline:
+    """
+    Process a pending transaction in explicit stages:
+    validate -> resolve beneficiary -> dispatch -> persist.
+    The DB session is released after validation and only used again to
+    persist, so no pooled connection is held while waiting on BoA.
+    """
+
+    def __init__(self, transaction_id: int, user_id: int):
+        self.transaction_id = transaction_id
+        self.user_id = user_id
+
+    async def run(self, db: Session) -> Dict[str, Any]:
+        with _timed("validate"):
+            snapshot = self.validate(db)
+        # Nothing below needs the DB until persist; give the connection back
+        db.close()
+
+        beneficiary = None
+        response = None
+        if snapshot.account_type == AccountType.bank_account:
+            with _timed("resolve_beneficiary"):
+                beneficiary = await self.resolve_beneficiary(snapshot)
+            with _timed("dispatch"):
+                response = await self.dispatch(snapshot, beneficiary)
+
+        with _timed("persist"):
+            return self.persist(db, snapshot, beneficiary, response)
+
+    def validate(self, db: Session, require_pending: bool = True) -> TransferSnapshot:
+        """require_pending=False when BoA has already accepted the transfer and only persist is left"""
+        transaction = db.query(Transaction).filter(
+            Transaction.transaction_id == self.transaction_id,
+            Transaction.user_id == self.user_id
+        ).first()
+
+        if not transaction:
+            raise TransferPipelineError(404, "Transaction not found")
+        if require_pending and transaction.status != TransactionStatus.pending:
+            raise TransferPipelineError(400, "Transaction is not in pending status")
+        if transaction.account_type not in (AccountType.bank_account, AccountType.telebirr):
+            raise TransferPipelineError(400, "Unsupported account type for transfer")
+        if transaction.account_type == AccountType.bank_account and not transaction.account_number:
+            raise TransferPipelineError(400, "No account number provided for transfer")
+
+        return TransferSnapshot(
+            transaction_id=transaction.transaction_id,
+            user_id=transaction.user_id,
+            amount=str(transaction.amount),
+            currency=transaction.currency,
+            account_type=transaction.account_type,
+            account_number=transaction.account_number,
+            reference=transaction.transaction_reference or f"TXN{transaction.transaction_id}",
+        )
+
+    async def resolve_beneficiary(self, snapshot: TransferSnapshot) -> Dict[str, Any]:
+        """One lookup per transfer, used both to verify the account and to pick the route"""
+        beneficiary, failure = await BoABeneficiaryService.lookup("boa", snapshot.account_number)
+        if failure:
+            logger.error(f"Beneficiary verification failed for transaction {snapshot.transaction_id}: {failure.error_message()}")
+            raise TransferPipelineError(400, "Unable to verify beneficiary account")
+        return beneficiary
+
+    async def dispatch(self, snapshot: TransferSnapshot, beneficiary: Dict[str, Any]) -> TransferEnvelope:
+        if beneficiary.get("account_currency") != "ETB":
+            # Other bank transfer - would need bank ID from user
+            raise TransferPipelineError(400, "Other bank transfers require bank selection. Please contact support.")
+
+        try:
+            return await BoATransferService.dispatch_within_boa_transfer(
+                amount=snapshot.amount,
+                account_number=snapshot.account_number,
+                reference=snapshot.reference
+            )
+        except BoAServiceError as e:
+            logger.error(f"BoA service error processing transfer {snapshot.transaction_id}: {str(e)}")
+            raise TransferPipelineError(500, f"Transfer processing failed: {str(e)}")
+
+    def persist(
+        self,
+        db: Session,
+        snapshot: TransferSnapshot,
+        beneficiary: Optional[Dict[str, Any]],
+        response: Optional[TransferEnvelope]
+    ) -> Dict[str, Any]:
+        """Write the BoA record, the status change and the notification in one commit"""
+        try:
+            transaction = db.query(Transaction).filter(
+                Transaction.transaction_id == snapshot.transaction_id
+            ).with_for_update().first()
+            if transaction is None or transaction.status != TransactionStatus.pending:
+                # Changed or deleted by someone else while BoA was being called
+                if response is None:
+                    db.rollback()
+                    state = transaction.status.value if transaction is not None else "deleted"
+                    raise TransferPipelineError(409, f"Transaction is already {state}")
+                if transaction is None:
+                    db.rollback()
+                    self._record_lost_transfer(snapshot, response)
+                self._record_conflict(db, transaction, response)
+
+            if response is not None:
+                db.add(BoATransferService.build_boa_transaction(snapshot.transaction_id, response))
+                title = "Transfer Completed"
+                recipient = (beneficiary or {}).get("customer_name") or "beneficiary"
+                message = f"Your transfer of {snapshot.amount} {snapshot.currency} to {recipient} has been completed successfully."
+            else:
+                # For telebirr, we could integrate with mobile money APIs
+                # For now, mark as completed (this would be replaced with actual API call)
+                title = "Mobile Money Transfer Completed"
+                message = f"Your mobile money transfer of {snapshot.amount} {snapshot.currency} has been completed successfully."
+
+            completed_at = datetime.utcnow()
+            transaction.status = TransactionStatus.completed
+            transaction.completed_at = completed_at
+
+            enqueue_notification(
+                db,
+                user_id=snapshot.user_id,
+                title=title,
+                message=message,
+                type="transfer_completed",
+                channels=(ChannelType.push, ChannelType.email)
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error persisting transfer {snapshot.transaction_id}: {str(e)}")
+            raise TransferPipelineError(500, f"Transfer processing failed: {str(e)}")
+
+        return {
+            "message": "Transfer processed successfully",
+            "transaction_id": snapshot.transaction_id,
+            "status": TransactionStatus.completed.value,
+            "completed_at": completed_at
+        }
+
+    @staticmethod
+    def _record_lost_transfer(snapshot: TransferSnapshot, response: TransferEnvelope) -> None:
+        """
+        BoA sent the money but the transaction is gone. boa_transactions rows
+        must reference a transaction, so the full BoA answer goes to the error
+        log for an admin to reconcile by hand.
+        """
+        TRANSFER_CONFLICTS.inc()
+        logger.error(
+            f"Transfer {snapshot.transaction_id} of {snapshot.amount} {snapshot.currency} to "
+            f"{snapshot.account_number} was sent by BoA ({response.header.id}) but the transaction was deleted; "
+            f"BoA response: {response.model_dump_json(by_alias=True)}"
+        )
+        raise TransferConflictError(409, f"Transaction was deleted; the BoA transfer {response.header.id} needs manual review")
+
+    @staticmethod
+    def _record_conflict(db: Session, transaction: Transaction, response: TransferEnvelope) -> None:
+        """
+        BoA has already sent the money, so its record is kept for the status
+        poller to reconcile and the transaction is flagged for an admin
+        instead of being completed or left looking unsent.
+        """
+        status = transaction.status.value
+        note = (
+            f"[Needs review] BoA accepted transfer {response.header.id} after this transaction "
+            f"was already {status}. Check for a refund or manual deposit before settling it."
+        )
+        db.add(BoATransferService.build_boa_transaction(transaction.transaction_id, response))
+        transaction.admin_note = f"{transaction.admin_note}\n{note}" if transaction.admin_note else note
+        db.commit()
+        TRANSFER_CONFLICTS.inc()
+        logger.error(f"Transfer {transaction.transaction_id} was sent by BoA ({response.header.id}) but is already {status}; flagged for review")
+        raise TransferConflictError(409, f"Transaction is already {status}; the BoA transfer was recorded for review")
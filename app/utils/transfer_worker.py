@@ -0,0 +1,280 @@
+# app/utils/transfer_worker.py
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, List, Set
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.boa_integration import BoATransaction
+from app.models.transactions import AccountType
+from app.models.transfer_jobs import TransferJob
+from app.schemas.boa_envelopes import TransferEnvelope
+from app.utils.metrics import registry
+from app.utils.transfer_pipeline import TRANSFER_CONFLICTS, BoATransferPipeline, TransferConflictError, TransferPipelineError
+
+logger = logging.getLogger(__name__)
+
+INTERRUPTED_DISPATCH_ERROR = "Interrupted while BoA was processing the transfer; check its status before retrying"
+
+TRANSFER_JOBS = registry.counter(
+    "transfer_jobs_total",
+    "Background transfer jobs finished, by outcome",
+    ["outcome"],
+)
+
+# Worker runs started outside the scheduler, kept referenced until they finish
+_running: Set[asyncio.Task] = set()
+
+
+class LeaseLostError(Exception):
+    """Another worker claimed the job after this one's lease ran out"""
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: int
+    attempt: int  # attempts value written by our claim; checkpoints only apply while it still matches
+
+
+def enqueue_transfer(db: Session, transaction_id: int, user_id: int) -> TransferJob:
+    """
+    Queue a transaction for the transfer worker and return its job.
+    Raises TransferPipelineError when the transaction cannot be processed.
+    A transaction already queued or running keeps its job; a failed job is
+    queued again and resumes from its last checkpoint.
+    """
+    BoATransferPipeline(transaction_id, user_id).validate(db)
+
+    job = db.query(TransferJob).filter(TransferJob.transaction_id == transaction_id).with_for_update().first()
+    if job is None:
+        job = TransferJob(transaction_id=transaction_id, user_id=user_id, status="queued", attempts=0)
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Queued by a concurrent request
+            db.rollback()
+            job = db.query(TransferJob).filter(TransferJob.transaction_id == transaction_id).first()
+    elif job.status == "failed":
+        if job.step == "dispatching":
+            raise TransferPipelineError(409, INTERRUPTED_DISPATCH_ERROR)
+        job.status = "queued"
+        job.error = None
+        job.lease_until = None
+        job.completed_at = None
+        db.commit()
+    else:
+        db.commit()
+    return job
+
+
+def transfer_started(db: Session, transaction_id: int) -> bool:
+    """
+    Whether BoA may already have been asked to send a transaction's money:
+    it has a BoA record, or a transfer job that is not cleanly failed.
+    The job row stays locked until the caller commits, so the worker
+    cannot claim it in between.
+    """
+    if db.query(BoATransaction.id).filter(BoATransaction.transaction_id == transaction_id).first():
+        return True
+    job = db.query(TransferJob).filter(TransferJob.transaction_id == transaction_id).with_for_update().first()
+    if job is None:
+        return False
+    return job.status != "failed" or job.step in ("dispatching", "dispatched")
+
+
+class TransferWorker:
+    """
+    Processes queued transfer jobs. Jobs are claimed with FOR UPDATE SKIP
+    LOCKED and leased; each stage of the transfer pipeline is checkpointed
+    on the job row, so a job whose worker died is claimed again once its
+    lease runs out and continues from the last checkpoint. A job that died
+    while BoA was processing the transfer is failed for manual checking
+    rather than sent twice. At most `concurrency` jobs talk to BoA at once.
+    """
+
+    def __init__(self, batch_size: int, concurrency: int, lease: timedelta):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.lease = lease
+        self._semaphore = None
+
+    def claim(self, db: Session, now: datetime) -> List[ClaimedJob]:
+        rows = db.query(TransferJob).filter(or_(
+            TransferJob.status == "queued",
+            and_(TransferJob.status == "running", TransferJob.lease_until < now)
+        )).order_by(TransferJob.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        claimed = [ClaimedJob(row.id, (row.attempts or 0) + 1) for row in rows]
+        if claimed:
+            db.query(TransferJob).filter(
+                TransferJob.id.in_([job.id for job in claimed])
+            ).update({
+                TransferJob.status: "running",
+                TransferJob.lease_until: now + self.lease,
+                TransferJob.attempts: TransferJob.attempts + 1,
+            }, synchronize_session=False)
+        db.commit()
+        return claimed
+
+    async def run_once(self) -> int:
+        """Claim and process one batch; returns the number of jobs claimed"""
+        db = SessionLocal()
+        try:
+            claimed = self.claim(db, datetime.utcnow())
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error claiming transfer jobs: {str(e)}")
+            return 0
+        finally:
+            db.close()
+        await asyncio.gather(*(self.process(job) for job in claimed))
+        return len(claimed)
+
+    async def run(self) -> None:
+        """Scheduled job: drain every due batch"""
+        while await self.run_once() >= self.batch_size:
+            pass
+
+    def start(self) -> None:
+        """Process queued jobs now rather than on the next scheduled run"""
+        task = asyncio.create_task(self.run(), name="transfer-worker")
+        _running.add(task)
+        task.add_done_callback(_running.discard)
+
+    async def process(self, job: ClaimedJob) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            try:
+                await self._process(job)
+            except LeaseLostError:
+                logger.warning(f"Transfer job {job.id} was taken over by another worker")
+            except Exception as e:
+                # The lease runs out and the job is picked up again from its last checkpoint
+                logger.error(f"Transfer job {job.id} stopped: {str(e)}")
+
+    async def _process(self, job: ClaimedJob) -> None:
+        db = SessionLocal()
+        boa_response = None
+        try:
+            row = db.query(TransferJob).filter(TransferJob.id == job.id).first()
+            pipeline = BoATransferPipeline(row.transaction_id, row.user_id)
+            step, beneficiary, boa_response = row.step, row.beneficiary, row.boa_response
+            if step == "dispatching":
+                raise TransferPipelineError(409, INTERRUPTED_DISPATCH_ERROR)
+            # Once BoA has answered, persist records the transfer even if the transaction moved on
+            snapshot = pipeline.validate(db, require_pending=boa_response is None)
+        except TransferPipelineError as e:
+            if boa_response is None:
+                self._finish(job, "failed", e.detail)
+            else:
+                # BoA has sent the money but the transaction can no longer be read, e.g. it was deleted
+                TRANSFER_CONFLICTS.inc()
+                logger.error(f"Transfer job {job.id} was sent by BoA but cannot be persisted: {e.detail}; BoA response: {boa_response}")
+                self._finish(job, "needs_review", e.detail)
+            return
+        finally:
+            db.close()
+
+        # No connection is held while BoA answers; checkpoints use short sessions
+        response = TransferEnvelope.model_validate(boa_response) if boa_response else None
+        if snapshot.account_type == AccountType.bank_account and response is None:
+            try:
+                if beneficiary is None:
+                    beneficiary = await pipeline.resolve_beneficiary(snapshot)
+                    self._checkpoint(job, step="beneficiary_resolved", beneficiary=beneficiary)
+                self._checkpoint(job, step="dispatching")
+                try:
+                    response = await pipeline.dispatch(snapshot, beneficiary)
+                except TransferPipelineError:
+                    # BoA refused the transfer or was not reached
+                    self._checkpoint(job, step="beneficiary_resolved")
+                    raise
+                self._checkpoint(
+                    job,
+                    step="dispatched",
+                    boa_response=response.model_dump(mode="json", by_alias=True),
+                    boa_reference=response.header.id
+                )
+            except TransferPipelineError as e:
+                self._finish(job, "failed", e.detail)
+                return
+
+        db = SessionLocal()
+        try:
+            # The job is marked succeeded in the same commit that completes the transaction
+            if not self._fenced(db, job).update({
+                TransferJob.status: "succeeded",
+                TransferJob.step: "persisted",
+                TransferJob.lease_until: None,
+                TransferJob.completed_at: datetime.utcnow(),
+                TransferJob.error: None,
+            }, synchronize_session=False):
+                db.rollback()
+                raise LeaseLostError()
+            pipeline.persist(db, snapshot, beneficiary, response)
+            TRANSFER_JOBS.inc(outcome="succeeded")
+        except TransferConflictError as e:
+            # The BoA record was committed with the job; never retried, an admin settles it
+            db.query(TransferJob).filter(
+                TransferJob.id == job.id,
+                TransferJob.attempts == job.attempt
+            ).update({TransferJob.status: "needs_review", TransferJob.error: e.detail[:255]}, synchronize_session=False)
+            db.commit()
+            TRANSFER_JOBS.inc(outcome="needs_review")
+        except TransferPipelineError as e:
+            self._finish(job, "failed", e.detail)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _fenced(db: Session, job: ClaimedJob):
+        return db.query(TransferJob).filter(
+            TransferJob.id == job.id,
+            TransferJob.attempts == job.attempt,
+            TransferJob.status == "running"
+        )
+
+    def _checkpoint(self, job: ClaimedJob, **values: Any) -> None:
+        """Record progress and renew the lease; raises LeaseLostError if the job is no longer ours"""
+        db = SessionLocal()
+        try:
+            updated = self._fenced(db, job).update({
+                **{getattr(TransferJob, key): value for key, value in values.items()},
+                TransferJob.lease_until: datetime.utcnow() + self.lease,
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if not updated:
+            raise LeaseLostError()
+
+    def _finish(self, job: ClaimedJob, status: str, error: str) -> None:
+        db = SessionLocal()
+        try:
+            self._fenced(db, job).update({
+                TransferJob.status: status,
+                TransferJob.error: error[:255],
+                TransferJob.lease_until: None,
+                TransferJob.completed_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        TRANSFER_JOBS.inc(outcome=status)
+        logger.warning(f"Transfer job {job.id} {status}: {error}")
+
+
+transfer_worker = TransferWorker(
+    batch_size=settings.TRANSFER_WORKER_BATCH_SIZE,
+    concurrency=settings.TRANSFER_WORKER_CONCURRENCY,
+    lease=timedelta(seconds=settings.TRANSFER_JOB_LEASE_SECONDS),
+)
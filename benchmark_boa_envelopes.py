@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark BoA response decoding
+Compares the old json.loads + dict walking against decoding straight into the
+typed envelopes used by BankOfAbyssiniaAPI._make_request.
+
+Usage: python benchmark_boa_envelopes.py [iterations]
+"""
+
+import json
+import sys
+import timeit
+
+from app.schemas.boa_envelopes import (
+    AccountEnvelope,
+    BankListEnvelope,
+    TransferEnvelope,
+    RateEnvelope,
+    BalanceEnvelope,
+)
+
+AUDIT = {"T24_time": 412, "responseParse_time": 1, "requestParse_time": 2, "versionNumber": "1"}
+
+SAMPLES = {
+    "getAccount": (AccountEnvelope, {
+        "header": {"audit": AUDIT, "status": "success"},
+        "body": [{"customerName": "Dawit Girma", "accountCurrency": "ETB"}],
+    }),
+    "bankId": (BankListEnvelope, {
+        "header": {"audit": AUDIT, "status": "success"},
+        "body": [{"id": str(231402 + i), "institutionName": f"Bank {i}"} for i in range(40)],
+    }),
+    "transferWithin": (TransferEnvelope, {
+        "header": {
+            "id": "FT23343L0Z8C",
+            "status": "success",
+            "transactionStatus": "Live",
+            "audit": AUDIT,
+            "uniqueIdentifier": "IRFX240244833914396.00",
+        },
+        "body": {
+            "transactionType": "AC",
+            "debitAccountId": "20654376",
+            "creditAccountId": "7260865",
+            "debitAmount": "100.00",
+            "creditAmount": "100.00",
+            "debitCurrency": "ETB",
+            "creditCurrency": "ETB",
+            "reason": "stringETSW",
+            "transactionDate": "20240901",
+        },
+    }),
+    "rate": (RateEnvelope, {
+        "header": {"audit": AUDIT, "status": "success"},
+        "body": [{"currencyCode": "USD", "currencyName": "US Dollar", "buyRate": 56.8769, "sellRate": 60.0}],
+    }),
+    "getBalance": (BalanceEnvelope, {
+        "header": {"audit": AUDIT, "status": "success"},
+        "body": [{"accountCurrency": "ETB", "workingBalance": "2500000.00"}],
+    }),
+    "businessError": (TransferEnvelope, {
+        "header": {"audit": AUDIT, "status": "failed"},
+        "error": {"type": "BUSINESS", "errorDetails": [{"code": "E-111450", "message": "Invalid account"}]},
+    }),
+}
+
+
+def walk_dict(raw: bytes):
+    """What the routers used to do with every response"""
+    result = json.loads(raw)
+    header = result.get("header", {})
+    body = result.get("body", [])
+    status = header.get("status")
+    if status != "success":
+        try:
+            error_data = result.get("error", {}).get("errorDetails", [])
+            return error_data[0].get("message", "Try again later") if error_data else "Try again later"
+        except Exception:
+            return "Try again later"
+    items = body if isinstance(body, list) else [body]
+    return header.get("id"), [(item.get("id"), item.get("customerName")) for item in items]
+
+
+def decode_envelope(envelope, raw: bytes):
+    result = envelope.model_validate_json(raw)
+    if not result.is_success:
+        return result.error_message()
+    items = result.body if isinstance(result.body, list) else [result.body]
+    return result.header.id, items
+
+
+def main(iterations: int) -> None:
+    print(f"{'response':<16}{'bytes':>8}{'dict walk (us)':>18}{'envelope (us)':>18}")
+    for name, (envelope, payload) in SAMPLES.items():
+        raw = json.dumps(payload).encode()
+        envelope.model_validate_json(raw)  # warm up the validator
+        old = timeit.timeit(lambda: walk_dict(raw), number=iterations) / iterations * 1e6
+        new = timeit.timeit(lambda: decode_envelope(envelope, raw), number=iterations) / iterations * 1e6
+        print(f"{name:<16}{len(raw):>8}{old:>18.1f}{new:>18.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Bank of Abyssinia remittance API.
+
+Implements every endpoint BankOfAbyssiniaAPI calls, using the same envelope
+shapes as the beta host, so load and latency tests can run offline.
+
+Run it and point the app at it:
+    uvicorn boa_stub_server:app --port 9100
+    BOA_BASE_URL=http://localhost:9100 uvicorn main:app
+
+Behaviour is configured through environment variables (or PUT /_stub/config
+while running):
+    BOA_STUB_LATENCY              default latency distribution for all endpoints
+    BOA_STUB_LATENCY_<OPERATION>  per-endpoint override, e.g. BOA_STUB_LATENCY_TRANSFER_WITHIN
+    BOA_STUB_ERROR_RATE           fraction of requests answered with a BUSINESS error
+    BOA_STUB_ERROR_RATE_<OPERATION>
+    BOA_STUB_TIMEOUT_RATE         fraction of requests answered with a gateway timeout
+    BOA_STUB_TOKEN_TTL            access token lifetime in seconds
+    BOA_STUB_SETTLE_SECONDS       time before a transfer moves from PENDING to SUCCESS
+    BOA_STUB_SEED                 random seed, for reproducible runs
+
+Latency distributions are written as "<kind>:<params>" in milliseconds:
+    fixed:50            always 50ms
+    uniform:20,200      uniformly between 20ms and 200ms
+    normal:120,30       mean 120ms, standard deviation 30ms
+    lognormal:80,0.6    median 80ms, sigma 0.6 (long tail, closest to the real host)
+
+Account numbers ending in "0000" are reported as not found, so negative
+lookups can be exercised deterministically.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import secrets
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+OPERATIONS = [
+    "oauth2_token",
+    "get_account",
+    "other_bank_get_account",
+    "bank_list",
+    "transfer_within",
+    "transfer_other_bank",
+    "money_send",
+    "transaction_status",
+    "currency_rate",
+    "get_balance",
+]
+
+BANKS = [
+    {"id": "231402", "institutionName": "Commercial Bank of Ethiopia"},
+    {"id": "231404", "institutionName": "Awash Bank"},
+    {"id": "231406", "institutionName": "Dashen Bank"},
+    {"id": "231408", "institutionName": "Wegagen Bank"},
+    {"id": "231410", "institutionName": "United Bank"},
+    {"id": "231412", "institutionName": "Nib International Bank"},
+    {"id": "231414", "institutionName": "Cooperative Bank of Oromia"},
+    {"id": "231416", "institutionName": "Lion International Bank"},
+]
+
+RATES = {
+    "USD": ("US Dollar", "56.8769", "60.0000"),
+    "EUR": ("Euro", "61.2210", "64.5000"),
+    "GBP": ("Pound Sterling", "71.9031", "75.8000"),
+    "AED": ("UAE Dirham", "15.4850", "16.3300"),
+    "SAR": ("Saudi Riyal", "15.1600", "15.9900"),
+}
+
+FIRST_NAMES = ["Abebe", "Almaz", "Dawit", "Hana", "Kebede", "Meron", "Selam", "Tesfaye", "Yonas", "Zewditu"]
+LAST_NAMES = ["Bekele", "Girma", "Haile", "Mengistu", "Tadesse", "Tesfaye", "Wolde", "Yohannes"]
+
+
+class LatencyDistribution:
+    """Samples a delay in seconds from a "<kind>:<params>" spec."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, raw = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in raw.split(",") if p.strip()]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(self.params[0], self.params[1])
+        else:
+            median, sigma = self.params
+            ms = median * rng.lognormvariate(0, sigma)
+        return max(ms, 0.0) / 1000.0
+
+
+class StubConfig:
+    """Runtime-tunable stand-in behaviour, seeded from the environment."""
+
+    def __init__(self):
+        self.default_latency = LatencyDistribution(os.getenv("BOA_STUB_LATENCY", "lognormal:80,0.5"))
+        self.latency: Dict[str, LatencyDistribution] = {}
+        self.error_rate: Dict[str, float] = {}
+        for operation in OPERATIONS:
+            spec = os.getenv(f"BOA_STUB_LATENCY_{operation.upper()}")
+            if spec:
+                self.latency[operation] = LatencyDistribution(spec)
+            rate = os.getenv(f"BOA_STUB_ERROR_RATE_{operation.upper()}")
+            if rate:
+                self.error_rate[operation] = float(rate)
+        self.default_error_rate = float(os.getenv("BOA_STUB_ERROR_RATE", "0"))
+        self.timeout_rate = float(os.getenv("BOA_STUB_TIMEOUT_RATE", "0"))
+        self.token_ttl = int(os.getenv("BOA_STUB_TOKEN_TTL", "7200"))
+        self.settle_seconds = float(os.getenv("BOA_STUB_SETTLE_SECONDS", "5"))
+        seed = os.getenv("BOA_STUB_SEED")
+        self.rng = random.Random(int(seed) if seed else None)
+
+    def latency_for(self, operation: str) -> LatencyDistribution:
+        return self.latency.get(operation, self.default_latency)
+
+    def error_rate_for(self, operation: str) -> float:
+        return self.error_rate.get(operation, self.default_error_rate)
+
+    def update(self, data: Dict[str, Any]) -> None:
+        if "latency" in data:
+            self.default_latency = LatencyDistribution(data["latency"])
+        for operation, spec in (data.get("latency_overrides") or {}).items():
+            self.latency[operation] = LatencyDistribution(spec)
+        if "error_rate" in data:
+            self.default_error_rate = float(data["error_rate"])
+        for operation, rate in (data.get("error_rate_overrides") or {}).items():
+            self.error_rate[operation] = float(rate)
+        if "timeout_rate" in data:
+            self.timeout_rate = float(data["timeout_rate"])
+        if "token_ttl" in data:
+            self.token_ttl = int(data["token_ttl"])
+        if "settle_seconds" in data:
+            self.settle_seconds = float(data["settle_seconds"])
+        if "seed" in data:
+            self.rng.seed(data["seed"])
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "latency": self.default_latency.spec,
+            "latency_overrides": {op: dist.spec for op, dist in self.latency.items()},
+            "error_rate": self.default_error_rate,
+            "error_rate_overrides": dict(self.error_rate),
+            "timeout_rate": self.timeout_rate,
+            "token_ttl": self.token_ttl,
+            "settle_seconds": self.settle_seconds,
+        }
+
+
+config = StubConfig()
+tokens: Dict[str, float] = {}
+transfers: Dict[str, Dict[str, Any]] = {}
+stats: Dict[str, Dict[str, int]] = {op: {"requests": 0, "errors": 0, "timeouts": 0, "unauthorized": 0} for op in OPERATIONS}
+
+app = FastAPI(title="BoA stand-in", docs_url=None, redoc_url=None)
+
+
+def _audit() -> Dict[str, Any]:
+    return {
+        "T24_time": config.rng.randint(80, 400),
+        "responseParse_time": config.rng.randint(1, 5),
+        "requestParse_time": config.rng.randint(1, 5),
+        "versionNumber": "1",
+    }
+
+
+def _success(body: Any, **header: Any) -> JSONResponse:
+    return JSONResponse(
+        status_code=200,
+        content={"header": {"audit": _audit(), "status": "success", **header}, "body": body},
+    )
+
+
+def _business_error(code: str, message: str, status_code: int = 400) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "header": {"audit": _audit(), "status": "failed"},
+            "error": {
+                "type": "BUSINESS",
+                "message": message,
+                "errorDetails": [{"code": code, "message": message}],
+            },
+        },
+    )
+
+
+def _unauthorized(message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=401,
+        content={
+            "header": {"status": "failed"},
+            "error": {
+                "type": "SECURITY",
+                "message": message,
+                "errorDetails": [{"code": "401", "message": message}],
+            },
+        },
+    )
+
+
+def _gateway_timeout() -> JSONResponse:
+    return JSONResponse(
+        status_code=504,
+        content={
+            "header": {"status": "failed"},
+            "error": {
+                "type": "TECHNICAL",
+                "message": "Gateway timeout",
+                "errorDetails": [{"code": "504", "message": "Gateway timeout"}],
+            },
+        },
+    )
+
+
+def _customer_name(account_id: str) -> str:
+    digest = int(hashlib.sha1(account_id.encode()).hexdigest(), 16)
+    return f"{FIRST_NAMES[digest % len(FIRST_NAMES)]} {LAST_NAMES[(digest // 7) % len(LAST_NAMES)]}"
+
+
+async def _simulate(operation: str, request: Request, authenticated: bool = True) -> Optional[JSONResponse]:
+    """Apply latency, auth and fault injection. Returns a response to short-circuit with."""
+    stats[operation]["requests"] += 1
+    await asyncio.sleep(config.latency_for(operation).sample(config.rng))
+
+    if authenticated:
+        token = request.headers.get("Authorization", "")
+        token = token.split(" ", 1)[1] if token.lower().startswith("bearer ") else token
+        expires_at = tokens.get(token)
+        if not token:
+            stats[operation]["unauthorized"] += 1
+            return _unauthorized("The access token is missing")
+        if expires_at is None or expires_at < time.time():
+            stats[operation]["unauthorized"] += 1
+            return _unauthorized("The access token is invalid or has expired")
+
+    roll = config.rng.random()
+    if roll < config.timeout_rate:
+        stats[operation]["timeouts"] += 1
+        return _gateway_timeout()
+    if roll < config.timeout_rate + config.error_rate_for(operation):
+        stats[operation]["errors"] += 1
+        return _business_error("E-500001", "Transaction could not be processed, try again later")
+    return None
+
+
+def _record_transfer(reference: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    boa_id = "FT" + secrets.token_hex(5).upper()
+    transfers[reference] = {
+        "id": reference,
+        "boaReference": boa_id,
+        "settles_at": time.time() + config.settle_seconds,
+        "body": body,
+    }
+    transfers[boa_id] = transfers[reference]
+    return transfers[reference]
+
+
+@app.post("/oauth2/token")
+async def oauth2_token(request: Request):
+    short_circuit = await _simulate("oauth2_token", request, authenticated=False)
+    if short_circuit:
+        return short_circuit
+    payload = await request.json()
+    if payload.get("grant_type") != "refresh_token" or not payload.get("refresh_token"):
+        return JSONResponse(
+            status_code=401,
+            content={"error": "invalid_request", "error_description": "refresh_token grant required"},
+        )
+    access_token = secrets.token_urlsafe(24)
+    tokens[access_token] = time.time() + config.token_ttl
+    return {
+        "access_token": access_token,
+        "refresh_token": secrets.token_urlsafe(24),
+        "token_type": "bearer",
+        "expires_in": config.token_ttl,
+    }
+
+
+@app.get("/getAccount/{account_id}")
+async def get_account(account_id: str, request: Request):
+    short_circuit = await _simulate("get_account", request)
+    if short_circuit:
+        return short_circuit
+    if account_id.endswith("0000"):
+        return _business_error("E-111450", f"Account {account_id} not found", status_code=404)
+    return _success([{"customerName": _customer_name(account_id), "accountCurrency": "ETB"}])
+
+
+@app.get("/otherBank/getAccount/{bank_id}/{account_id}")
+async def other_bank_get_account(bank_id: str, account_id: str, request: Request):
+    short_circuit = await _simulate("other_bank_get_account", request)
+    if short_circuit:
+        return short_circuit
+    if not any(bank["id"] == bank_id for bank in BANKS):
+        return _success([{"errorCode": "E01", "errDesc": f"Unknown bank {bank_id}", "enquiryStatus": "0"}])
+    if account_id.endswith("0000"):
+        return _success([{"errorCode": "E02", "errDesc": "Account not found", "enquiryStatus": "0"}])
+    return _success([{
+        "errorCode": "ok",
+        "beneficiaryName": _customer_name(account_id),
+        "accountCurrency": "ETB",
+        "enquiryStatus": "1",
+    }])
+
+
+@app.get("/otherBank/bankId")
+async def bank_list(request: Request):
+    short_circuit = await _simulate("bank_list", request)
+    if short_circuit:
+        return short_circuit
+    return _success(BANKS)
+
+
+@app.post("/transferWithin")
+async def transfer_within(request: Request):
+    short_circuit = await _simulate("transfer_within", request)
+    if short_circuit:
+        return short_circuit
+    payload = await request.json()
+    account_number = str(payload.get("accountNumber", ""))
+    if account_number.endswith("0000"):
+        return _business_error("E-111450", f"Account {account_number} not found", status_code=404)
+    body = {
+        "transactionType": "AC",
+        "debitAccountId": "20654376",
+        "creditAccountId": account_number,
+        "debitAmount": payload.get("amount"),
+        "creditAmount": payload.get("amount"),
+        "debitCurrency": "ETB",
+        "creditCurrency": "ETB",
+        "reason": payload.get("reference"),
+        "transactionDate": datetime.utcnow().strftime("%Y%m%d"),
+        "infinityReference": uuid.uuid4().hex[:16].upper(),
+    }
+    transfer = _record_transfer(payload.get("reference") or uuid.uuid4().hex, body)
+    return _success(
+        body,
+        id=transfer["boaReference"],
+        uniqueIdentifier=f"IRFX{int(time.time() * 1000)}.00",
+        transactionStatus="Live",
+    )
+
+
+@app.post("/otherBank/transferEthswitch")
+async def transfer_other_bank(request: Request):
+    short_circuit = await _simulate("transfer_other_bank", request)
+    if short_circuit:
+        return short_circuit
+    payload = await request.json()
+    if not any(bank["id"] == payload.get("bankCode") for bank in BANKS):
+        return _business_error("E-120001", f"Unknown bank code {payload.get('bankCode')}")
+    body = {
+        "transactionType": "ACET",
+        "debitAccountId": "20654376",
+        "creditAccountId": payload.get("accountNumber"),
+        "debitAmount": payload.get("amount"),
+        "creditAmount": payload.get("amount"),
+        "debitCurrency": "ETB",
+        "creditCurrency": "ETB",
+        "reason": payload.get("reference"),
+        "transactionDate": datetime.utcnow().strftime("%Y%m%d"),
+    }
+    transfer = _record_transfer(payload.get("reference") or uuid.uuid4().hex, body)
+    return _success(
+        body,
+        id=transfer["boaReference"],
+        uniqueIdentifier=f"IRFX{int(time.time() * 1000)}.00",
+        transactionStatus="Live",
+    )
+
+
+@app.post("/moneySend")
+async def money_send(request: Request):
+    short_circuit = await _simulate("money_send", request)
+    if short_circuit:
+        return short_circuit
+    payload = await request.json()
+    body = {
+        "transactionType": "MS",
+        "debitAmount": payload.get("amount"),
+        "receiverName": payload.get("receiverName"),
+        "receiverPhonenumber": payload.get("receiverPhonenumber"),
+        "reason": payload.get("reference"),
+        "transactionDate": datetime.utcnow().strftime("%Y%m%d"),
+    }
+    transfer = _record_transfer(payload.get("reference") or uuid.uuid4().hex, body)
+    return _success(
+        body,
+        id=transfer["boaReference"],
+        uniqueIdentifier=f"IRFX{int(time.time() * 1000)}.00",
+        transactionStatus="Live",
+    )
+
+
+@app.get("/transactionStatus/{transaction_id}")
+async def transaction_status(transaction_id: str, request: Request):
+    short_circuit = await _simulate("transaction_status", request)
+    if short_circuit:
+        return short_circuit
+    transfer = transfers.get(transaction_id)
+    if not transfer:
+        return _business_error("E-130001", f"Transaction {transaction_id} not found", status_code=404)
+    settled = time.time() >= transfer["settles_at"]
+    return _success([{
+        "id": transfer["id"],
+        "boaReference": transfer["boaReference"],
+        "status": "SUCCESS" if settled else "PENDING",
+    }])
+
+
+@app.get("/rate/{base_currency}")
+async def currency_rate(base_currency: str, request: Request):
+    short_circuit = await _simulate("currency_rate", request)
+    if short_circuit:
+        return short_circuit
+    rate = RATES.get(base_currency.upper())
+    if not rate:
+        return _business_error("E-140001", f"Currency {base_currency} not supported", status_code=404)
+    name, buy, sell = rate
+    return _success([{"currencyCode": base_currency.upper(), "currencyName": name, "buyRate": buy, "sellRate": sell}])
+
+
+@app.post("/getBalance")
+async def get_balance(request: Request):
+    short_circuit = await _simulate("get_balance", request)
+    if short_circuit:
+        return short_circuit
+    balance = 2500000 - sum(1 for key, t in transfers.items() if key == t["id"]) * 100
+    return _success([{"accountCurrency": "ETB", "workingBalance": f"{balance:.2f}"}])
+
+
+# Stand-in control endpoints, not part of the BoA API
+
+@app.get("/_stub/config")
+async def get_stub_config():
+    return config.describe()
+
+
+@app.put("/_stub/config")
+async def update_stub_config(request: Request):
+    try:
+        config.update(await request.json())
+    except (TypeError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    return config.describe()
+
+
+@app.get("/_stub/stats")
+async def get_stub_stats():
+    return {"operations": stats, "live_tokens": sum(1 for exp in tokens.values() if exp > time.time())}
+
+
+@app.post("/_stub/reset")
+async def reset_stub():
+    tokens.clear()
+    transfers.clear()
+    for counters in stats.values():
+        for key in counters:
+            counters[key] = 0
+    return {"message": "Stand-in state cleared"}
+
+
+def main():
+    import uvicorn
+
+    port = int(os.getenv("BOA_STUB_PORT", "9100"))
+    print(f"BoA stand-in listening on http://0.0.0.0:{port}")
+    print(f"Point the app at it with BOA_BASE_URL=http://localhost:{port}")
+    uvicorn.run(app, host="0.0.0.0", port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+Shared pytest setup for the SQLite tests.
+The models use BIGINT primary keys, which SQLite only autoincrements when
+they are declared INTEGER, so rows the application inserts without an id
+(outbox events, BoA records, idempotency keys, spend buckets) need them
+compiled that way.
+"""
+
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    return "INTEGER"
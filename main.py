@@ -5,7 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.database.database import Base, SessionLocal, engine, init_redis
 from app.seeders import create_admin_user
-from app.routers import auth, users, payment_cards, recipients ,manual_deposits, notifications, kyc_documents, admin_kyc, admin_transactions,user_transactions, admin,dashboard, admin_exchange_rate, user_exchange_rate, admin_role, contact_us, admin_transaction_fees, admin_role,country, bank, user_transaction_fees, boa_integration
+from app.routers import auth, users, payment_cards, recipients ,manual_deposits, notifications, kyc_documents, admin_kyc, admin_transactions,user_transactions, admin,dashboard, admin_exchange_rate, user_exchange_rate, admin_role, contact_us, admin_transaction_fees, admin_role,country, bank, user_transaction_fees, boa_integration, admin_exports
 from app.seeders import create_admin_user
 from app.core.security import limiter
 from slowapi.errors import RateLimitExceeded
@@ -15,7 +15,21 @@ from fastapi import Request
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi import Depends, status
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
+from app.utils.metrics import registry
+from app.utils.scheduler import start_periodic, stop_all
+from app.utils.status_poller import status_poller
+from app.utils.boa_cache import beneficiary_cache
+from app.utils.payout_jobs import resume_interrupted_payouts
+from app.utils.idempotency import idempotency_store
+from app.utils.stripe_client import close_stripe_client
+from app.utils.outbox import outbox_dispatcher
+from app.utils.transfer_worker import transfer_worker
+from app.utils.spend_limits import purge_expired_buckets
+import app.utils.dashboard_rollups  # noqa: F401 - keeps the dashboard rollups in step with every flush
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.utils.boa_service import BoABankService, BoARateService, BoABalanceService
 app = FastAPI(
     title="Hakim Express API",
     description="API documentation for Hakim Express.",
@@ -44,6 +58,10 @@ async def get_swagger_documentation(username: str = Depends(authenticate_docs)):
 @app.get("/openapi.json", include_in_schema=False)
 async def openapi_endpoint(username: str = Depends(authenticate_docs)):
     return app.openapi()
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(username: str = Depends(authenticate_docs)):
+    # Prometheus text format; scrape with the docs basic-auth credentials
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 @app.on_event("startup")
 def on_startup():
@@ -61,6 +79,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 @app.on_event("startup")
 async def startup_event():
@@ -70,10 +89,35 @@ async def startup_event():
     """
     await init_redis()
     print("Redis initialized successfully.")
+    # One worker polls BoA per interval; the others read the bank list, rates and balance it stored
+    if settings.BOA_POLLING_JOBS_ENABLED:
+        start_periodic("boa_bank_list_refresh", settings.BOA_BANK_LIST_REFRESH_SECONDS, BoABankService.refresh_snapshot,
+                       leader_only=True, on_follower=BoABankService.reload_snapshot)
+        start_periodic("boa_rate_refresh", settings.BOA_RATE_REFRESH_SECONDS, BoARateService.refresh_rates, leader_only=True)
+        start_periodic("boa_balance_poll", settings.BOA_BALANCE_POLL_SECONDS, BoABalanceService.poll, leader_only=True)
+        start_periodic("boa_balance_downsample", settings.BOA_BALANCE_DOWNSAMPLE_SECONDS, BoABalanceService.run_downsample, leader_only=True)
+    else:
+        start_periodic("boa_bank_list_reload", settings.BOA_BANK_LIST_REFRESH_SECONDS, BoABankService.reload_snapshot)
+    start_periodic("boa_status_poll", settings.BOA_STATUS_POLL_SECONDS, status_poller.run)
+    start_periodic("boa_beneficiary_purge", settings.BOA_BENEFICIARY_PURGE_SECONDS, beneficiary_cache.purge_expired, run_immediately=False)
+    start_periodic("idempotency_key_purge", settings.IDEMPOTENCY_PURGE_SECONDS, idempotency_store.purge_expired, run_immediately=False)
+    start_periodic("outbox_dispatch", settings.OUTBOX_DISPATCH_SECONDS, outbox_dispatcher.run)
+    start_periodic("outbox_purge", settings.OUTBOX_PURGE_SECONDS, outbox_dispatcher.purge_processed, run_immediately=False)
+    start_periodic("spend_bucket_purge", settings.SPEND_BUCKET_PURGE_SECONDS, purge_expired_buckets, run_immediately=False)
+    # Also resumes jobs left running by a previous process once their lease runs out
+    start_periodic("transfer_worker", settings.TRANSFER_WORKER_POLL_SECONDS, transfer_worker.run)
+    # One worker restarts payout jobs whose runner stopped; the claim is fenced, so a slow leader cannot double-send
+    start_periodic("payout_resume", settings.BOA_PAYOUT_RESUME_SECONDS, resume_interrupted_payouts, leader_only=True)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_all()
+    await close_stripe_client()
 
 app.include_router(dashboard.router, prefix="/api/admin", tags=["Dashboard"])
 app.include_router(admin.router, prefix="/api", tags=["Admin User"])
 app.include_router(admin_kyc.router, prefix="/api/admin/kyc", tags=["Admin - KYC Management"])
+app.include_router(admin_exports.router, prefix="/api/admin/exports", tags=["Admin - Exports"])
 app.include_router(admin_transactions.router, prefix="/api/admin/transactions", tags=["Admin Transactions"])
 app.include_router(admin_exchange_rate.router, prefix="/api/admin/exchange-rates", tags=["Admin currency & Fees management"])
 app.include_router(admin_transaction_fees.router, prefix="/api/admin/transaction-fees", tags=["Admin - set Transaction Fees on fees and exchange rates page"])
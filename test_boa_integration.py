@@ -14,6 +14,7 @@ from unittest.mock import Mock, patch
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.utils.boa_api_service import BankOfAbyssiniaAPI, BoAAuthenticationError, BoAAPIError
+from app.schemas.boa_envelopes import AccountEnvelope, TransferEnvelope, RateEnvelope, BankListEnvelope
 from app.utils.boa_service import (
     BoABeneficiaryService,
     BoATransferService,
@@ -120,10 +121,10 @@ class BoATestSuite:
         """Test beneficiary service with mocked API"""
         try:
             # Mock the API response
-            mock_api_response = {
+            mock_api_response = AccountEnvelope.model_validate({
                 "header": {"status": "success"},
                 "body": [{"customerName": "John Doe", "accountCurrency": "ETB"}]
-            }
+            })
 
             with patch('app.utils.boa_service.boa_api') as mock_boa_api:
                 async def mock_fetch_beneficiary_name(account_id):
@@ -145,7 +146,7 @@ class BoATestSuite:
         """Test transfer service with mocked API"""
         try:
             # Mock the API response
-            mock_api_response = {
+            mock_api_response = TransferEnvelope.model_validate({
                 "header": {
                     "status": "success",
                     "id": "FT123456789",
@@ -161,7 +162,7 @@ class BoATestSuite:
                     "debitCurrency": "ETB",
                     "creditCurrency": "ETB"
                 }
-            }
+            })
 
             with patch('app.utils.boa_service.boa_api') as mock_boa_api:
                 async def mock_initiate_within_boa_transfer(amount, account_number, reference):
@@ -223,7 +224,7 @@ class BoATestSuite:
     async def test_currency_rate_service(self):
         """Test currency rate service"""
         try:
-            mock_rate_response = {
+            mock_rate_response = RateEnvelope.model_validate({
                 "header": {"status": "success"},
                 "body": [{
                     "currencyCode": "USD",
@@ -231,7 +232,7 @@ class BoATestSuite:
                     "buyRate": "56.8769",
                     "sellRate": "60.0000"
                 }]
-            }
+            })
 
             with patch('app.utils.boa_service.boa_api') as mock_boa_api:
                 async def mock_get_currency_rate(base_currency):
@@ -253,13 +254,13 @@ class BoATestSuite:
     async def test_bank_list_service(self):
         """Test bank list service"""
         try:
-            mock_bank_response = {
+            mock_bank_response = BankListEnvelope.model_validate({
                 "header": {"status": "success"},
                 "body": [
                     {"id": "231402", "institutionName": "Commercial Bank of Ethiopia"},
                     {"id": "231404", "institutionName": "Awash Bank"}
                 ]
-            }
+            })
 
             with patch('app.utils.boa_service.boa_api') as mock_boa_api:
                 async def mock_get_bank_list():
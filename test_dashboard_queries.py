@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the admin dashboard
+Checks the summary metrics against known data and that they are read with a
+fixed number of queries, that they are cached until a transaction changes,
+and that the daily rollups behind them follow transaction changes and match
+a backfill, on a throwaway SQLite database
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main  # noqa: F401 - registers every model on Base
+from app.database.database import Base
+from app.models.manual_deposits import ManualDeposit
+from app.models.transactions import Transaction, TransactionStatus
+from app.models.users import User, Role
+from app.models.dashboard_stats import DailyTransactionStats, DailyUserSignups
+from app.routers.dashboard import get_summary_metrics
+from app.schemas.dashboard import SummaryMetrics
+from app.utils.dashboard_rollups import backfill
+from app.utils.response_cache import dashboard_cache
+
+# get_current_user, then the transaction rollup aggregate and the deposit/signup aggregate
+SUMMARY_QUERY_COUNT = 3
+
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    # Nothing cached from another test's database
+    dashboard_cache.invalidate()
+    return engine, sessionmaker(bind=engine)()
+
+
+def summary(db):
+    return SummaryMetrics(**asyncio.run(get_summary_metrics(db=db, token={"sub": "1"})))
+
+
+def seed(db):
+    """Explicit ids: SQLite does not autoincrement BIGINT primary keys"""
+    now = datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    db.add_all([
+        User(user_id=1, email="admin@example.com", phone="+251911000001", password="x", role=Role.admin,
+             created_at=today - timedelta(days=30)),
+        User(user_id=2, email="user@example.com", phone="+251911000002", password="x", role=Role.user,
+             created_at=today - timedelta(days=10)),
+        User(user_id=3, email="new@example.com", phone="+251911000003", password="x", role=Role.user,
+             created_at=now),
+    ])
+    db.flush()
+
+    transactions = [
+        # (amount, currency, status, created_at)
+        (100, "ETB", TransactionStatus.completed, today + timedelta(minutes=1)),
+        (40, "USD", TransactionStatus.completed, today + timedelta(minutes=2)),
+        (7, "ETB", TransactionStatus.pending, today + timedelta(minutes=3)),
+        (60, "ETB", TransactionStatus.completed, today - timedelta(hours=1)),
+        (80, "ETB", TransactionStatus.completed, today - timedelta(days=10)),
+        (20, "USD", TransactionStatus.completed, today - timedelta(days=9)),
+        (500, "ETB", TransactionStatus.completed, today - timedelta(days=40)),
+    ]
+    db.add_all([
+        Transaction(transaction_id=i, user_id=2, amount=amount, currency=currency, status=status,
+                    created_at=created_at, transaction_reference=f"T{i}")
+        for i, (amount, currency, status, created_at) in enumerate(transactions, start=1)
+    ])
+    db.flush()
+
+    db.add_all([
+        ManualDeposit(id=1, transaction_id=3, completed=False, created_at=today - timedelta(days=8)),
+        ManualDeposit(id=2, transaction_id=4, completed=False, created_at=now),
+        ManualDeposit(id=3, transaction_id=5, completed=True, created_at=today - timedelta(days=8)),
+    ])
+    db.commit()
+
+
+def test_summary_metrics_values_and_query_count():
+    engine, db = make_session()
+    seed(db)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    metrics = summary(db)
+
+    assert len(statements) == SUMMARY_QUERY_COUNT, statements
+
+    assert metrics.total_etb_disbursed.value == 740
+    assert metrics.total_etb_disbursed.percentage_change == pytest.approx((740 - 80) / 80 * 100)
+    assert metrics.total_transactions.value == 800
+    assert metrics.total_transactions.percentage_change == pytest.approx((800 - 100) / 100 * 100)
+    assert metrics.today_transactions.value == 140
+    assert metrics.today_transactions.percentage_change == pytest.approx((140 - 60) / 60 * 100)
+    assert metrics.pending_deposits.value == 2
+    assert metrics.pending_deposits.percentage_change == pytest.approx((2 - 1) / 1 * 100)
+    assert metrics.total_users.value == 3
+    assert metrics.total_users.percentage_change == pytest.approx((3 - 2) / 2 * 100)
+    db.close()
+
+
+def test_summary_metrics_empty_database():
+    engine, db = make_session()
+    db.add(User(user_id=1, email="admin@example.com", phone="+251911000001", password="x", role=Role.admin))
+    db.commit()
+
+    metrics = summary(db)
+
+    assert metrics.total_transactions.value == 0
+    assert metrics.today_transactions.percentage_change == 0.0
+    assert metrics.pending_deposits.value == 0
+    assert metrics.total_users.value == 1
+    db.close()
+
+
+def test_summary_cached_until_a_transaction_changes():
+    engine, db = make_session()
+    seed(db)
+    first = summary(db)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert summary(db) == first
+    # Only get_current_user: the aggregates came from the cache
+    assert len(statements) == 1, statements
+
+    db.get(Transaction, 3).status = TransactionStatus.completed
+    db.commit()
+    statements.clear()
+    metrics = summary(db)
+    assert len(statements) == SUMMARY_QUERY_COUNT, statements
+    assert metrics.today_transactions.value == 147
+    db.close()
+
+
+def rollup_rows(db):
+    return (
+        sorted((row.stat_date, row.currency, row.status, row.transaction_count, row.amount)
+               for row in db.query(DailyTransactionStats) if row.transaction_count),
+        sorted((row.stat_date, row.signup_count) for row in db.query(DailyUserSignups) if row.signup_count),
+    )
+
+
+def test_rollups_follow_changes_and_match_backfill():
+    engine, db = make_session()
+    seed(db)
+
+    transaction = db.get(Transaction, 3)
+    transaction.status = TransactionStatus.completed
+    db.delete(db.get(ManualDeposit, 3))
+    db.delete(db.get(Transaction, 5))
+    db.commit()
+    db.delete(db.get(User, 3))
+    db.commit()
+
+    maintained = rollup_rows(db)
+    assert (transaction.created_at.date(), "ETB", "pending", 1, 7) not in maintained[0]
+    backfill(db)
+    assert rollup_rows(db) == maintained
+    db.close()
+
+
+if __name__ == "__main__":
+    test_summary_metrics_values_and_query_count()
+    test_summary_metrics_empty_database()
+    test_summary_cached_until_a_transaction_changes()
+    test_rollups_follow_changes_and_match_backfill()
+    print("Dashboard summary tests passed")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Regression tests for Idempotency-Key handling
+Checks replay, conflicts and retries after a failure through the database
+fallback that is used when Redis is not available, on a throwaway SQLite
+database
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main  # noqa: F401 - registers every model on Base
+from app.database import database
+from app.database.database import Base
+from app.models.idempotency_keys import IdempotencyKey
+from app.utils import idempotency
+from app.utils.idempotency import idempotency_store, request_fingerprint, run_idempotent
+
+SCOPE = "test:transfer"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "redis_client", None)
+    monkeypatch.setattr(idempotency, "SessionLocal", Session)
+    session = Session()
+    yield session
+    session.close()
+
+
+class Handler:
+    """Counts runs and answers with the run number"""
+
+    def __init__(self, error=None):
+        self.runs = 0
+        self.error = error
+
+    async def __call__(self):
+        self.runs += 1
+        if self.error is not None:
+            raise self.error
+        return {"run": self.runs}
+
+
+def call(key, payload, handler):
+    response = asyncio.run(run_idempotent(SCOPE, key, payload, handler, status_code=202))
+    return response.status_code, json.loads(response.body), response.headers.get("Idempotent-Replayed")
+
+
+def test_repeat_is_replayed_without_running_again(db):
+    handler = Handler()
+
+    assert call("key-1", {"transaction_id": 1}, handler) == (202, {"run": 1}, None)
+    assert call("key-1", {"transaction_id": 1}, handler) == (202, {"run": 1}, "true")
+    assert handler.runs == 1
+    assert db.query(IdempotencyKey.state).scalar() == "completed"
+
+
+def test_key_reused_with_another_request_conflicts(db):
+    handler = Handler()
+    call("key-1", {"transaction_id": 1}, handler)
+
+    status_code, body, _ = call("key-1", {"transaction_id": 2}, handler)
+
+    assert status_code == 409
+    assert "different request" in body["detail"]
+    assert handler.runs == 1
+
+
+def test_repeat_while_the_first_is_running_conflicts(db):
+    payload = {"transaction_id": 1}
+    claim = asyncio.run(idempotency_store.claim(SCOPE, "key-1", request_fingerprint(payload)))
+    assert claim.owned
+    handler = Handler()
+
+    status_code, body, _ = call("key-1", payload, handler)
+
+    assert status_code == 409
+    assert "still being processed" in body["detail"]
+    assert handler.runs == 0
+
+
+def test_http_error_is_replayed(db):
+    handler = Handler(HTTPException(status_code=404, detail="Transaction not found"))
+    with pytest.raises(HTTPException):
+        call("key-1", {"transaction_id": 1}, handler)
+
+    # The stored answer comes back as a response instead of running the handler again
+    assert call("key-1", {"transaction_id": 1}, handler) == (404, {"detail": "Transaction not found"}, "true")
+    assert handler.runs == 1
+
+
+def test_unexpected_error_releases_the_key(db):
+    failing = Handler(RuntimeError("connection reset"))
+    with pytest.raises(RuntimeError):
+        call("key-1", {"transaction_id": 1}, failing)
+    assert db.query(IdempotencyKey).count() == 0
+
+    handler = Handler()
+    assert call("key-1", {"transaction_id": 1}, handler) == (202, {"run": 1}, None)
+
+
+def test_expired_claim_is_taken_over(db):
+    payload = {"transaction_id": 1}
+    asyncio.run(idempotency_store.claim(SCOPE, "key-1", request_fingerprint(payload)))
+    db.query(IdempotencyKey).update({IdempotencyKey.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    handler = Handler()
+
+    assert call("key-1", payload, handler) == (202, {"run": 1}, None)
+
+
+def test_requests_without_a_key_always_run(db):
+    handler = Handler()
+
+    asyncio.run(run_idempotent(SCOPE, None, {"transaction_id": 1}, handler))
+    asyncio.run(run_idempotent(SCOPE, None, {"transaction_id": 1}, handler))
+
+    assert handler.runs == 2
+    assert db.query(IdempotencyKey).count() == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the notification outbox
+Checks that events are only queued with the change that caused them, that
+a claimed batch is hidden from other dispatchers, and that applying the
+results writes one in-app notification per notification and retries or
+fails the other channels, on a throwaway SQLite database
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main  # noqa: F401 - registers every model on Base
+from app.database.database import Base
+from app.models.notifications import ChannelType, Notification
+from app.models.outbox_events import OutboxEvent
+from app.models.users import User, Role
+from app.utils.outbox import CLAIM_LEASE, DeliveryResult, OutboxDispatcher, enqueue_notification
+
+ALL_CHANNELS = (ChannelType.push, ChannelType.email, ChannelType.sms)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(user_id=1, email="user@example.com", phone="+251911000002", password="x", role=Role.user))
+    session.commit()
+    yield session
+    session.close()
+
+
+def dispatcher(max_attempts=3):
+    return OutboxDispatcher(batch_size=10, concurrency=2, max_attempts=max_attempts, retention=timedelta(days=7))
+
+
+def notify(db, channels=ALL_CHANNELS):
+    enqueue_notification(db, user_id=1, title="Transfer Failed", message="Your transfer could not be completed.",
+                         type="transfer_failed", channels=channels)
+
+
+def events(db):
+    db.expire_all()
+    return {event.event_type: event for event in db.query(OutboxEvent)}
+
+
+def test_nothing_is_queued_when_the_change_rolls_back(db):
+    notify(db)
+    db.rollback()
+    assert db.query(OutboxEvent).count() == 0
+
+    notify(db)
+    db.commit()
+    assert db.query(OutboxEvent).count() == 3
+
+
+def test_claimed_events_are_leased(db):
+    notify(db)
+    db.commit()
+    now = datetime.utcnow()
+
+    claimed = dispatcher().claim(db, now)
+
+    assert len(claimed) == 3
+    assert dispatcher().claim(db, now) == []
+    # Not applied before the lease ran out: due again
+    assert len(dispatcher().claim(db, now + CLAIM_LEASE)) == 3
+
+
+def test_apply_writes_one_notification_and_retries_failed_channels(db):
+    notify(db)
+    db.commit()
+    outbox = dispatcher()
+    now = datetime.utcnow()
+    claimed = outbox.claim(db, now)
+    results = {
+        event.id: DeliveryResult("smtp down") if event.event_type == "notification.email" else DeliveryResult()
+        for event in claimed
+    }
+
+    assert outbox.apply(db, claimed, results, now) == {"sent": 2, "retry": 1, "failed": 0}
+
+    by_type = events(db)
+    assert by_type["notification.push"].status == "sent"
+    assert by_type["notification.sms"].status == "sent"
+    email = by_type["notification.email"]
+    assert (email.status, email.attempts, email.last_error) == ("pending", 1, "smtp down")
+    assert email.available_at > now
+    notifications = db.query(Notification).all()
+    assert [(row.channel, row.is_sent) for row in notifications] == [(ChannelType.push, True)]
+
+
+def test_channel_is_failed_after_the_last_attempt(db):
+    notify(db, channels=(ChannelType.push, ChannelType.email))
+    db.commit()
+    outbox = dispatcher(max_attempts=2)
+
+    now = datetime.utcnow()
+    for _ in range(2):
+        claimed = outbox.claim(db, now)
+        results = {event.id: DeliveryResult() if event.event_type == "notification.push" else DeliveryResult("smtp down")
+                   for event in claimed}
+        outbox.apply(db, claimed, results, now)
+        now += timedelta(hours=2)
+
+    email = events(db)["notification.email"]
+    assert (email.status, email.attempts) == ("failed", 2)
+    assert outbox.claim(db, now) == []
+    assert db.query(Notification).count() == 1
+
+
+def test_missing_address_is_not_retried(db):
+    notify(db, channels=(ChannelType.email,))
+    db.commit()
+    outbox = dispatcher()
+    now = datetime.utcnow()
+    claimed = outbox.claim(db, now)
+
+    # No contact loaded for the user, so there is nothing to send to
+    results = asyncio.run(outbox.deliver(claimed, {}))
+
+    assert outbox.apply(db, claimed, results, now) == {"sent": 0, "retry": 0, "failed": 1}
+    assert events(db)["notification.email"].last_error == "User has no email address"
+    assert db.query(Notification).count() == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the weekly spend limit
+Checks that reservations are counted before the card is charged, that a
+refused or released reservation leaves nothing behind, and that the daily
+buckets follow transactions failing and coming back, on a throwaway
+SQLite database
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main  # noqa: F401 - registers every model on Base
+from app.database.database import Base
+from app.models.transactions import Transaction, TransactionStatus
+from app.models.user_spend_buckets import UserSpendBucket
+from app.models.users import User, Role
+from app.utils.spend_limits import (
+    WeeklyLimitExceeded, adjust_spend, counts_towards_limit, release_weekly_spend, reserve_weekly_spend, weekly_spend
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(user_id=1, email="limited@example.com", phone="+251911000002", password="x", role=Role.user,
+             user_weekly_limit=100),
+        User(user_id=2, email="unlimited@example.com", phone="+251911000003", password="x", role=Role.user),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def create_transaction(db, transaction_id, reservation):
+    """What create_user_transaction stores once the charge went through"""
+    transaction = Transaction(transaction_id=transaction_id, user_id=reservation.user_id, amount=reservation.amount,
+                              currency="USD", status=TransactionStatus.pending, created_at=reservation.created_at,
+                              transaction_reference=f"T{transaction_id}")
+    db.add(transaction)
+    db.commit()
+    return transaction
+
+
+def change_status(db, transaction, new_status):
+    """The weekly limit part of an admin or poller status change"""
+    if counts_towards_limit(transaction.status) != counts_towards_limit(new_status):
+        adjust_spend(db, [transaction], sign=1 if counts_towards_limit(new_status) else -1)
+    transaction.status = new_status
+    db.commit()
+
+
+def test_reservation_counts_before_the_transaction_exists(db):
+    user = db.get(User, 1)
+    reserve_weekly_spend(db, user, Decimal("60"))
+
+    with pytest.raises(WeeklyLimitExceeded) as refused:
+        reserve_weekly_spend(db, user, Decimal("50"))
+
+    assert refused.value.spent == 60
+    # The refused amount was rolled back
+    assert weekly_spend(db, 1) == 60
+    reserve_weekly_spend(db, user, Decimal("40"))
+    assert weekly_spend(db, 1) == 100
+
+
+def test_released_reservation_is_given_back(db):
+    user = db.get(User, 1)
+    reservation = reserve_weekly_spend(db, user, Decimal("80"))
+
+    release_weekly_spend(db, reservation)
+
+    assert weekly_spend(db, 1) == 0
+    bucket = db.query(UserSpendBucket).one()
+    assert (bucket.amount, bucket.transaction_count) == (0, 0)
+    reserve_weekly_spend(db, user, Decimal("100"))
+
+
+def test_spend_follows_status_changes(db):
+    user = db.get(User, 1)
+    transaction = create_transaction(db, 1, reserve_weekly_spend(db, user, Decimal("70")))
+    # Created from the reservation, so it was not added a second time
+    assert weekly_spend(db, 1) == 70
+
+    change_status(db, transaction, TransactionStatus.failed)
+    assert weekly_spend(db, 1) == 0
+    reservation = reserve_weekly_spend(db, user, Decimal("90"))
+
+    # Bringing the failed transaction back counts it again, even past the limit
+    change_status(db, transaction, TransactionStatus.completed)
+    assert weekly_spend(db, 1) == 160
+    change_status(db, transaction, TransactionStatus.pending)
+    assert weekly_spend(db, 1) == 160
+    release_weekly_spend(db, reservation)
+    assert weekly_spend(db, 1) == 70
+
+
+def test_spend_outside_the_window_is_ignored(db):
+    old = Transaction(transaction_id=1, user_id=1, amount=500, currency="USD", status=TransactionStatus.completed,
+                      created_at=datetime.utcnow() - timedelta(days=8), transaction_reference="T1")
+    db.add(old)
+    adjust_spend(db, [old])
+    db.commit()
+
+    assert db.query(UserSpendBucket).count() == 0
+    change_status(db, old, TransactionStatus.failed)
+    assert weekly_spend(db, 1) == 0
+    reserve_weekly_spend(db, db.get(User, 1), Decimal("100"))
+
+
+def test_user_without_a_limit_is_still_recorded(db):
+    reserve_weekly_spend(db, db.get(User, 2), Decimal("10000"))
+
+    assert weekly_spend(db, 2) == 10000
+    assert weekly_spend(db, 1) == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the background transfer worker
+Checks that a job whose worker died is claimed again once its lease runs
+out and continues from its last checkpoint without sending the money
+twice, on a throwaway SQLite database with BoA replaced by a counter
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main  # noqa: F401 - registers every model on Base
+from app.database.database import Base
+from app.models.boa_integration import BoATransaction
+from app.models.transactions import AccountType, Transaction, TransactionStatus
+from app.models.transfer_jobs import TransferJob
+from app.models.users import User, Role
+from app.schemas.boa_envelopes import TransferEnvelope
+from app.utils import transfer_worker as worker_module
+from app.utils.transfer_pipeline import BoATransferPipeline
+from app.utils.transfer_worker import INTERRUPTED_DISPATCH_ERROR, LeaseLostError, TransferWorker
+
+BENEFICIARY = {"account_currency": "ETB", "customer_name": "Abebe Kebede"}
+LEASE = timedelta(minutes=2)
+
+
+def boa_response(reference="FT24001ABCDE"):
+    return TransferEnvelope.model_validate({
+        "header": {"status": "success", "id": reference, "transactionStatus": "Live"},
+        "body": {"transactionType": "AC", "creditAccountId": "1000123456", "debitAmount": "250.00", "debitCurrency": "ETB"},
+    })
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    # The worker opens its own short sessions
+    monkeypatch.setattr(worker_module, "SessionLocal", Session)
+    session = Session()
+    session.add(User(user_id=1, email="user@example.com", phone="+251911000002", password="x", role=Role.user))
+    session.add(Transaction(transaction_id=1, user_id=1, amount=250, currency="ETB", status=TransactionStatus.pending,
+                            account_type=AccountType.bank_account, account_number="1000123456",
+                            transaction_reference="T1"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def boa(monkeypatch):
+    """Counts calls instead of reaching BoA"""
+    calls = {"resolve": 0, "dispatch": 0}
+
+    async def resolve_beneficiary(self, snapshot):
+        calls["resolve"] += 1
+        return BENEFICIARY
+
+    async def dispatch(self, snapshot, beneficiary):
+        calls["dispatch"] += 1
+        return boa_response()
+
+    monkeypatch.setattr(BoATransferPipeline, "resolve_beneficiary", resolve_beneficiary)
+    monkeypatch.setattr(BoATransferPipeline, "dispatch", dispatch)
+    return calls
+
+
+def abandoned_job(db, **checkpoint):
+    """A job left running by a worker that died, with its lease already over"""
+    job = TransferJob(id=1, transaction_id=1, user_id=1, status="running", attempts=1,
+                      lease_until=datetime.utcnow() - timedelta(seconds=1), **checkpoint)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def run_worker(worker, times=1):
+    async def run():
+        return [await worker.run_once() for _ in range(times)]
+    return asyncio.run(run())
+
+
+def test_expired_lease_resumes_from_checkpoint_and_dispatches_once(db, boa):
+    abandoned_job(db, step="beneficiary_resolved", beneficiary=BENEFICIARY)
+
+    # The second run finds nothing left to claim
+    assert run_worker(TransferWorker(batch_size=10, concurrency=1, lease=LEASE), times=2) == [1, 0]
+
+    db.expire_all()
+    job = db.get(TransferJob, 1)
+    assert (job.status, job.step, job.attempts) == ("succeeded", "persisted", 2)
+    assert boa == {"resolve": 0, "dispatch": 1}
+    assert db.get(Transaction, 1).status == TransactionStatus.completed
+    assert db.query(BoATransaction).count() == 1
+
+
+def test_live_lease_is_not_claimed(db, boa):
+    job = abandoned_job(db, step="beneficiary_resolved", beneficiary=BENEFICIARY)
+    job.lease_until = datetime.utcnow() + LEASE
+    db.commit()
+
+    assert run_worker(TransferWorker(batch_size=10, concurrency=1, lease=LEASE)) == [0]
+    assert boa["dispatch"] == 0
+
+
+def test_dispatched_job_is_persisted_without_sending_again(db, boa):
+    response = boa_response()
+    abandoned_job(db, step="dispatched", beneficiary=BENEFICIARY,
+                  boa_response=response.model_dump(mode="json", by_alias=True), boa_reference=response.header.id)
+
+    run_worker(TransferWorker(batch_size=10, concurrency=1, lease=LEASE))
+
+    db.expire_all()
+    assert db.get(TransferJob, 1).status == "succeeded"
+    assert boa["dispatch"] == 0
+    assert db.query(BoATransaction.boa_reference).scalar() == response.header.id
+
+
+def test_job_interrupted_while_dispatching_is_failed_not_resent(db, boa):
+    abandoned_job(db, step="dispatching", beneficiary=BENEFICIARY)
+
+    run_worker(TransferWorker(batch_size=10, concurrency=1, lease=LEASE))
+
+    db.expire_all()
+    job = db.get(TransferJob, 1)
+    assert (job.status, job.error) == ("failed", INTERRUPTED_DISPATCH_ERROR)
+    assert boa["dispatch"] == 0
+    assert db.get(Transaction, 1).status == TransactionStatus.pending
+
+
+def test_worker_that_lost_its_lease_cannot_checkpoint(db, boa):
+    abandoned_job(db, step="beneficiary_resolved", beneficiary=BENEFICIARY)
+    stale, current = TransferWorker(1, 1, LEASE), TransferWorker(1, 1, LEASE)
+    [first] = stale.claim(db, datetime.utcnow())
+    # Its lease runs out and another worker takes the job over
+    [second] = current.claim(db, datetime.utcnow() + LEASE + timedelta(seconds=1))
+
+    assert second.attempt == first.attempt + 1
+    with pytest.raises(LeaseLostError):
+        stale._checkpoint(first, step="dispatching")
+    current._checkpoint(second, step="dispatching")
+    db.expire_all()
+    assert db.get(TransferJob, 1).step == "dispatching"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
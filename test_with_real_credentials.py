@@ -57,11 +57,11 @@ async def test_real_boa_integration():
     print("\nTesting Bank List Retrieval...")
     try:
         response = await boa_api.get_bank_list()
-        if response and response.get("header", {}).get("status") == "success":
-            banks = response.get("body", [])
+        if response.is_success:
+            banks = response.body
             print(f"Bank list retrieved successfully - {len(banks)} banks found")
             if banks:
-                print(f"   Sample: {banks[0].get('institutionName', 'N/A')}")
+                print(f"   Sample: {banks[0].institution_name}")
         else:
             print("Bank list retrieval failed or returned error")
             return False
@@ -73,9 +73,9 @@ async def test_real_boa_integration():
     print("\nTesting Currency Rate...")
     try:
         response = await boa_api.get_currency_rate("USD")
-        if response and response.get("header", {}).get("status") == "success":
-            rate_data = response.get("body", [{}])[0]
-            print(f"Currency rate retrieved - USD Buy: {rate_data.get('buyRate', 'N/A')}, Sell: {rate_data.get('sellRate', 'N/A')}")
+        if response.is_success and response.first():
+            rate_data = response.first()
+            print(f"Currency rate retrieved - USD Buy: {rate_data.buy_rate}, Sell: {rate_data.sell_rate}")
         else:
             print("Currency rate retrieval failed or returned error")
             return False
@@ -87,9 +87,9 @@ async def test_real_boa_integration():
     print("\nTesting Balance Inquiry...")
     try:
         response = await boa_api.get_balance()
-        if response and response.get("header", {}).get("status") == "success":
-            balance_data = response.get("body", {})
-            print(f"Balance retrieved - {balance_data.get('balance', 'N/A')} {balance_data.get('accountCurrency', 'N/A')}")
+        if response.is_success and response.first():
+            balance_data = response.first()
+            print(f"Balance retrieved - {balance_data.amount} {balance_data.account_currency}")
         else:
             print("Balance inquiry failed or returned error")
             return False
@@ -103,9 +103,9 @@ async def test_real_boa_integration():
     if test_account:
         try:
             response = await boa_api.fetch_beneficiary_name(test_account)
-            if response and response.get("header", {}).get("status") == "success":
-                beneficiary_data = response.get("body", [{}])[0]
-                print(f"Beneficiary found - {beneficiary_data.get('customerName', 'N/A')}")
+            if response.is_success and response.first():
+                beneficiary_data = response.first()
+                print(f"Beneficiary found - {beneficiary_data.customer_name}")
             else:
                 print("Beneficiary lookup failed or returned error")
         except Exception as e: